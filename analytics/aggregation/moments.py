@@ -0,0 +1,230 @@
+# =============================================
+# Momentos fusionables: conteo, media, co-momentos e histogramas por partición
+# =============================================
+from typing import Dict, Iterable, Mapping, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+
+class MomentAccumulator:
+    """
+    Estadísticos de segundo orden acumulables y fusionables (Welford / Chan).
+
+    Para cada par de columnas (i, j) guarda, sobre las filas donde ambas son
+    válidas: conteo, medias, suma de cuadrados centrada (M2) y co-momento.
+    Con eso `corr()` reproduce la correlación por pares de `DataFrame.corr()`
+    (incluidos los NaN) sin volver a leer filas, y dos acumuladores de
+    particiones distintas (camiones, días) se fusionan en O(columnas²).
+
+    `bins` ({columna: bordes}) agrega un histograma de bordes fijos por columna,
+    que también se fusiona sumando conteos y da cuantiles aproximados.
+    """
+
+    def __init__(self, columns: Sequence[str], bins: Optional[Mapping[str, Sequence[float]]] = None):
+        self.columns = list(columns)
+        if not self.columns:
+            raise ValueError("Se requiere al menos una columna")
+        k = len(self.columns)
+        self.n = np.zeros((k, k))
+        self.mean = np.zeros((k, k))
+        self.m2 = np.zeros((k, k))
+        self.comoment = np.zeros((k, k))
+        self.min = np.full(k, np.inf)
+        self.max = np.full(k, -np.inf)
+        self.bins = {col: np.asarray(edges, dtype=float) for col, edges in (bins or {}).items()}
+        unknown = set(self.bins) - set(self.columns)
+        if unknown:
+            raise KeyError(f"Columnas de histograma desconocidas: {sorted(unknown)}")
+        # Un contador extra a cada lado para valores fuera de rango
+        self.hist = {col: np.zeros(len(edges) + 1) for col, edges in self.bins.items()}
+
+    # ------------------------------------------------------------------
+    # Acumulación
+    # ------------------------------------------------------------------
+    def update(self, df: pd.DataFrame, chunk_size: int = 1_000_000) -> 'MomentAccumulator':
+        """Agrega las filas de `df` por bloques de `chunk_size` (memoria acotada)."""
+        missing = [c for c in self.columns if c not in df.columns]
+        if missing:
+            raise KeyError(f"Columnas faltantes: {missing}")
+        for start in range(0, len(df), chunk_size):
+            chunk = df.iloc[start:start + chunk_size]
+            values = np.column_stack([pd.to_numeric(chunk[c], errors='coerce').to_numpy(dtype=float)
+                                      for c in self.columns])
+            self._merge_arrays(*self._batch_moments(values))
+            self._update_extremes_and_hist(values)
+        return self
+
+    def _batch_moments(self, values: np.ndarray):
+        """Momentos por pares de un bloque; se centra por columna para no perder precisión."""
+        valid = np.isfinite(values)
+        mask = valid.astype(float)
+        n_valid = valid.sum(axis=0)
+        shift = np.where(n_valid > 0, np.where(valid, values, 0.0).sum(axis=0) / np.maximum(n_valid, 1), 0.0)
+        centered = np.where(valid, values - shift, 0.0)
+
+        n = mask.T @ mask
+        sums = centered.T @ mask                   # sums[i, j]: Σ x_i en filas con i y j válidos
+        squares = (centered ** 2).T @ mask
+        products = centered.T @ centered
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean_c = np.where(n > 0, sums / n, 0.0)
+        m2 = squares - sums * mean_c
+        comoment = products - sums * mean_c.T
+        mean = np.where(n > 0, mean_c + shift[:, None], 0.0)
+        return n, mean, np.maximum(m2, 0.0), comoment
+
+    def _merge_arrays(self, n_b, mean_b, m2_b, comoment_b):
+        n_a, mean_a = self.n, self.mean
+        n = n_a + n_b
+        delta = mean_b - mean_a
+        with np.errstate(divide='ignore', invalid='ignore'):
+            share = np.where(n > 0, n_b / n, 0.0)
+        weight = n_a * share
+        self.mean = mean_a + delta * share
+        self.m2 = self.m2 + m2_b + delta ** 2 * weight
+        self.comoment = self.comoment + comoment_b + delta * delta.T * weight
+        self.n = n
+
+    def _update_extremes_and_hist(self, values: np.ndarray):
+        valid = np.isfinite(values)
+        self.min = np.minimum(self.min, np.where(valid, values, np.inf).min(axis=0, initial=np.inf))
+        self.max = np.maximum(self.max, np.where(valid, values, -np.inf).max(axis=0, initial=-np.inf))
+        for col, edges in self.bins.items():
+            x = values[:, self.columns.index(col)]
+            x = x[np.isfinite(x)]
+            # 0 = bajo el primer borde, len(edges) = sobre el último
+            idx = np.searchsorted(edges, x, side='right')
+            idx[x == edges[-1]] = len(edges) - 1
+            self.hist[col] += np.bincount(idx, minlength=len(edges) + 1)
+
+    def merge(self, *others: 'MomentAccumulator') -> 'MomentAccumulator':
+        """Fusiona otros acumuladores (mismas columnas y bordes) en este."""
+        for other in others:
+            if other.columns != self.columns:
+                raise ValueError("Los acumuladores tienen columnas distintas")
+            if set(other.bins) != set(self.bins) or any(
+                    not np.array_equal(other.bins[c], self.bins[c]) for c in self.bins):
+                raise ValueError("Los histogramas tienen bordes distintos")
+            self._merge_arrays(other.n, other.mean, other.m2, other.comoment)
+            self.min = np.fmin(self.min, other.min)
+            self.max = np.fmax(self.max, other.max)
+            for col in self.hist:
+                self.hist[col] = self.hist[col] + other.hist[col]
+        return self
+
+    @classmethod
+    def merged(cls, accumulators: Iterable['MomentAccumulator']) -> 'MomentAccumulator':
+        accumulators = list(accumulators)
+        if not accumulators:
+            raise ValueError("No hay acumuladores para fusionar")
+        first = accumulators[0]
+        return cls(first.columns, first.bins).merge(*accumulators)
+
+    # ------------------------------------------------------------------
+    # Resultados
+    # ------------------------------------------------------------------
+    def _frame(self, matrix: np.ndarray) -> pd.DataFrame:
+        return pd.DataFrame(matrix, index=self.columns, columns=self.columns)
+
+    @property
+    def count(self) -> pd.Series:
+        return pd.Series(np.diag(self.n), index=self.columns)
+
+    def means(self) -> pd.Series:
+        return pd.Series(np.where(np.diag(self.n) > 0, np.diag(self.mean), np.nan), index=self.columns)
+
+    def var(self, ddof: int = 1) -> pd.Series:
+        n = np.diag(self.n)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return pd.Series(np.where(n > ddof, np.diag(self.m2) / (n - ddof), np.nan), index=self.columns)
+
+    def std(self, ddof: int = 1) -> pd.Series:
+        return np.sqrt(self.var(ddof))
+
+    def cov(self, min_periods: int = 2) -> pd.DataFrame:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cov = np.where(self.n >= max(min_periods, 2), self.comoment / (self.n - 1), np.nan)
+        return self._frame(cov)
+
+    def corr(self, min_periods: int = 1) -> pd.DataFrame:
+        """Correlación de Pearson por pares, equivalente a `DataFrame.corr()`."""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            corr = self.comoment / np.sqrt(self.m2 * self.m2.T)
+        corr = np.where(self.n >= max(min_periods, 2), np.clip(corr, -1.0, 1.0), np.nan)
+        return self._frame(corr)
+
+    def zscore_bounds(self, threshold: float = 3.0) -> pd.DataFrame:
+        """Límites media ± threshold·std por columna para marcar outliers."""
+        mean, std = self.means(), self.std()
+        return pd.DataFrame({'lower': mean - threshold * std, 'upper': mean + threshold * std})
+
+    def histogram(self, column: str):
+        """(conteos dentro de los bordes, bordes); los fuera de rango se descartan."""
+        if column not in self.bins:
+            raise KeyError(f"No hay histograma para {column}")
+        return self.hist[column][1:-1], self.bins[column]
+
+    def quantile(self, column: str, q) -> np.ndarray:
+        """Cuantil aproximado interpolando linealmente dentro de las barras del histograma."""
+        counts, edges = self.histogram(column)
+        cum = np.concatenate([[0.0], np.cumsum(counts)])
+        if cum[-1] == 0:
+            return np.full(np.shape(q), np.nan)
+        return np.interp(np.asarray(q, dtype=float) * cum[-1], cum, edges)
+
+    def describe(self, percentiles: Sequence[float] = (0.25, 0.5, 0.75)) -> pd.DataFrame:
+        """Resumen al estilo de `DataFrame.describe()`; percentiles solo si hay histograma."""
+        has_data = np.diag(self.n) > 0
+        stats = {
+            'count': self.count,
+            'mean': self.means(),
+            'std': self.std(),
+            'min': pd.Series(np.where(has_data, self.min, np.nan), index=self.columns),
+        }
+        for p in percentiles:
+            stats[f"{p * 100:g}%"] = pd.Series(
+                [float(self.quantile(c, p)) if c in self.bins else np.nan for c in self.columns],
+                index=self.columns)
+        stats['max'] = pd.Series(np.where(has_data, self.max, np.nan), index=self.columns)
+        return pd.DataFrame(stats).T
+
+    # ------------------------------------------------------------------
+    # Persistencia
+    # ------------------------------------------------------------------
+    def to_dict(self) -> dict:
+        return {
+            'columns': self.columns,
+            'n': self.n.tolist(),
+            'mean': self.mean.tolist(),
+            'm2': self.m2.tolist(),
+            'comoment': self.comoment.tolist(),
+            'min': [None if not np.isfinite(v) else float(v) for v in self.min],
+            'max': [None if not np.isfinite(v) else float(v) for v in self.max],
+            'bins': {c: e.tolist() for c, e in self.bins.items()},
+            'hist': {c: h.tolist() for c, h in self.hist.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'MomentAccumulator':
+        acc = cls(data['columns'], data.get('bins'))
+        acc.n = np.asarray(data['n'], dtype=float)
+        acc.mean = np.asarray(data['mean'], dtype=float)
+        acc.m2 = np.asarray(data['m2'], dtype=float)
+        acc.comoment = np.asarray(data['comoment'], dtype=float)
+        acc.min = np.array([np.inf if v is None else v for v in data['min']], dtype=float)
+        acc.max = np.array([-np.inf if v is None else v for v in data['max']], dtype=float)
+        acc.hist = {c: np.asarray(h, dtype=float) for c, h in data.get('hist', {}).items()}
+        return acc
+
+
+def build_moments(df: pd.DataFrame, columns: Sequence[str], by: Sequence[str] = (),
+                  bins: Optional[Mapping[str, Sequence[float]]] = None) -> Dict[tuple, MomentAccumulator]:
+    """Un acumulador por grupo (`by`): {(valores del grupo): MomentAccumulator}."""
+    by = list(by)
+    groups = df.groupby(by, sort=True, observed=True).indices if by else {(): np.arange(len(df))}
+    moments = {}
+    for key, idx in groups.items():
+        key = key if isinstance(key, tuple) else (key,)
+        moments[key] = MomentAccumulator(columns, bins).update(df.iloc[idx])
+    return moments
@@ -0,0 +1,388 @@
+# =============================================
+# Rollups materializados por hora, turno y día (incrementales)
+# =============================================
+import argparse
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from analytics.feature_engineering.fuel_consumption import FuelConsumptionEngine
+
+ROLLUP_ROOT = os.path.join("..", "data-set", "rollups")
+GRAINS = ('hour', 'shift', 'day')
+MEASURES = [
+    'records', 'duration_s', 'engine_on_s', 'idle_s', 'moving_s', 'distance_km',
+    'fuel_consumed_l', 'refuel_l', 'refuel_events', 'suspicious_drop_l', 'cycles', 'tonnage_t',
+]
+BUFFER_COLUMNS = ['Equipment', 'FullDateTime', 'FuelLevelLiters', 'Speed', 'RPM', 'ShiftDate', 'Shift']
+MONTHS_ES = ['Enero', 'Febrero', 'Marzo', 'Abril', 'Mayo', 'Junio',
+             'Julio', 'Agosto', 'Septiembre', 'Octubre', 'Noviembre', 'Diciembre']
+
+
+class RollupStore:
+    """
+    Agregados aditivos por camión y grano (hora, turno, día), mantenidos en
+    forma incremental:
+
+        {root}/{grano}/Equipment={camión}/rollup.parquet
+        {root}/_state/Equipment={camión}.json / .parquet   (marca de agua y buffer)
+
+    Cada lote nuevo se suma a los agregados existentes. El consumo sale de
+    `FuelConsumptionEngine` sobre el buffer + el lote; los intervalos cuyo
+    resultado aún puede cambiar con lecturas futuras (mediana móvil centrada
+    o una recarga/caída todavía abierta) quedan pendientes hasta el siguiente
+    lote o `flush`, así el resultado es el mismo que recalcular todo.
+
+    Las consultas de KPIs leen solo los rollups (cientos de filas por camión
+    y año), sin volver a los registros crudos.
+    """
+
+    def __init__(self, root: Union[str, Path] = ROLLUP_ROOT, engine: Optional[FuelConsumptionEngine] = None,
+                 max_gap_s: float = 600.0, idle_rpm: float = 0.0, max_workers: Optional[int] = None):
+        """
+        Args:
+            root: Carpeta de los rollups
+            engine: Motor de consumo (parámetros de suavizado y eventos)
+            max_gap_s: Intervalos más largos (equipo apagado o sin señal) no suman tiempo ni distancia
+            idle_rpm: RPM sobre las que el motor se considera encendido
+            max_workers: Hilos para actualizar camiones en paralelo
+        """
+        self.root = Path(root)
+        self.engine = engine or FuelConsumptionEngine(max_workers=1)
+        self.max_gap_s = max_gap_s
+        self.idle_rpm = idle_rpm
+        self.max_workers = max_workers
+        self._loaded = {}          # ruta -> (mtime, DataFrame)
+
+    # ------------------------------------------------------------------
+    # Rutas y estado
+    # ------------------------------------------------------------------
+    def _rollup_path(self, grain: str, truck: str) -> Path:
+        return self.root / grain / f"Equipment={truck}" / "rollup.parquet"
+
+    def _state_paths(self, truck: str):
+        base = self.root / "_state" / f"Equipment={truck}"
+        return base.with_suffix(".json"), base.with_suffix(".parquet")
+
+    def _load_state(self, truck: str):
+        meta_path, buffer_path = self._state_paths(truck)
+        meta = {'last_time': None, 'last_cycle_end': None, 'context_rows': 0}
+        if meta_path.exists():
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta.update(json.load(f))
+        buffer = pd.read_parquet(buffer_path) if buffer_path.exists() else pd.DataFrame(columns=BUFFER_COLUMNS)
+        return meta, buffer
+
+    def _save_state(self, truck: str, meta: dict, buffer: pd.DataFrame):
+        meta_path, buffer_path = self._state_paths(truck)
+        meta_path.parent.mkdir(parents=True, exist_ok=True)
+        _atomic_parquet(buffer, buffer_path)
+        tmp = meta_path.with_suffix(".tmp")
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, indent=2, default=str)
+        os.replace(tmp, meta_path)
+
+    def trucks(self) -> list:
+        return sorted(p.name.split("=", 1)[1] for p in (self.root / "day").glob("Equipment=*"))
+
+    # ------------------------------------------------------------------
+    # Materialización
+    # ------------------------------------------------------------------
+    def update(self, sensor_df: pd.DataFrame, cycle_df: Optional[pd.DataFrame] = None) -> Dict[str, dict]:
+        """
+        Incorpora lecturas (y ciclos) nuevos. Las lecturas con fecha anterior o
+        igual a la marca de agua del camión se consideran ya procesadas.
+
+        Returns:
+            {camión: {'rows': nuevas, 'late': descartadas, 'intervals': finalizados}}
+        """
+        missing = [c for c in ('Equipment', 'FullDateTime') if c not in sensor_df.columns]
+        if missing:
+            raise KeyError(f"Columnas requeridas faltantes: {missing}")
+        cycles_by_truck = {}
+        if cycle_df is not None and not cycle_df.empty:
+            cycles_by_truck = {t: g for t, g in cycle_df.groupby('Equipment')}
+        groups = [(truck, group, cycles_by_truck.pop(truck, None)) for truck, group in sensor_df.groupby('Equipment')]
+        groups += [(truck, sensor_df.iloc[0:0], cycles) for truck, cycles in cycles_by_truck.items()]
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            results = list(executor.map(lambda args: self._update_truck(*args), groups))
+        return {truck: stats for (truck, _, _), stats in zip(groups, results)}
+
+    def flush(self, trucks: Optional[Iterable[str]] = None):
+        """Finaliza los intervalos pendientes (p. ej. al cerrar el día o el histórico)."""
+        for truck in (trucks if trucks is not None else self.trucks()):
+            self._update_truck(truck, pd.DataFrame(columns=BUFFER_COLUMNS), None, final=True)
+
+    def rebuild(self, sensor_df: pd.DataFrame, cycle_df: Optional[pd.DataFrame] = None):
+        """Recalcula desde cero los camiones presentes en `sensor_df`."""
+        for truck in sensor_df['Equipment'].unique():
+            for path in [self._rollup_path(g, truck) for g in GRAINS] + list(self._state_paths(truck)):
+                if path.exists():
+                    path.unlink()
+        self.update(sensor_df, cycle_df)
+        self.flush(sensor_df['Equipment'].unique())
+
+    def _update_truck(self, truck: str, rows: pd.DataFrame, cycles: Optional[pd.DataFrame],
+                      final: bool = False) -> dict:
+        meta, buffer = self._load_state(truck)
+        rows = rows.sort_values('FullDateTime', kind='stable')
+        if meta['last_time'] is not None:
+            fresh = pd.to_datetime(rows['FullDateTime']) > pd.Timestamp(meta['last_time'])
+        else:
+            fresh = pd.Series(True, index=rows.index)
+        late = int((~fresh).sum())
+        rows = rows[fresh]
+        if late:
+            print(f"⚠️ {truck}: {late} lecturas anteriores a la marca de agua se ignoraron (usar rebuild)")
+
+        facts = [self._record_facts(rows)]
+        if len(rows):
+            meta['last_time'] = str(pd.Timestamp(rows['FullDateTime'].iloc[-1]))
+
+        # Intervalos de consumo: buffer (contexto + pendientes) + lecturas nuevas
+        valid = rows.reindex(columns=BUFFER_COLUMNS)
+        valid = valid[pd.to_numeric(valid['FuelLevelLiters'], errors='coerce') > 0]
+        parts = [part for part in (buffer, valid) if len(part)]
+        work = pd.concat(parts, ignore_index=True) if parts else valid.reset_index(drop=True)
+        context = int(meta['context_rows']) if len(buffer) else 0
+        cut = self._finalizable(work, context, final)
+        if cut > context:
+            intervals = self._interval_facts(work)
+            facts.append(intervals.iloc[context:cut])
+        finalized = max(cut - context, 0)
+        keep_from = max(cut - self.engine.smoothing_window, 0)
+        meta['context_rows'] = cut - keep_from
+        buffer = work.iloc[keep_from:].reset_index(drop=True)
+
+        # Ciclos: tonelaje y conteo por la hora de término
+        if cycles is not None and not cycles.empty:
+            cycle_facts = self._cycle_facts(cycles, meta.get('last_cycle_end'))
+            if not cycle_facts.empty:
+                meta['last_cycle_end'] = str(cycle_facts['time'].max())
+                facts.append(cycle_facts)
+
+        self._merge(truck, pd.concat([f for f in facts if not f.empty], ignore_index=True)
+                    if any(not f.empty for f in facts) else pd.DataFrame())
+        self._save_state(truck, meta, buffer)
+        return {'rows': int(len(rows)), 'late': late, 'intervals': finalized}
+
+    def _finalizable(self, work: pd.DataFrame, context: int, final: bool) -> int:
+        """
+        Índice del primer intervalo que debe quedar pendiente. Un intervalo i
+        (lectura i -> i+1) es definitivo si la mediana centrada de i+1 ya tiene
+        todas sus lecturas y no pertenece a una subida o caída rápida que siga
+        abierta al final de los datos.
+        """
+        n_intervals = len(work) - 1
+        if n_intervals <= 0:
+            return context
+        if final:
+            return n_intervals
+        cut = max(len(work) - 1 - self.engine.smoothing_window // 2 - 1, context)
+        if cut <= context:
+            return context
+        level = (work['FuelLevelLiters'].astype(float)
+                 .rolling(self.engine.smoothing_window, center=True, min_periods=1).median().to_numpy())
+        delta = np.diff(level)
+        seconds = np.diff(pd.to_datetime(work['FullDateTime']).to_numpy(dtype='datetime64[ns]')).astype(np.int64) / 1e9
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rate = np.where(seconds > 0, -delta / (seconds / 3600.0), np.inf)
+        rising = delta > 0
+        fast_drop = (delta < 0) & (rate > self.engine.max_burn_rate)
+        while cut > context and ((rising[cut - 1] and rising[cut]) or (fast_drop[cut - 1] and fast_drop[cut])):
+            cut -= 1
+        return cut
+
+    def _record_facts(self, rows: pd.DataFrame) -> pd.DataFrame:
+        if rows.empty:
+            return pd.DataFrame()
+        facts = pd.DataFrame({'time': pd.to_datetime(rows['FullDateTime']).to_numpy(), 'records': 1.0})
+        for col in ('ShiftDate', 'Shift'):
+            facts[col] = rows[col].to_numpy() if col in rows.columns else None
+        return facts
+
+    def _interval_facts(self, work: pd.DataFrame) -> pd.DataFrame:
+        """Un hecho por intervalo consecutivo del buffer, en el orden de `work`."""
+        intervals = self.engine._truck_intervals(work.assign(Equipment=work['Equipment'].iloc[-1]))
+        duration = intervals['duration_s'].to_numpy()
+        covered = duration <= self.max_gap_s
+        speed = pd.to_numeric(work['Speed'], errors='coerce').fillna(0.0).to_numpy()[:-1]
+        rpm = pd.to_numeric(work['RPM'], errors='coerce').fillna(0.0).to_numpy()[:-1]
+        engine_on = rpm > self.idle_rpm
+        seconds = np.where(covered, duration, 0.0)
+        return pd.DataFrame({
+            'time': intervals['start'].to_numpy(),
+            'ShiftDate': work['ShiftDate'].to_numpy()[:-1],
+            'Shift': work['Shift'].to_numpy()[:-1],
+            'duration_s': seconds,
+            'engine_on_s': np.where(engine_on, seconds, 0.0),
+            'idle_s': np.where(engine_on & (speed <= 0), seconds, 0.0),
+            'moving_s': np.where(speed > 0, seconds, 0.0),
+            'distance_km': speed * seconds / 3600.0,
+            'fuel_consumed_l': intervals['consumed_l'].to_numpy(),
+            'refuel_l': intervals['refuel_l'].to_numpy(),
+            # Una recarga abarca varios intervalos: se cuenta en el primero
+            'refuel_events': (intervals['is_refuel'] & ~intervals['is_refuel'].shift(fill_value=False))
+            .astype(float).to_numpy(),
+            'suspicious_drop_l': intervals['suspicious_drop_l'].to_numpy(),
+        })
+
+    @staticmethod
+    def _cycle_facts(cycles: pd.DataFrame, last_end, end_col: str = 'L_UnloadingEnd') -> pd.DataFrame:
+        if end_col not in cycles.columns:
+            return pd.DataFrame()
+        end = pd.to_datetime(cycles[end_col], errors='coerce')
+        keep = end.notna() if last_end is None else end > pd.Timestamp(last_end)
+        tonnage = (pd.to_numeric(cycles['MeasuredTonnage'], errors='coerce').fillna(0.0)
+                   if 'MeasuredTonnage' in cycles.columns else pd.Series(0.0, index=cycles.index))
+        facts = pd.DataFrame({'time': end[keep].to_numpy(), 'cycles': 1.0, 'tonnage_t': tonnage[keep].to_numpy()})
+        for col in ('ShiftDate', 'Shift'):
+            facts[col] = cycles.loc[keep, col].to_numpy() if col in cycles.columns else None
+        return facts
+
+    def _merge(self, truck: str, facts: pd.DataFrame):
+        """Agrupa los hechos nuevos por grano y los suma a los rollups guardados."""
+        if facts.empty:
+            return
+        facts = facts.reindex(columns=['time', 'ShiftDate', 'Shift'] + MEASURES)
+        facts[MEASURES] = facts[MEASURES].fillna(0.0)
+        time = pd.to_datetime(facts['time'])
+        keyed = {
+            'hour': facts.assign(period=time.dt.floor('h')),
+            'day': facts.assign(period=time.dt.floor('D')),
+            'shift': facts.assign(period=pd.to_datetime(facts['ShiftDate'], errors='coerce').dt.normalize()),
+        }
+        for grain, frame in keyed.items():
+            keys = _keys(grain)
+            frame = frame.dropna(subset=keys)
+            if frame.empty:
+                continue
+            new = frame.groupby(keys)[MEASURES].sum()
+            path = self._rollup_path(grain, truck)
+            if path.exists():
+                old = pd.read_parquet(path).set_index(keys)[MEASURES]
+                new = old.add(new, fill_value=0.0)
+            result = new.sort_index().reset_index()
+            result.insert(0, 'Equipment', truck)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            _atomic_parquet(result, path)
+
+    # ------------------------------------------------------------------
+    # Consultas
+    # ------------------------------------------------------------------
+    def rollup(self, truck: str, grain: str = 'day') -> pd.DataFrame:
+        """Rollup completo de un camión (en memoria mientras el archivo no cambie)."""
+        if grain not in GRAINS:
+            raise ValueError(f"Grano no soportado: {grain}. Disponibles: {', '.join(GRAINS)}")
+        path = self._rollup_path(grain, truck)
+        if not path.exists():
+            return _empty_rollup(grain)
+        mtime = path.stat().st_mtime_ns
+        cached = self._loaded.get(path)
+        if cached is None or cached[0] != mtime:
+            cached = (mtime, pd.read_parquet(path))
+            self._loaded[path] = cached
+        return cached[1]
+
+    def query(self, grain: str = 'day', trucks: Optional[Iterable[str]] = None, start=None, end=None) -> pd.DataFrame:
+        """Filas de rollup con `start <= period <= end` (fechas inclusive)."""
+        trucks = list(trucks) if trucks is not None else self.trucks()
+        frames = [self.rollup(truck, grain) for truck in trucks]
+        frames = [f for f in frames if not f.empty]
+        if not frames:
+            return _empty_rollup(grain)
+        rows = pd.concat(frames, ignore_index=True)
+        mask = pd.Series(True, index=rows.index)
+        if start is not None:
+            mask &= rows['period'] >= pd.Timestamp(start)
+        if end is not None:
+            end = pd.Timestamp(end)
+            # Una fecha sin hora incluye el día completo
+            mask &= rows['period'] < (end + pd.Timedelta(days=1) if end == end.normalize() else end)
+        return rows[mask].reset_index(drop=True)
+
+    def kpis(self, trucks: Optional[Iterable[str]] = None, start=None, end=None, grain: str = 'hour',
+             by: str = 'Equipment') -> pd.DataFrame:
+        """
+        KPIs del rango sumando rollups: totales aditivos y los derivados
+        (L/h de motor encendido, L/t, km/h en movimiento, % ralentí).
+        `by=None` agrega toda la selección en una fila.
+        """
+        rows = self.query(grain, trucks, start, end)
+        totals = rows.groupby(by)[MEASURES].sum() if by else rows[MEASURES].sum().to_frame('total').T
+        hours_on = totals['engine_on_s'] / 3600.0
+        days = rows.groupby(by)['period'].apply(lambda p: p.dt.normalize().nunique()) if by else \
+            pd.Series({'total': rows['period'].dt.normalize().nunique()})
+        totals['days'] = days.reindex(totals.index).fillna(0).astype(int) if len(totals) else []
+        totals['liters_per_hour'] = totals['fuel_consumed_l'].div(hours_on.where(hours_on > 0))
+        totals['liters_per_day'] = totals['fuel_consumed_l'].div(totals['days'].where(totals['days'] > 0))
+        totals['liters_per_ton'] = totals['fuel_consumed_l'].div(totals['tonnage_t'].where(totals['tonnage_t'] > 0))
+        totals['avg_moving_speed'] = totals['distance_km'].div((totals['moving_s'] / 3600.0).where(totals['moving_s'] > 0))
+        totals['idle_share'] = totals['idle_s'].div(totals['engine_on_s'].where(totals['engine_on_s'] > 0))
+        return totals
+
+
+def daily_activity(rollup: pd.DataFrame) -> pd.DataFrame:
+    """
+    Conteo diario de registros con la forma de `TruckEDA._prepare_daily_data`
+    (año, mes, dia_mes, conteo). Con el rollup por turno el día es ShiftDate,
+    como en el original; con el diario, el día calendario.
+    """
+    period = pd.to_datetime(rollup['period'])
+    daily = pd.DataFrame({
+        'año': period.dt.year.to_numpy(),
+        'mes': pd.Categorical([MONTHS_ES[m - 1] for m in period.dt.month], categories=MONTHS_ES, ordered=True),
+        'dia_mes': period.dt.day.to_numpy(),
+        'conteo': rollup['records'].astype(int).to_numpy(),
+    })
+    return daily.groupby(['año', 'mes', 'dia_mes'], observed=True)['conteo'].sum().reset_index() \
+        .sort_values(['año', 'mes', 'dia_mes']).reset_index(drop=True)
+
+
+def _keys(grain: str) -> list:
+    return ['period', 'Shift'] if grain == 'shift' else ['period']
+
+
+def _empty_rollup(grain: str) -> pd.DataFrame:
+    """Rollup sin filas con los tipos de uno real (`period` como fecha, medidas numéricas)."""
+    columns = {'Equipment': pd.Series(dtype=object), 'period': pd.Series(dtype='datetime64[ns]')}
+    if grain == 'shift':
+        columns['Shift'] = pd.Series(dtype=object)
+    columns.update({measure: pd.Series(dtype=float) for measure in MEASURES})
+    return pd.DataFrame(columns)
+
+
+def _atomic_parquet(df: pd.DataFrame, path: Path):
+    tmp = path.with_suffix(".tmp")
+    df.to_parquet(tmp, index=False)
+    os.replace(tmp, path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Actualiza los rollups desde la caché de datos procesados")
+    parser.add_argument('trucks', nargs='*', help="Camiones (por defecto, todos los de la caché)")
+    parser.add_argument('--cache-root', default=os.path.join("..", "data-set", "processed"))
+    parser.add_argument('--root', default=ROLLUP_ROOT)
+    parser.add_argument('--flush', action='store_true', help="Finaliza también los intervalos pendientes")
+    args = parser.parse_args()
+
+    from analytics.eda.fleet import ProcessedDataCache
+
+    cache = ProcessedDataCache(args.cache_root)
+    store = RollupStore(args.root)
+    for truck in args.trucks or cache.trucks():
+        data = cache.get(truck)
+        stats = store.update(data['sensor'], data.get('cycle'))
+        if args.flush:
+            store.flush([truck])
+        print(f"✅ {truck}: {stats.get(truck, {})}")
+
+
+if __name__ == "__main__":
+    main()
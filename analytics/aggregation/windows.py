@@ -0,0 +1,12 @@
+# =============================================
+# Nombres de ventanas temporales de las particiones (feature store y sketches)
+# =============================================
+import pandas as pd
+
+# Inicio de ventana en los nombres de partición: window=2024-01-01T00-00
+WINDOW_FORMAT = '%Y-%m-%dT%H-%M'
+
+
+def naive_window(ts: pd.Timestamp) -> pd.Timestamp:
+    """Las ventanas con zona horaria se nombran en UTC sin zona; las demás, tal cual."""
+    return ts.tz_convert('UTC').tz_localize(None) if ts.tzinfo is not None else ts
@@ -0,0 +1,33 @@
+"""
+Análisis exploratorio de datos de la flota.
+
+Los nombres públicos se resuelven al primer acceso (PEP 562): `import
+analytics.eda` no carga pandas ni ninguna librería de gráficos hasta que se
+usa una clase o función concreta.
+"""
+from importlib import import_module
+
+_EXPORTS = {
+    'TruckEDA': 'analytics.eda.eda',
+    'AdvancedEDA': 'analytics.eda.eda',
+    'run_truck_eda': 'analytics.eda.eda',
+    'ProcessedDataCache': 'analytics.eda.fleet',
+    'run_fleet_eda': 'analytics.eda.fleet',
+    'compare_fleet': 'analytics.eda.fleet',
+    'ReportCache': 'analytics.eda.report_cache',
+    'missingness_profile': 'analytics.eda.missingness',
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(_EXPORTS[name]), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,53 @@
+# =============================================
+# CLI headless del EDA: python -m analytics.eda T-210 --sections quality spatial
+# =============================================
+import argparse
+import os
+import sys
+
+from analytics.eda.eda import TruckEDA
+from analytics.eda.fleet import PROCESSED_ROOT, ProcessedDataCache, run_fleet_eda
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m analytics.eda",
+        description="Genera reportes EDA sin interfaz gráfica a partir de la caché de datos procesados",
+    )
+    parser.add_argument('trucks', nargs='*', help="Camiones a analizar (por defecto, todos los de la caché)")
+    parser.add_argument('--sections', nargs='+', default=None, choices=TruckEDA.SECTIONS,
+                        help="Secciones a generar (por defecto, todas)")
+    parser.add_argument('--cache-root', default=PROCESSED_ROOT, help="Raíz de la caché de datos procesados")
+    parser.add_argument('--output-dir', default="reports/truck_eda", help="Carpeta de salida (una por camión)")
+    parser.add_argument('--dpi', type=int, default=150)
+    parser.add_argument('--workers', type=int, default=None, help="Procesos para renderizar secciones")
+    parser.add_argument('--no-cache', action='store_true', help="Regenera aunque la sección esté en caché")
+    parser.add_argument('--fleet', action='store_true', help="Además genera el resumen comparativo de flota")
+    args = parser.parse_args(argv)
+
+    # Sin display: matplotlib debe usar Agg antes de importarse en cualquier proceso
+    os.environ.setdefault('MPLBACKEND', 'Agg')
+
+    cache = ProcessedDataCache(args.cache_root)
+    trucks = args.trucks or cache.trucks()
+    if not trucks:
+        print(f"❌ No hay camiones en la caché {args.cache_root}")
+        return 1
+
+    failed = 0
+    for truck in trucks:
+        try:
+            eda = TruckEDA(cache.get(truck), truck, dpi=args.dpi, output_dir=os.path.join(args.output_dir, truck))
+            eda.run_full_eda(max_workers=args.workers, use_cache=not args.no_cache, sections=args.sections)
+        except (FileNotFoundError, KeyError) as e:
+            print(f"❌ {truck}: {str(e)}")
+            failed += 1
+
+    if args.fleet:
+        run_fleet_eda(trucks, cache_root=args.cache_root, output_dir=os.path.join(args.output_dir, "fleet"),
+                      max_workers=args.workers, render_reports=False)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,192 @@
+# =============================================
+# Renderizado de densidad exacto: agregar en una grilla fija y luego dibujar
+# =============================================
+from typing import NamedTuple, Optional, Tuple
+
+import numpy as np
+
+# Anclas de la paleta viridis (interpolación lineal, sin depender de matplotlib)
+VIRIDIS = np.array([
+    [68, 1, 84], [72, 40, 120], [62, 74, 137], [49, 104, 142], [38, 130, 142],
+    [31, 158, 137], [53, 183, 121], [109, 205, 89], [180, 222, 44], [253, 231, 37],
+], dtype=float)
+
+
+class Grid2D(NamedTuple):
+    """Resultado de la agregación: conteos (alto x ancho), media opcional y bordes."""
+    counts: np.ndarray
+    values: Optional[np.ndarray]
+    x_edges: np.ndarray
+    y_edges: np.ndarray
+
+    @property
+    def x_centers(self) -> np.ndarray:
+        return (self.x_edges[:-1] + self.x_edges[1:]) / 2
+
+    @property
+    def y_centers(self) -> np.ndarray:
+        return (self.y_edges[:-1] + self.y_edges[1:]) / 2
+
+
+def _data_range(a: np.ndarray, bounds: Optional[Tuple[float, float]]) -> Tuple[float, float]:
+    lo, hi = bounds if bounds is not None else (float(np.min(a)), float(np.max(a)))
+    if hi <= lo:
+        lo, hi = lo - 0.5, hi + 0.5
+    return lo, hi
+
+
+def bin_2d(x, y, width: int = 400, height: int = 300, x_range: Optional[Tuple[float, float]] = None,
+           y_range: Optional[Tuple[float, float]] = None, values=None) -> Grid2D:
+    """
+    Cuenta TODOS los puntos en una grilla de `width` x `height` celdas en una sola
+    pasada (`np.bincount` sobre el índice plano). Si se pasa `values`, también
+    devuelve su media por celda (NaN en celdas vacías).
+    """
+    x = np.asarray(x, dtype=float).ravel()
+    y = np.asarray(y, dtype=float).ravel()
+    v = None if values is None else np.asarray(values, dtype=float).ravel()
+    n_cells = width * height
+
+    valid = np.isfinite(x) & np.isfinite(y)
+    if not valid.any():
+        x_edges = np.linspace(*_data_range(np.zeros(1), x_range), width + 1)
+        y_edges = np.linspace(*_data_range(np.zeros(1), y_range), height + 1)
+        empty = np.zeros((height, width), dtype=np.int64)
+        return Grid2D(empty, None if v is None else np.full(empty.shape, np.nan), x_edges, y_edges)
+
+    x0, x1 = _data_range(x[valid], x_range)
+    y0, y1 = _data_range(y[valid], y_range)
+    valid &= (x >= x0) & (x <= x1) & (y >= y0) & (y <= y1)
+
+    ix = np.minimum(((x[valid] - x0) / (x1 - x0) * width).astype(np.int64), width - 1)
+    iy = np.minimum(((y[valid] - y0) / (y1 - y0) * height).astype(np.int64), height - 1)
+    flat = iy * width + ix
+    counts = np.bincount(flat, minlength=n_cells).reshape(height, width)
+
+    means = None
+    if v is not None:
+        vv = v[valid]
+        has_value = np.isfinite(vv)
+        sums = np.bincount(flat[has_value], weights=vv[has_value], minlength=n_cells)
+        n_values = np.bincount(flat[has_value], minlength=n_cells)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            means = np.where(n_values > 0, sums / n_values, np.nan).reshape(height, width)
+
+    return Grid2D(counts, means, np.linspace(x0, x1, width + 1), np.linspace(y0, y1, height + 1))
+
+
+def bin_geo(lat, lon, width: int = 400, values=None, lat_range: Optional[Tuple[float, float]] = None,
+            lon_range: Optional[Tuple[float, float]] = None, max_height: int = 1600) -> Grid2D:
+    """
+    Grilla geográfica con celdas aproximadamente cuadradas en metros: el alto
+    se deriva del ancho corrigiendo la longitud por cos(latitud media).
+    Se descartan coordenadas fuera de rango y el par (0, 0).
+    """
+    lat = np.asarray(lat, dtype=float).ravel()
+    lon = np.asarray(lon, dtype=float).ravel()
+    ok = (np.abs(lat) <= 90) & (np.abs(lon) <= 180) & ~((lat == 0) & (lon == 0))
+    lat = np.where(ok, lat, np.nan)
+    lon = np.where(ok, lon, np.nan)
+
+    finite = np.isfinite(lat) & np.isfinite(lon)
+    if finite.any():
+        la0, la1 = _data_range(lat[finite], lat_range)
+        lo0, lo1 = _data_range(lon[finite], lon_range)
+        ground_w = (lo1 - lo0) * np.cos(np.radians((la0 + la1) / 2))
+        height = int(np.clip(round(width * (la1 - la0) / max(ground_w, 1e-12)), 1, max_height))
+        lat_range, lon_range = (la0, la1), (lo0, lo1)
+    else:
+        height = width
+    return bin_2d(lon, lat, width, height, lon_range, lat_range, values)
+
+
+def shade(counts: np.ndarray, how: str = 'eq_hist', cmap: np.ndarray = VIRIDIS) -> np.ndarray:
+    """
+    Convierte una grilla de conteos en una imagen RGBA uint8 (fila 0 = y mínimo).
+
+    how: 'linear', 'log' o 'eq_hist' (ecualización de histograma: realza
+    regímenes poco frecuentes sin que las celdas densas saturen la escala).
+    Las celdas vacías quedan transparentes.
+    """
+    counts = np.asarray(counts, dtype=float)
+    filled = counts > 0
+    level = np.zeros_like(counts)
+    if filled.any():
+        c = counts[filled]
+        if how == 'linear':
+            level[filled] = c / c.max()
+        elif how == 'log':
+            level[filled] = np.log1p(c) / np.log1p(c.max())
+        elif how == 'eq_hist':
+            uniques, freq = np.unique(c, return_counts=True)
+            cdf = np.cumsum(freq) / freq.sum()
+            level[filled] = np.interp(c, uniques, cdf) if len(uniques) > 1 else 1.0
+        else:
+            raise ValueError(f"Modo de sombreado no soportado: {how}")
+
+    anchors = np.linspace(0, 1, len(cmap))
+    rgba = np.zeros(counts.shape + (4,), dtype=np.uint8)
+    for channel in range(3):
+        rgba[..., channel] = np.interp(level, anchors, cmap[:, channel]).astype(np.uint8)
+    rgba[..., 3] = np.where(filled, 255, 0)
+    return rgba
+
+
+def plot_density(ax, grid: Grid2D, how: str = 'eq_hist', **imshow_kwargs):
+    """Dibuja la grilla sombreada en un eje de matplotlib (una sola imagen)."""
+    extent = (grid.x_edges[0], grid.x_edges[-1], grid.y_edges[0], grid.y_edges[-1])
+    return ax.imshow(shade(grid.counts, how), origin='lower', extent=extent, aspect='auto',
+                     interpolation='nearest', **imshow_kwargs)
+
+
+def density_heatmap_figure(grid: Grid2D, title: str = '', x_label: str = 'x', y_label: str = 'y',
+                           value_label: Optional[str] = None, log: bool = True):
+    """
+    Figura Plotly con un único `go.Heatmap` de tamaño fijo: el HTML pesa lo
+    mismo con mil o con cien millones de puntos.
+    """
+    import plotly.graph_objects as go
+
+    counts = grid.counts.astype(float)
+    with np.errstate(divide='ignore'):
+        z = np.where(counts > 0, np.log10(counts) if log else counts, np.nan)
+    hover = f"{x_label}: %{{x:.2f}}<br>{y_label}: %{{y:.2f}}<br>Registros: %{{customdata[0]:,}}"
+    customdata = [counts]
+    if grid.values is not None:
+        customdata.append(grid.values)
+        hover += f"<br>{value_label or 'Valor'} medio: %{{customdata[1]:.2f}}"
+    fig = go.Figure(go.Heatmap(
+        z=z, x=grid.x_centers, y=grid.y_centers,
+        customdata=np.dstack(customdata), hovertemplate=hover + "<extra></extra>",
+        colorscale='Viridis', colorbar=dict(title='log10(registros)' if log else 'registros'),
+    ))
+    fig.update_layout(title=title, xaxis_title=x_label, yaxis_title=y_label, template='plotly_white')
+    return fig
+
+
+def density_map_figure(grid: Grid2D, title: str = '', value_label: Optional[str] = None,
+                       zoom: int = 12, map_style: str = 'carto-positron'):
+    """
+    Mapa con un marcador por celda no vacía (a lo sumo ancho x alto marcadores),
+    coloreado por la media de `values` si existe o por log10 del conteo.
+    """
+    import plotly.graph_objects as go
+
+    iy, ix = np.nonzero(grid.counts)
+    counts = grid.counts[iy, ix]
+    lat, lon = grid.y_centers[iy], grid.x_centers[ix]
+    if grid.values is not None:
+        color, color_title = grid.values[iy, ix], value_label or 'Valor medio'
+    else:
+        color, color_title = np.log10(counts), 'log10(registros)'
+
+    fig = go.Figure(go.Scattermap(
+        lat=lat, lon=lon, mode='markers',
+        marker=dict(size=6, color=color, colorscale='Viridis', colorbar=dict(title=color_title)),
+        customdata=np.column_stack([counts, color]),
+        hovertemplate="Registros: %{customdata[0]:,}<br>" + color_title + ": %{customdata[1]:.2f}<extra></extra>",
+    ))
+    center = dict(lat=float(np.mean(grid.y_edges[[0, -1]])), lon=float(np.mean(grid.x_edges[[0, -1]])))
+    fig.update_layout(title=title, map=dict(style=map_style, zoom=zoom, center=center),
+                      margin=dict(l=0, r=0, t=40, b=0))
+    return fig
@@ -0,0 +1,196 @@
+# =============================================
+# Reducción de series temporales para gráficos (LTTB y min-max)
+# =============================================
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Puntos por serie para un gráfico de ~1000 px de ancho (2 por píxel)
+DEFAULT_POINTS = 2000
+
+
+def points_for_width(width_px: int, per_pixel: float = 2.0) -> int:
+    """Cantidad de puntos apropiada para un gráfico de `width_px` píxeles."""
+    return max(3, int(width_px * per_pixel))
+
+
+def _as_float(x: np.ndarray) -> np.ndarray:
+    """Eje x numérico relativo al primer valor (fechas en ns) para las áreas."""
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.datetime64):
+        x = x.astype('datetime64[ns]').astype(np.int64)
+    x = x.astype(float)
+    return x - x[0] if len(x) else x
+
+
+def minmax_indices(y: np.ndarray, n_buckets: int) -> np.ndarray:
+    """
+    Índices del mínimo y máximo de cada uno de `n_buckets` bloques de igual
+    tamaño (en orden), vectorizado con un reshape. Preserva picos y valles.
+    """
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    size = int(np.ceil(n / max(n_buckets, 1)))
+    if size <= 2:
+        return np.arange(n)
+    rows = int(np.ceil(n / size))
+    padded = np.full(rows * size, np.nan)
+    padded[:n] = y
+    blocks = padded.reshape(rows, size)
+    lo = np.where(np.isnan(blocks), np.inf, blocks).argmin(axis=1)
+    hi = np.where(np.isnan(blocks), -np.inf, blocks).argmax(axis=1)
+    offsets = np.arange(rows) * size
+    idx = np.unique(np.concatenate([offsets + lo, offsets + hi]))
+    return idx[idx < n]
+
+
+def lttb_indices(x, y, n_out: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets: conserva el primer y último punto y, en
+    cada bloque intermedio, el punto que forma el triángulo de mayor área con
+    el punto elegido en el bloque anterior y el promedio del siguiente.
+
+    Los promedios de bloque se calculan de una vez con `np.add.reduceat`; el
+    bucle recorre bloques (n_out iteraciones), no puntos.
+    """
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    xf = _as_float(x)
+
+    # Bloques interiores sobre los puntos 1..n-2
+    every = (n - 2) / (n_out - 2)
+    edges = np.floor(np.arange(n_out - 1) * every).astype(np.int64) + 1
+    edges[-1] = n - 1
+    starts, stops = edges[:-1], edges[1:]
+    counts = stops - starts
+    # reduceat suma hasta el final del arreglo: se excluye el último punto
+    avg_x = np.add.reduceat(xf[:-1], starts) / counts
+    avg_y = np.add.reduceat(y[:-1], starts) / counts
+    # Para el último bloque, el "siguiente" es el punto final
+    next_x = np.append(avg_x[1:], xf[-1])
+    next_y = np.append(avg_y[1:], y[-1])
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i, (start, stop) in enumerate(zip(starts, stops)):
+        xs, ys = xf[start:stop], y[start:stop]
+        area = np.abs((xf[a] - next_x[i]) * (ys - y[a]) - (xf[a] - xs) * (next_y[i] - y[a]))
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def downsample_indices(x, y, n_out: int = DEFAULT_POINTS, method: str = 'minmax_lttb',
+                       minmax_ratio: int = 4) -> np.ndarray:
+    """
+    Índices de los puntos a dibujar.
+
+    method:
+        'lttb': LTTB sobre todos los puntos.
+        'minmax': mínimo y máximo por bloque (n_out / 2 bloques).
+        'minmax_lttb': preselección min-max de `minmax_ratio * n_out` puntos y
+            LTTB sobre ellos; misma forma visual que LTTB, mucho más rápido en
+            series largas.
+    Los valores no finitos se descartan.
+    """
+    y = np.asarray(y, dtype=float)
+    finite = np.flatnonzero(np.isfinite(y))
+    if len(finite) <= n_out:
+        return finite
+    xv = np.asarray(x)[finite]
+    yv = y[finite]
+
+    if method == 'lttb':
+        idx = lttb_indices(xv, yv, n_out)
+    elif method == 'minmax':
+        idx = minmax_indices(yv, n_out // 2)
+    elif method == 'minmax_lttb':
+        if len(yv) > minmax_ratio * n_out * 2:
+            pre = minmax_indices(yv, minmax_ratio * n_out // 2)
+            pre = np.union1d(pre, [0, len(yv) - 1])
+            idx = pre[lttb_indices(xv[pre], yv[pre], n_out)]
+        else:
+            idx = lttb_indices(xv, yv, n_out)
+    else:
+        raise ValueError(f"Método de reducción no soportado: {method}")
+    return finite[idx]
+
+
+def downsample_frame(df: pd.DataFrame, x: str, y: str, n_out: int = DEFAULT_POINTS,
+                     x_range: Optional[Tuple] = None, method: str = 'minmax_lttb') -> pd.DataFrame:
+    """
+    Filas de `df` a dibujar para la serie `y` dentro de `x_range` (ordenadas por x).
+    Al acotar `x_range` (zoom) se vuelve a reducir solo la ventana visible, con
+    lo que aparece el detalle fino.
+    """
+    data = df[[x, y]]
+    if not data[x].is_monotonic_increasing:
+        data = data.sort_values(x, kind='stable')
+    if x_range is not None:
+        xs = data[x].to_numpy()
+        lo = np.searchsorted(xs, np.asarray(x_range[0], dtype=xs.dtype), side='left')
+        hi = np.searchsorted(xs, np.asarray(x_range[1], dtype=xs.dtype), side='right')
+        data = data.iloc[lo:hi]
+    idx = downsample_indices(data[x].to_numpy(), data[y].to_numpy(), n_out, method)
+    return data.iloc[idx]
+
+
+def downsampled_line_figure(df: pd.DataFrame, x: str, y, n_out: int = DEFAULT_POINTS, title: str = '',
+                            x_range: Optional[Tuple] = None, labels: Optional[dict] = None):
+    """
+    Figura Plotly con una traza `Scattergl` (solo líneas) por columna de `y`,
+    cada una reducida a `n_out` puntos.
+    """
+    import plotly.graph_objects as go
+
+    columns = [y] if isinstance(y, str) else list(y)
+    labels = labels or {}
+    fig = go.Figure()
+    total, shown = 0, 0
+    for column in columns:
+        part = downsample_frame(df, x, column, n_out, x_range)
+        total += int(df[column].notna().sum())
+        shown += len(part)
+        fig.add_trace(go.Scattergl(x=part[x], y=part[column], mode='lines', name=labels.get(column, column)))
+    fig.update_layout(
+        title=f"{title} ({shown:,} de {total:,} puntos)" if title else None,
+        xaxis_title=labels.get(x, x),
+        template='plotly_white',
+        hovermode='x unified',
+    )
+    return fig
+
+
+class ResamplingFigure:
+    """
+    `FigureWidget` (Jupyter) que vuelve a reducir cada serie a `n_out` puntos
+    sobre el rango visible cada vez que el usuario hace zoom o pan.
+    """
+
+    def __init__(self, df: pd.DataFrame, x: str, y, n_out: int = DEFAULT_POINTS, title: str = ''):
+        import plotly.graph_objects as go
+
+        self.df = df.sort_values(x, kind='stable') if not df[x].is_monotonic_increasing else df
+        self.x = x
+        self.columns = [y] if isinstance(y, str) else list(y)
+        self.n_out = n_out
+        self.widget = go.FigureWidget(downsampled_line_figure(self.df, x, self.columns, n_out, title))
+        self.widget.layout.on_change(self._on_range, 'xaxis.range', 'xaxis.autorange')
+
+    def _on_range(self, layout, x_range, autorange=None):
+        bounds = None
+        if x_range is not None and not autorange:
+            bounds = tuple(pd.Timestamp(v) if np.issubdtype(self.df[self.x].dtype, np.datetime64) else v
+                           for v in x_range)
+        with self.widget.batch_update():
+            for trace, column in zip(self.widget.data, self.columns):
+                part = downsample_frame(self.df, self.x, column, self.n_out, bounds)
+                trace.x, trace.y = part[self.x], part[column]
+
+    def show(self):
+        from IPython.display import display
+        display(self.widget)
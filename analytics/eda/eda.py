@@ -1,61 +1,92 @@
+# Las librerías de gráficos (matplotlib, seaborn, plotly, ipywidgets) se importan
+# dentro de cada sección: importar este módulo no carga ningún backend.
 import os
+import sys
+import traceback
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-from ipywidgets import interact, widgets
-from datetime import time, timedelta
+from datetime import time
+
+from analytics.aggregation.moments import MomentAccumulator
+from analytics.eda.density import bin_2d, bin_geo, density_heatmap_figure, density_map_figure
+from analytics.eda.missingness import duplicate_count, missingness_profile, plot_missingness
+from analytics.eda.report_cache import ReportCache, ReportSection, section_key
 
 class TruckEDA:
     """
     Clase para realizar análisis exploratorio de datos para camiones.
     Integra análisis estático e interactivo para múltiples tipos de datos.
     """
-    def __init__(self, data_dict: dict, truck_id: str):
+    # Secciones del reporte (las de calidad se expanden a quality_{dataset})
+    SECTIONS = ('quality', 'temporal', 'performance', 'spatial', 'correlation')
+
+    def __init__(self, data_dict: dict, truck_id: str, dpi: int = 300, output_dir: str = None, rollups=None):
         """
         Inicializa el análisis con los datasets procesados.
         
         Args:
             data_dict: Diccionario con los datasets procesados ('sensor', 'time_model', 'cycle')
             truck_id: Identificador del camión a analizar
+            dpi: Resolución de las imágenes estáticas
+            output_dir: Carpeta de salida (por defecto reports/truck_eda/{truck_id})
+            rollups: `RollupStore` opcional; los conteos diarios se leen de él en vez de agrupar registros
         """
         self.data = data_dict
         self.truck_id = truck_id
+        self.dpi = dpi
+        self.rollups = rollups
         # Verificar existencia de datos
         for key, df in self.data.items():
             if df.empty:
                 print(f"⚠️ El dataset '{key}' está vacío")
                 
         # Crear directorio para guardar gráficos
-        self.output_dir = f"reports/truck_eda/{truck_id}"
+        self.output_dir = output_dir or f"reports/truck_eda/{truck_id}"
         os.makedirs(self.output_dir, exist_ok=True)
         
-    def run_full_eda(self):
-        """Ejecuta el análisis exploratorio completo"""
+    def run_full_eda(self, parallel: bool = True, max_workers: int = None, use_cache: bool = True,
+                     sections: list = None):
+        """
+        Ejecuta el análisis exploratorio completo.
+
+        Con `parallel=True` las secciones independientes se renderizan en un pool
+        de procesos y solo se regeneran aquellas cuya porción de datos o
+        parámetros cambió desde la última corrida (ver `ReportCache`).
+        `sections` limita el reporte a un subconjunto de `TruckEDA.SECTIONS`.
+        """
+        wanted = self._selected_sections(sections)
         print(f"\n{'='*50}")
         print(f"🔍 ANÁLISIS EXPLORATORIO PARA CAMIÓN {self.truck_id}")
         print(f"{'='*50}")
         
         # 1. Resumen básico de los datos
         self._print_summary()
+
+        if parallel:
+            # 2-6. Secciones con artefactos, en paralelo y con caché
+            ReportCache(self.output_dir).run(self.report_sections(sections), max_workers, use_cache)
+            print(f"\n✅ Análisis EDA completado. Resultados guardados en: {self.output_dir}")
+            return
         
         # 2. Análisis de integridad y calidad
-        self._analyze_data_quality()
+        if 'quality' in wanted:
+            self._analyze_data_quality()
         
         # 3. Análisis temporal
-        self._temporal_analysis()
+        if 'temporal' in wanted:
+            self._temporal_analysis()
         
         # 4. Análisis de rendimiento operativo
-        self._performance_analysis()
+        if 'performance' in wanted:
+            self._performance_analysis()
         
         # 5. Análisis espacial (si hay coordenadas)
-        self._spatial_analysis()
+        if 'spatial' in wanted:
+            self._spatial_analysis()
         
         # 6. Correlaciones entre variables clave
-        self._correlation_analysis()
+        if 'correlation' in wanted:
+            self._correlation_analysis()
         
         print(f"\n✅ Análisis EDA completado. Resultados guardados en: {self.output_dir}")
     
@@ -83,19 +114,83 @@ def _print_summary(self):
             dtypes = df.dtypes.value_counts()
             print(f"  - Tipos de datos: {dict(dtypes)}")
     
-    def _analyze_data_quality(self):
+    def _selected_sections(self, sections: list = None) -> set:
+        """Valida y normaliza la selección de secciones (None = todas)."""
+        if sections is None:
+            return set(self.SECTIONS)
+        unknown = set(sections) - set(self.SECTIONS)
+        if unknown:
+            raise ValueError(f"Secciones desconocidas: {sorted(unknown)}. Disponibles: {', '.join(self.SECTIONS)}")
+        return set(sections)
+
+    def report_sections(self, sections: list = None) -> list:
+        """
+        Secciones independientes del reporte con la porción mínima de datos que
+        usa cada una (solo eso se envía al proceso y forma la clave de caché).
+        """
+        wanted = self._selected_sections(sections)
+        sensor = self.data.get('sensor')
+        has_sensor = sensor is not None and not sensor.empty
+
+        def columns(*names):
+            return {'sensor': sensor[[c for c in names if c in sensor.columns]]} if has_sensor else {}
+
+        specs = [
+            (f'quality_{key}', '_analyze_data_quality', {key: df}, {'keys': [key]},
+             [f'missing_pattern_{key}.png', f'missing_profile_{key}.csv'])
+            for key, df in self.data.items() if not df.empty
+        ]
+        if has_sensor:
+            numeric = sensor.select_dtypes(include=['number']).columns
+            specs += [
+                ('temporal', '_temporal_analysis', columns('ShiftDate', 'TimeStamp'), {},
+                 ['daily_activity.html', 'hourly_distribution.png']),
+                ('performance', '_performance_analysis', columns('Speed', 'RPM', 'FuelLevel'), {},
+                 ['performance_distributions.png', 'rpm_vs_speed.html']),
+                ('spatial', '_spatial_analysis', columns('Latitude', 'Longitude', 'Speed'), {},
+                 ['trajectories_map.html']),
+                ('correlation', '_correlation_analysis', columns(*numeric), {},
+                 ['correlation_matrix.png']),
+            ]
+
+        # Los procesos reabren el RollupStore desde su carpeta; la versión del
+        # rollup por turno entra en la clave de la sección temporal
+        rollup_root = str(self.rollups.root) if self.rollups is not None else None
+
+        sections = []
+        for name, method, data, kwargs, outputs in specs:
+            if name.split('_', 1)[0] not in wanted:
+                continue
+            params = {'method': method, 'kwargs': kwargs, 'truck': self.truck_id, 'dpi': self.dpi}
+            if name == 'temporal' and self.rollups is not None:
+                params['rollups'] = self._rollup_version()
+            sections.append(ReportSection(
+                name=name,
+                fn=_render_truck_section,
+                args=(method, data, self.truck_id, self.output_dir, self.dpi, kwargs, rollup_root),
+                key=section_key(data, params),
+                outputs=outputs,
+            ))
+        return sections
+
+    def _rollup_version(self):
+        """Carpeta y fecha de modificación del rollup por turno del camión (None si no existe)."""
+        path = self.rollups._rollup_path('shift', self.truck_id)
+        return [str(self.rollups.root), path.stat().st_mtime_ns if path.exists() else None]
+
+    def _analyze_data_quality(self, keys: list = None):
         """Analiza la calidad e integridad de los datos"""
         print("\n🧐 ANÁLISIS DE CALIDAD DE DATOS")
         print("-" * 40)
         
         for key, df in self.data.items():
-            if df.empty:
+            if df.empty or (keys is not None and key not in keys):
                 continue
                 
             print(f"\n• Dataset: {key.upper()}")
             
-            # 1. Valores duplicadoos
-            duplicates = df.duplicated().sum()
+            # 1. Valores duplicados (hash de 64 bits por fila)
+            duplicates = duplicate_count(df)
             print(f"  - Registros duplicados: {duplicates} ({duplicates/len(df)*100:.2f}%)")
             
             # 2. Completitud
@@ -106,14 +201,16 @@ def _analyze_data_quality(self):
             else:
                 print(f"  - Completitud de variables: Todas >98% completas")
             
-            # 3. Visualización de completitud
+            # 3. Visualización de completitud (tasa de nulos por turno y columna)
             if len(df.columns) > 5:  # Solo para datasets con muchas columnas
-                plt.figure(figsize=(10, 6))
-                sns.heatmap(df.isnull(), cbar=False, yticklabels=False, cmap='viridis')
-                plt.title(f'Patrón de valores faltantes - {key.upper()}')
-                plt.tight_layout()
-                plt.savefig(f"{self.output_dir}/missing_pattern_{key}.png", dpi=300)
-                plt.close()
+                profile = missingness_profile(df)
+                profile.to_csv(f"{self.output_dir}/missing_profile_{key}.csv")
+                plot_missingness(
+                    profile,
+                    f"{self.output_dir}/missing_pattern_{key}.png",
+                    title=f'Patrón de valores faltantes - {key.upper()}',
+                    dpi=self.dpi
+                )
     
     def _temporal_analysis(self):
         """Realiza análisis temporal de los datos"""
@@ -123,6 +220,10 @@ def _temporal_analysis(self):
         # Análisis específico para datos de sensores
         sensor_df = self.data.get('sensor')
         if sensor_df is not None and not sensor_df.empty and 'TimeStamp' in sensor_df.columns:
+            import matplotlib.pyplot as plt
+            import plotly.express as px
+            import seaborn as sns
+
             # Preparar datos diarios para histograma
             daily_data = self._prepare_daily_data(sensor_df)
             
@@ -159,13 +260,19 @@ def _temporal_analysis(self):
                 plt.xticks(range(0, 24))
                 plt.grid(axis='y', linestyle='--', alpha=0.7)
                 plt.tight_layout()
-                plt.savefig(f"{self.output_dir}/hourly_distribution.png", dpi=300)
+                plt.savefig(f"{self.output_dir}/hourly_distribution.png", dpi=self.dpi)
                 plt.close()
                 
                 print(f"  • Análisis temporal completado. Se generaron visualizaciones de patrones diarios y horarios.")
     
     def _prepare_daily_data(self, df):
         """Prepara datos para análisis temporal diario"""
+        if self.rollups is not None:
+            from analytics.aggregation.rollups import daily_activity
+            shifts = self.rollups.rollup(self.truck_id, 'shift')
+            if not shifts.empty:
+                return daily_activity(shifts)
+
         # Asumimos que TimeStamp ya está procesado adecuadamente
         temp_df = df.copy()
         
@@ -200,6 +307,8 @@ def _performance_analysis(self):
             
             if available_metrics:
                 print(f"  • Analizando métricas: {', '.join(available_metrics)}")
+                import matplotlib.pyplot as plt
+                import seaborn as sns
                 
                 # Crear subplots para distribuciones
                 fig, axes = plt.subplots(len(available_metrics), 1, figsize=(10, 4*len(available_metrics)))
@@ -221,19 +330,19 @@ def _performance_analysis(self):
                                bbox=dict(facecolor='white', alpha=0.8))
                 
                 plt.tight_layout()
-                plt.savefig(f"{self.output_dir}/performance_distributions.png", dpi=300)
+                plt.savefig(f"{self.output_dir}/performance_distributions.png", dpi=self.dpi)
                 plt.close()
                 
-                # Gráfico interactivo de dispersión RPM vs Speed (si disponibles)
+                # Densidad RPM vs Speed con todos los registros (grilla fija, sin muestreo)
                 if 'RPM' in sensor_df.columns and 'Speed' in sensor_df.columns:
-                    fig = px.scatter(
-                        sensor_df.sample(min(10000, len(sensor_df))),  # Muestreo para rendimiento
-                        x='RPM', 
-                        y='Speed',
-                        color='FuelLevel' if 'FuelLevel' in sensor_df.columns else None,
-                        opacity=0.6,
+                    grid = bin_2d(
+                        sensor_df['RPM'], sensor_df['Speed'], width=300, height=200,
+                        values=sensor_df['FuelLevel'] if 'FuelLevel' in sensor_df.columns else None
+                    )
+                    fig = density_heatmap_figure(
+                        grid,
                         title=f'Relación RPM vs Velocidad - Camión {self.truck_id}',
-                        template='plotly_white'
+                        x_label='RPM', y_label='Speed', value_label='FuelLevel'
                     )
                     fig.write_html(f"{self.output_dir}/rpm_vs_speed.html")
     
@@ -256,16 +365,15 @@ def _spatial_analysis(self):
                 if len(geo_df) > 0:
                     print(f"  • Registros con coordenadas válidas: {len(geo_df):,}")
                     
-                    # Mapa interactivo de trayectorias
-                    fig = px.scatter_mapbox(
-                        geo_df.sample(min(5000, len(geo_df))),  # Muestreo para rendimiento
-                        lat='Latitude',
-                        lon='Longitude',
-                        color='Speed' if 'Speed' in geo_df.columns else None,
-                        size_max=10,
-                        zoom=12,
+                    # Mapa de trayectorias: todas las posiciones agregadas en celdas
+                    grid = bin_geo(
+                        geo_df['Latitude'], geo_df['Longitude'], width=300,
+                        values=geo_df['Speed'] if 'Speed' in geo_df.columns else None
+                    )
+                    fig = density_map_figure(
+                        grid,
                         title=f'Trayectorias del camión {self.truck_id}',
-                        mapbox_style="carto-positron"
+                        value_label='Velocidad media'
                     )
                     fig.write_html(f"{self.output_dir}/trajectories_map.html")
                 else:
@@ -288,8 +396,11 @@ def _correlation_analysis(self):
             corr_cols = [col for col in numeric_cols if col not in exclude_cols]
             
             if len(corr_cols) >= 2:
-                # Matriz de correlación
-                corr_matrix = sensor_df[corr_cols].corr()
+                import matplotlib.pyplot as plt
+                import seaborn as sns
+
+                # Matriz de correlación desde co-momentos acumulados por bloques
+                corr_matrix = MomentAccumulator(corr_cols).update(sensor_df).corr()
                 
                 plt.figure(figsize=(10, 8))
                 mask = np.triu(np.ones_like(corr_matrix, dtype=bool))
@@ -305,7 +416,7 @@ def _correlation_analysis(self):
                 )
                 plt.title(f'Correlaciones entre variables operativas - Camión {self.truck_id}')
                 plt.tight_layout()
-                plt.savefig(f"{self.output_dir}/correlation_matrix.png", dpi=300)
+                plt.savefig(f"{self.output_dir}/correlation_matrix.png", dpi=self.dpi)
                 plt.close()
                 
                 print(f"  • Matriz de correlación generada con {len(corr_cols)} variables")
@@ -319,6 +430,9 @@ def generate_interactive_dashboard(self):
             print("❌ No hay datos de sensores disponibles para el dashboard interactivo")
             return
         
+        import plotly.express as px
+        from ipywidgets import interact, widgets
+
         # Función para generar histograma diario interactivo
         def plot_daily_histogram_interactive(df):
             # Prepara datos
@@ -371,6 +485,24 @@ def plot_histogram(Mes):
                 
         return plot_daily_histogram_interactive(sensor_df)
 
+def _render_truck_section(method: str, data: dict, truck_id: str, output_dir: str, dpi: int, kwargs: dict,
+                          rollup_root: str = None):
+    """Ejecuta una sección de TruckEDA en un proceso del pool con solo su porción de datos."""
+    import matplotlib
+    matplotlib.use('Agg')
+
+    eda = TruckEDA.__new__(TruckEDA)
+    eda.data = data
+    eda.truck_id = truck_id
+    eda.output_dir = output_dir
+    eda.dpi = dpi
+    eda.rollups = None
+    if rollup_root is not None:
+        from analytics.aggregation.rollups import RollupStore
+        eda.rollups = RollupStore(rollup_root)
+    getattr(eda, method)(**kwargs)
+
+
 # Función de ejecución principal
 def run_truck_eda(processed_data: dict, truck_id: str, interactive: bool = False):
     """
@@ -397,11 +529,15 @@ def run_truck_eda(processed_data: dict, truck_id: str, interactive: bool = False
 # Ejemplo de uso:
 # ---------------
 # # 1. Cargar y procesar datos con ETLDataProcessor
-etl = ETLDataProcessor(truck="T-210")
-processed_data = etl.run_etl()
+# etl = ETLDataProcessor(truck="T-210")
+# processed_data = etl.run_etl()
 #
 # # 2. Ejecutar análisis exploratorio
-run_truck_eda(processed_data, "T-210", interactive=True)
+# run_truck_eda(processed_data, "T-210", interactive=True)
+#
+# # Toda la flota en paralelo, con caché de datos procesados (ver fleet.py)
+# # (loader: función de módulo, p. ej. def cargar(t): return ETLDataProcessor(t).run_etl())
+# run_fleet_eda(["T-210", "T-234"], loader=cargar)
 
 
 
@@ -433,14 +569,21 @@ def run_truck_eda(processed_data: dict, truck_id: str, interactive: bool = False
 # =============================================
 # Block 5 - Exploratory Data Analysis (EDA)
 # =============================================
-import matplotlib.pyplot as plt
-import seaborn as sns
-import plotly.express as px
-from pandas.api.types import is_numeric_dtype
-
 class AdvancedEDA:
-    def __init__(self, df: pd.DataFrame):
+    def __init__(self, df: pd.DataFrame, sketches=None, moments=None):
+        """
+        Args:
+            df: Datos en formato largo (created_at_local, truck, metric, value, ...)
+            sketches: SketchStore opcional; si tiene las mismas particiones
+                camión/ventana que `df`, los cuartiles de outliers salen de fusionar
+                sus sketches en vez de la columna completa
+            moments: MomentAccumulator opcional (p. ej. fusión de particiones por
+                camión y fecha); si se indica, el resumen numérico, las correlaciones
+                y los límites z-score salen de él sin recorrer `df`
+        """
         self.df = df
+        self.sketches = sketches
+        self.moments = moments
         self.numeric_cols = df.select_dtypes(include=['number']).columns.tolist()
         self.categorical_cols = df.select_dtypes(include=['object', 'category']).columns.tolist()
         
@@ -478,7 +621,10 @@ def _show_basic_stats(self):
         
         # 1. Columnas numéricas
         print("\n[Variables Numéricas]")
-        print(self.df.describe(include='number').to_string())
+        if self.moments is not None:
+            print(self.moments.describe().to_string())
+        else:
+            print(self.df.describe(include='number').to_string())
         
         # 2. Datetime específico usando método alternativo
         print("\n[Variable Temporal]")
@@ -499,13 +645,22 @@ def _temporal_analysis(self, temporal_col: str, save_path: str):
         """Analiza patrones temporales con visualizaciones interactivas."""
         print("\n⏳ Análisis Temporal:")
         
-        # Densidad temporal por métrica
-        fig = px.density_heatmap(
-            self.df,
-            x=temporal_col,
-            y='metric',
-            title='Densidad de Registros por Hora y Métrica'
-        )
+        import matplotlib.pyplot as plt
+        import plotly.graph_objects as go
+        import seaborn as sns
+
+        # Densidad temporal por métrica (agregada antes de dibujar)
+        metric_codes, metric_names = pd.factorize(self.df['metric'], sort=True)
+        times = self.df[temporal_col].to_numpy(dtype='datetime64[ns]').astype('int64')
+        grid = bin_2d(times, metric_codes, width=500, height=len(metric_names),
+                      y_range=(-0.5, len(metric_names) - 0.5))
+        fig = go.Figure(go.Heatmap(
+            z=grid.counts,
+            x=pd.to_datetime(grid.x_centers),
+            y=list(metric_names),
+            colorscale='Viridis'
+        ))
+        fig.update_layout(title='Densidad de Registros por Hora y Métrica', template='plotly_white')
         fig.write_html(f"{save_path}/temporal_density.html")
         
         # Tendencia temporal de valores
@@ -527,6 +682,9 @@ def _temporal_analysis(self, temporal_col: str, save_path: str):
     def _distribution_analysis(self, value_col: str, save_path: str):
         """Analiza distribuciones de variables clave."""
         print("\n📈 Análisis de Distribuciones:")
+        import matplotlib.pyplot as plt
+        import plotly.express as px
+        import seaborn as sns
         
         # Distribución multimodal por métrica
         g = sns.FacetGrid(self.df, col='metric', col_wrap=3, sharey=False)
@@ -550,9 +708,14 @@ def _correlation_analysis(self, save_path: str):
             return
             
         print("\n🧩 Análisis de Correlaciones:")
+        import matplotlib.pyplot as plt
+        import seaborn as sns
         
         # Matriz de correlación
-        corr_matrix = self.df[self.numeric_cols].corr(numeric_only=True)
+        if self.moments is not None:
+            corr_matrix = self.moments.corr()
+        else:
+            corr_matrix = self.df[self.numeric_cols].corr(numeric_only=True)
         plt.figure(figsize=(10, 8))
         sns.heatmap(corr_matrix, annot=True, cmap='coolwarm', center=0)
         plt.title('Matriz de Correlación Numérica')
@@ -564,8 +727,12 @@ def _outlier_detection(self, value_col: str, save_path: str):
         print("\n🔍 Detección de Outliers:")
         
         # Identificación usando IQR
-        Q1 = self.df[value_col].quantile(0.25)
-        Q3 = self.df[value_col].quantile(0.75)
+        quartiles = self._sketch_quartiles(value_col) if self.sketches is not None else None
+        if quartiles is not None:
+            Q1, Q3 = quartiles
+        else:
+            Q1 = self.df[value_col].quantile(0.25)
+            Q3 = self.df[value_col].quantile(0.75)
         IQR = Q3 - Q1
         outliers = self.df[(self.df[value_col] < (Q1 - 1.5 * IQR)) | 
                    (self.df[value_col] > (Q3 + 1.5 * IQR))]
@@ -580,6 +747,24 @@ def _outlier_detection(self, value_col: str, save_path: str):
         else:
             print("✅ No se detectaron outliers significativos")
 
+        # Complemento z-score con media y desviación de los momentos acumulados
+        if self.moments is not None and value_col in self.moments.columns:
+            bounds = self.moments.zscore_bounds(3.0).loc[value_col]
+            n_z = int(((self.df[value_col] < bounds['lower']) | (self.df[value_col] > bounds['upper'])).sum())
+            print(f"• Fuera de ±3σ ({bounds['lower']:.2f} a {bounds['upper']:.2f}): {n_z:,}")
+
+    def _sketch_quartiles(self, value_col: str):
+        """
+        Q1 y Q3 de los sketches de las mismas particiones camión/ventana que
+        `self.df`. Si los sketches no resumen exactamente esas filas (ventanas
+        parciales o sin sketch), devuelve None y se usan cuantiles exactos.
+        """
+        digest = self.sketches.query(value_col, keys=self.sketches.window_keys(self.df))
+        if digest.count != self.df[value_col].notna().sum():
+            print("ℹ️ Los sketches no cubren exactamente los datos; se usan cuantiles exactos")
+            return None
+        return digest.quantile([0.25, 0.75])
+
 # =============================================
 # Bloque Principal Integrado
 # =============================================
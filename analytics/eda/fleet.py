@@ -0,0 +1,228 @@
+# =============================================
+# EDA de flota: caché compartida, análisis concurrente y resumen comparativo
+# =============================================
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from analytics.aggregation.moments import MomentAccumulator
+from analytics.eda.missingness import duplicate_count
+from analytics.feature_engineering.fuel_consumption import FuelConsumptionEngine
+
+PROCESSED_ROOT = os.path.join("..", "data-set", "processed")
+DATA_TYPES = ('sensor', 'time_model', 'cycle')
+QUALITY_COLUMNS = ['Speed', 'RPM', 'FuelLevelLiters', 'Latitude', 'Longitude']
+MOMENT_COLUMNS = ['Speed', 'RPM', 'FuelLevelLiters']
+SPEED_BIN_KMH = 5.0
+# Filas por row group: con los datos ordenados por tiempo, un filtro por rango
+# de fechas solo lee los row groups que lo intersectan
+ROW_GROUP_ROWS = 50_000
+
+
+class ProcessedDataCache:
+    """
+    Caché en disco de los datasets procesados por el ETL, compartida entre
+    procesos y corridas:
+
+        {root}/{data_type}/Equipment={camión}/part.parquet
+
+    `loader(camión)` (p. ej. `lambda t: ETLDataProcessor(t).run_etl()`) solo se
+    invoca si el camión aún no está en caché.
+    """
+
+    def __init__(self, root: Union[str, Path] = PROCESSED_ROOT,
+                 loader: Optional[Callable[[str], Dict[str, pd.DataFrame]]] = None):
+        self.root = Path(root)
+        self.loader = loader
+
+    def path(self, data_type: str, truck: str) -> Path:
+        return self.root / data_type / f"Equipment={truck}" / "part.parquet"
+
+    def trucks(self) -> List[str]:
+        """Camiones con al menos un dataset en caché."""
+        found = {p.parent.name.split("=", 1)[1] for p in self.root.glob("*/Equipment=*/part.parquet")}
+        return sorted(found)
+
+    def contains(self, truck: str) -> bool:
+        return any(self.path(data_type, truck).exists() for data_type in DATA_TYPES)
+
+    def get(self, truck: str, refresh: bool = False) -> Dict[str, pd.DataFrame]:
+        if not refresh and self.contains(truck):
+            return {
+                data_type: pd.read_parquet(self.path(data_type, truck)) if self.path(data_type, truck).exists()
+                else pd.DataFrame()
+                for data_type in DATA_TYPES
+            }
+        if self.loader is None:
+            raise FileNotFoundError(f"No hay datos procesados en caché para {truck} y no se indicó loader")
+
+        data = self.loader(truck)
+        self.put(truck, data)
+        return data
+
+    def put(self, truck: str, data: Dict[str, pd.DataFrame]):
+        for data_type, df in data.items():
+            if df is None or df.empty:
+                continue
+            path = self.path(data_type, truck)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(".tmp")
+            if 'FullDateTime' in df.columns:
+                df = df.sort_values('FullDateTime', kind='stable')
+            try:
+                df.to_parquet(tmp, index=False, row_group_size=ROW_GROUP_ROWS)
+                os.replace(tmp, path)
+            except Exception as e:
+                # La caché es una optimización: si un tipo no es serializable se sigue sin ella
+                print(f"⚠️ No se pudo guardar {data_type} de {truck} en caché: {str(e)}")
+                if tmp.exists():
+                    tmp.unlink()
+
+
+def truck_summary(data: Dict[str, pd.DataFrame], truck: str) -> dict:
+    """Indicadores comparables de un camión: consumo, velocidad y calidad de datos."""
+    sensor = data.get('sensor', pd.DataFrame())
+    summary = {'Equipment': truck, 'records': int(len(sensor))}
+    if sensor.empty:
+        return summary
+
+    if 'ShiftDate' in sensor.columns:
+        summary['days'] = int(pd.to_datetime(sensor['ShiftDate']).dt.normalize().nunique())
+
+    # Consumo de combustible (L/h) a partir del nivel del estanque
+    if {'FuelLevelLiters', 'FullDateTime'}.issubset(sensor.columns):
+        sensor = sensor if 'Equipment' in sensor.columns else sensor.assign(Equipment=truck)
+        intervals = FuelConsumptionEngine(max_workers=1).compute_intervals(sensor)
+        hours = intervals['duration_s'].sum() / 3600.0
+        summary['fuel_consumed_l'] = float(intervals['consumed_l'].sum())
+        summary['fuel_l_per_hour'] = summary['fuel_consumed_l'] / hours if hours > 0 else np.nan
+        summary['refuel_events'] = int(intervals['is_refuel'].sum())
+        summary['suspicious_drop_l'] = float(intervals['suspicious_drop_l'].sum())
+
+    # Distribución de velocidad (solo en movimiento)
+    if 'Speed' in sensor.columns:
+        speed = pd.to_numeric(sensor['Speed'], errors='coerce').to_numpy(dtype=float)
+        moving = speed[np.isfinite(speed) & (speed > 0)]
+        summary['moving_share'] = float(len(moving) / len(speed)) if len(speed) else np.nan
+        if len(moving):
+            p50, p90, p99 = np.percentile(moving, [50, 90, 99])
+            summary.update(speed_p50=p50, speed_p90=p90, speed_p99=p99)
+            top = np.ceil(moving.max() / SPEED_BIN_KMH) * SPEED_BIN_KMH
+            counts, edges = np.histogram(moving, bins=np.arange(0, top + SPEED_BIN_KMH, SPEED_BIN_KMH))
+            summary['speed_histogram'] = dict(zip(edges[:-1].tolist(), counts.tolist()))
+
+    # Calidad: columnas clave con valor útil (el ETL rellena nulos con 0) y duplicados
+    columns = [c for c in QUALITY_COLUMNS if c in sensor.columns]
+    if columns:
+        values = sensor[columns].apply(pd.to_numeric, errors='coerce')
+        usable = (values.notna() & (values != 0)).mean()
+        # Speed = 0 es un valor legítimo (detenido): solo cuenta como faltante si es nulo
+        if 'Speed' in usable.index:
+            usable['Speed'] = values['Speed'].notna().mean()
+        summary['completeness'] = float(usable.mean())
+    summary['duplicate_rate'] = duplicate_count(sensor) / len(sensor)
+
+    # Momentos fusionables: la correlación de flota sale de combinarlos sin releer datos
+    summary['moments'] = MomentAccumulator(MOMENT_COLUMNS).update(sensor.reindex(columns=MOMENT_COLUMNS))
+    summary['quality_score'] = summary.get('completeness', 1.0) * (1 - summary['duplicate_rate'])
+    return summary
+
+
+def _analyze_truck(truck: str, cache_root: str, loader: Optional[Callable], render_reports: bool,
+                   reports_dir: str) -> dict:
+    """Tarea por camión para el pool: carga desde caché, reporte individual y resumen."""
+    data = ProcessedDataCache(cache_root, loader).get(truck)
+    if render_reports:
+        import matplotlib
+        matplotlib.use('Agg')
+        from analytics.eda.eda import TruckEDA
+
+        eda = TruckEDA(data, truck, output_dir=os.path.join(reports_dir, truck))
+        eda.run_full_eda(parallel=False)
+    return truck_summary(data, truck)
+
+
+def compare_fleet(summaries: Iterable[dict]) -> Dict[str, pd.DataFrame]:
+    """
+    Tabla comparativa con rankings (1 = mejor), distribución de velocidad de
+    todos los camiones sobre los mismos intervalos de 5 km/h y correlación de
+    flota a partir de los momentos fusionados de cada camión.
+    """
+    summaries = list(summaries)
+    histograms = {s['Equipment']: s.get('speed_histogram', {}) for s in summaries}
+    moments = [s['moments'] for s in summaries if 'moments' in s]
+    correlation = MomentAccumulator.merged(moments).corr() if moments else pd.DataFrame()
+    table = pd.DataFrame([{k: v for k, v in s.items() if k not in ('speed_histogram', 'moments')}
+                          for s in summaries])
+    if table.empty:
+        return {'summary': table, 'speed_distribution': pd.DataFrame(), 'correlation': correlation}
+    table = table.set_index('Equipment').sort_index()
+
+    rankings = {'fuel_l_per_hour': True, 'quality_score': False, 'speed_p50': False}
+    for column, ascending in rankings.items():
+        if column in table.columns:
+            table[f'rank_{column}'] = table[column].rank(ascending=ascending, method='min')
+    if 'fuel_l_per_hour' in table.columns:
+        fleet_median = table['fuel_l_per_hour'].median()
+        table['fuel_vs_fleet'] = table['fuel_l_per_hour'] / fleet_median - 1 if fleet_median else np.nan
+
+    distribution = pd.DataFrame(histograms).T.fillna(0).sort_index(axis=1)
+    if not distribution.empty:
+        distribution = distribution.div(distribution.sum(axis=1), axis=0)
+        distribution.columns = [f"{int(c)}-{int(c + SPEED_BIN_KMH)} km/h" for c in distribution.columns]
+        distribution.index.name = 'Equipment'
+    return {'summary': table, 'speed_distribution': distribution, 'correlation': correlation}
+
+
+def run_fleet_eda(trucks: Optional[Iterable[str]] = None, loader: Optional[Callable] = None,
+                  cache_root: str = PROCESSED_ROOT, output_dir: str = "reports/fleet_eda",
+                  max_workers: Optional[int] = None, render_reports: bool = True) -> Dict[str, pd.DataFrame]:
+    """
+    EDA de toda la flota: cada camión se analiza en un proceso distinto (carga
+    desde la caché compartida, reporte individual y resumen) y al final se
+    genera el comparativo ordenado por consumo.
+
+    Args:
+        trucks: Camiones a analizar (por defecto, todos los de la caché)
+        loader: Función camión -> datasets procesados, para camiones fuera de caché
+            (debe ser una función de módulo para poder enviarse al pool)
+        cache_root: Raíz de la caché de datos procesados
+        output_dir: Carpeta del comparativo y de los reportes por camión
+        max_workers: Procesos en paralelo (None = núcleos disponibles)
+        render_reports: Si es False solo se calculan los resúmenes
+    """
+    trucks = sorted(trucks) if trucks is not None else ProcessedDataCache(cache_root).trucks()
+    if not trucks:
+        raise ValueError("No hay camiones para analizar")
+    os.makedirs(output_dir, exist_ok=True)
+    print(f"\n🚚 EDA de flota: {len(trucks)} camiones")
+
+    summaries = []
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(_analyze_truck, truck, cache_root, loader, render_reports, output_dir): truck
+            for truck in trucks
+        }
+        for future in as_completed(futures):
+            truck = futures[future]
+            try:
+                summaries.append(future.result())
+                print(f"✅ {truck} analizado")
+            except Exception as e:
+                print(f"❌ Error en {truck}: {str(e)}")
+
+    result = compare_fleet(summaries)
+    result['summary'].to_csv(os.path.join(output_dir, "fleet_summary.csv"))
+    result['speed_distribution'].to_csv(os.path.join(output_dir, "speed_distribution.csv"))
+    result['correlation'].to_csv(os.path.join(output_dir, "fleet_correlation.csv"))
+
+    if 'fuel_l_per_hour' in result['summary'].columns:
+        print("\n📊 Ranking de consumo (L/h):")
+        columns = [c for c in ('fuel_l_per_hour', 'fuel_vs_fleet', 'speed_p50', 'quality_score')
+                   if c in result['summary'].columns]
+        print(result['summary'].sort_values('fuel_l_per_hour')[columns].round(3).to_string())
+    return result
@@ -0,0 +1,83 @@
+# =============================================
+# Perfil agregado de valores faltantes y duplicados
+# =============================================
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+
+def time_bins(df: pd.DataFrame, freq: Optional[str] = None, time_col: str = 'FullDateTime') -> pd.Series:
+    """
+    Etiqueta de intervalo por fila: turno ("2024-03-01 A") si hay ShiftDate y
+    Shift, o `time_col` truncado a `freq` en caso contrario.
+    """
+    if freq is None and {'ShiftDate', 'Shift'}.issubset(df.columns):
+        dates = pd.to_datetime(df['ShiftDate'], errors='coerce').dt.strftime('%Y-%m-%d')
+        return (dates + ' ' + df['Shift'].astype(str)).rename('bin')
+    if time_col in df.columns:
+        return pd.to_datetime(df[time_col], errors='coerce').dt.floor(freq or 'D').rename('bin')
+    if 'ShiftDate' in df.columns:
+        return pd.to_datetime(df['ShiftDate'], errors='coerce').dt.floor(freq or 'D').rename('bin')
+    raise KeyError("Se requiere ShiftDate/Shift o una columna temporal para agrupar")
+
+
+def missingness_profile(df: pd.DataFrame, freq: Optional[str] = None,
+                        time_col: str = 'FullDateTime') -> pd.DataFrame:
+    """
+    Tasa de nulos por intervalo (filas) y columna en una sola agregación.
+
+    Usa `GroupBy.count` (no nulos por columna) en lugar de materializar
+    `df.isnull()`, así que la memoria es O(intervalos x columnas).
+    """
+    bins = time_bins(df, freq, time_col)
+    grouped = df.groupby(bins, sort=True, dropna=False)
+    present = grouped.count()
+    rows = grouped.size()
+    profile = 1.0 - present.div(rows, axis=0)
+    profile.insert(0, 'n_rows', rows)
+    return profile
+
+
+def duplicate_count(df: pd.DataFrame, subset: Optional[Sequence[str]] = None) -> int:
+    """Filas duplicadas comparando un hash de 64 bits por fila en lugar de todas las columnas."""
+    if df.empty:
+        return 0
+    frame = df[list(subset)] if subset is not None else df
+    hashes = pd.util.hash_pandas_object(frame, index=False)
+    return int(hashes.duplicated().sum())
+
+
+def plot_missingness(profile: pd.DataFrame, path: str, title: str = 'Valores faltantes',
+                     max_bins: int = 400, dpi: int = 150):
+    """
+    Heatmap compacto (columnas x intervalos) a partir del perfil agregado.
+    Si hay más de `max_bins` intervalos se promedian en bloques contiguos.
+    """
+    import matplotlib.pyplot as plt
+
+    rates = profile.drop(columns='n_rows', errors='ignore')
+    rates = rates.loc[:, rates.to_numpy().max(axis=0, initial=0.0) > 0] if not rates.empty else rates
+    if rates.empty:
+        return None
+    if len(rates) > max_bins:
+        block = np.arange(len(rates)) // int(np.ceil(len(rates) / max_bins))
+        weights = profile['n_rows'].to_numpy() if 'n_rows' in profile else np.ones(len(rates))
+        labels = rates.index.to_series().groupby(block).first()
+        rates = rates.mul(weights, axis=0).groupby(block).sum().div(
+            pd.Series(weights).groupby(block).sum().to_numpy(), axis=0)
+        rates.index = labels.to_numpy()
+
+    fig, ax = plt.subplots(figsize=(12, max(2.5, 0.35 * rates.shape[1] + 1.5)))
+    image = ax.imshow(rates.T.to_numpy(), aspect='auto', cmap='viridis', vmin=0, vmax=1, interpolation='nearest')
+    ax.set_yticks(range(rates.shape[1]))
+    ax.set_yticklabels(rates.columns)
+    ticks = np.linspace(0, len(rates) - 1, min(len(rates), 10)).astype(int)
+    ax.set_xticks(ticks)
+    ax.set_xticklabels([str(rates.index[i])[:16] for i in ticks], rotation=45, ha='right')
+    fig.colorbar(image, ax=ax, label='Tasa de nulos')
+    ax.set_title(title)
+    fig.tight_layout()
+    fig.savefig(path, dpi=dpi)
+    plt.close(fig)
+    return path
@@ -0,0 +1,132 @@
+# =============================================
+# Render paralelo y en caché de secciones de reportes EDA
+# =============================================
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence
+
+import pandas as pd
+
+CACHE_FILE = ".eda_cache.json"
+
+
+def frame_fingerprint(df: pd.DataFrame) -> str:
+    """Huella de contenido de un DataFrame: columnas, tipos, largo y hash de sus filas."""
+    h = hashlib.sha1()
+    h.update(json.dumps([list(map(str, df.columns)), list(map(str, df.dtypes)), len(df)]).encode('utf-8'))
+    if len(df) and len(df.columns):
+        h.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+def section_key(data: Dict[str, pd.DataFrame], params: Optional[dict] = None) -> str:
+    """Clave de caché de una sección: huella de su porción de datos + parámetros."""
+    h = hashlib.sha1()
+    for name in sorted(data):
+        h.update(name.encode('utf-8'))
+        h.update(frame_fingerprint(data[name]).encode('utf-8'))
+    h.update(json.dumps(params or {}, sort_keys=True, default=str).encode('utf-8'))
+    return h.hexdigest()
+
+
+class ReportSection(NamedTuple):
+    """
+    Sección independiente de un reporte.
+
+    `fn(*args)` debe ser seleccionable (función de módulo) porque se ejecuta en
+    otro proceso; `outputs` son los nombres de archivo que puede generar.
+    """
+    name: str
+    fn: Callable
+    args: tuple
+    key: str
+    outputs: Sequence[str]
+
+
+def _render(fn: Callable, args: tuple, output_dir: str, outputs: Sequence[str]) -> List[str]:
+    """Ejecuta la sección y devuelve los archivos que escribió en esta corrida."""
+    start = time.time() - 1.0
+    fn(*args)
+    written = []
+    for name in outputs:
+        path = os.path.join(output_dir, name)
+        if os.path.exists(path) and os.path.getmtime(path) >= start:
+            written.append(name)
+    return written
+
+
+class ReportCache:
+    """
+    Manifiesto `{output_dir}/.eda_cache.json` con la clave y los archivos de cada
+    sección. Una sección se reutiliza si su clave no cambió y sus archivos siguen
+    existiendo; las demás se renderizan en paralelo en un pool de procesos.
+    """
+
+    def __init__(self, output_dir: str):
+        self.output_dir = output_dir
+        self.path = os.path.join(output_dir, CACHE_FILE)
+        self.manifest = self._load()
+
+    def _load(self) -> dict:
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save(self):
+        os.makedirs(self.output_dir, exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, indent=2, sort_keys=True)
+        os.replace(tmp, self.path)
+
+    def is_fresh(self, section: ReportSection) -> bool:
+        entry = self.manifest.get(section.name)
+        if entry is None or entry.get('key') != section.key:
+            return False
+        return all(os.path.exists(os.path.join(self.output_dir, name)) for name in entry.get('outputs', []))
+
+    def record(self, section: ReportSection, outputs: List[str]):
+        self.manifest[section.name] = {'key': section.key, 'outputs': sorted(outputs)}
+
+    def run(self, sections: List[ReportSection], max_workers: Optional[int] = None,
+            use_cache: bool = True) -> Dict[str, str]:
+        """
+        Renderiza las secciones desactualizadas.
+
+        Returns:
+            {sección: 'cached' | 'rendered' | 'error'}
+        """
+        status = {}
+        pending = []
+        for section in sections:
+            if use_cache and self.is_fresh(section):
+                status[section.name] = 'cached'
+            else:
+                pending.append(section)
+
+        if pending:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                futures = {
+                    executor.submit(_render, s.fn, s.args, self.output_dir, s.outputs): s for s in pending
+                }
+                for future in as_completed(futures):
+                    section = futures[future]
+                    try:
+                        self.record(section, future.result())
+                        status[section.name] = 'rendered'
+                    except Exception as e:
+                        print(f"❌ Error en la sección {section.name}: {str(e)}")
+                        self.manifest.pop(section.name, None)
+                        status[section.name] = 'error'
+            self.save()
+
+        cached = sum(1 for s in status.values() if s == 'cached')
+        print(f"🗂️ Secciones en caché: {cached}, regeneradas: {len(status) - cached}")
+        return status
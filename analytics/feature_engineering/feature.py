@@ -1,9 +1,24 @@
 # =============================================
 # Block 5 - Advanced Feature Engineering & Aggregation
 # =============================================
+from typing import Optional
+
+import numpy as np
+import pandas as pd
 from scipy import stats
 from sklearn.preprocessing import KBinsDiscretizer
 
+from analytics.feature_engineering.preprocessing_artifacts import PreprocessingArtifacts
+
+AGG_COLUMNS = ['value_mean', 'value_max', 'value_p95', 'speed_mean', 'speed_std', 'speed_max', 'fleet']
+SPEED_LABELS = [
+    'Muy Baja', 
+    'Baja', 
+    'Media', 
+    'Alta', 
+    'Muy Alta'
+]
+
 def prepare_visualization_data(df: pd.DataFrame) -> pd.DataFrame:
     """
     Transforma los datos crudos en un dataset listo para visualización mediante:
@@ -31,27 +46,20 @@ def calculate_optimal_freq(ts_series):
         if freq: 
             return freq
         intervals = ts_series.diff().dropna().dt.total_seconds()
-        mode = stats.mode(intervals).mode[0]
+        mode = float(stats.mode(intervals, keepdims=False).mode)
         return f'{int(mode)}S' if mode < 60 else f'{int(mode/60)}T'
 
     # Agregación por camión y flota
     agg_config = {
         'value': ['mean', 'max', lambda x: x.quantile(0.95)],
         'speed': ['mean', 'std', 'max'],
-        'metric': 'first',
         'fleet': 'first'
     }
     
     df_agg = (
         df.groupby(['truck', 'metric', pd.Grouper(key='timestamp', freq=calculate_optimal_freq(df['timestamp']))])
         .agg(agg_config)
-        .rename(columns={
-            '<lambda_0>': 'value_p95',
-            'mean': 'speed_mean',
-            'std': 'speed_std',
-            'max': 'speed_max'
-        })
-        .droplevel(0, axis=1)  # Eliminar nivel multiindex
+        .set_axis(AGG_COLUMNS, axis=1)  # Aplanar el multiindex de columnas
         .reset_index()
     )
     
@@ -69,21 +77,14 @@ def calculate_optimal_freq(ts_series):
         df_agg[['speed_mean']]
     ).astype(int)
     
-    speed_labels = [
-        'Muy Baja', 
-        'Baja', 
-        'Media', 
-        'Alta', 
-        'Muy Alta'
-    ]
     df_agg['speed_category'] = (
         df_agg['speed_category']
-        .map(dict(enumerate(speed_labels)))
+        .map(dict(enumerate(SPEED_LABELS)))
     )
     
     # 5.3.2 Características de tendencia
     df_agg['value_rolling'] = (
-        df_agg.groupby(['truck', 'metric'])['value']
+        df_agg.groupby(['truck', 'metric'])['value_mean']
         .transform(lambda x: x.rolling(5, min_periods=1).mean())
     )
     
@@ -96,24 +97,111 @@ def calculate_optimal_freq(ts_series):
     # --------------------------------------------------
     # 5.4 Validación y control de calidad
     # --------------------------------------------------
-    # Validación de integridad
-    assert df_agg['timestamp'].is_monotonic_increasing, "Error en orden temporal"
+    _quality_report(len(df), df_agg)
+    
+    return df_agg
+
+
+def _quality_report(n_original: int, df_agg: pd.DataFrame):
+    """Validación de integridad y reporte de calidad de la agregación."""
+    # Validación de integridad (orden temporal dentro de cada serie)
+    assert df_agg.groupby(['truck', 'metric'])['timestamp'].is_monotonic_increasing.all(), "Error en orden temporal"
     
     # Reporte de calidad
     print("\n✅ Transformación completada:")
-    print(f"- Registros originales: {len(df):,}")
+    print(f"- Registros originales: {n_original:,}")
     print(f"- Registros transformados: {len(df_agg):,}")
-    print(f"- Reducción de datos: {len(df)/len(df_agg):.1f}x")
+    print(f"- Reducción de datos: {n_original/len(df_agg):.1f}x")
     
     print("\n📊 Distribución temporal:")
     print(pd.crosstab(
         df_agg['timestamp'].dt.hour,
         df_agg['metric'],
-        values=df_agg['value'],
+        values=df_agg['value_mean'],
         aggfunc='mean'
     ).to_string())
     
     print("\n🔍 Balance de categorías de velocidad:")
     print(df_agg['speed_category'].value_counts(normalize=True).to_string())
-    
-    return df_agg
\ No newline at end of file
+
+
+# =============================================
+# Versión con kernels nativos (sin lambdas por grupo)
+# =============================================
+def optimal_freq(timestamps: pd.Series) -> str:
+    """
+    Misma regla que `calculate_optimal_freq`, pero ordenando solo los enteros
+    del índice temporal en lugar de todo el DataFrame.
+    """
+    values = np.sort(timestamps.dropna().to_numpy(dtype='datetime64[ns]'))
+    head = pd.DatetimeIndex(values[:1000])
+    if timestamps.dt.tz is not None:
+        head = head.tz_localize('UTC').tz_convert(timestamps.dt.tz)
+    freq = pd.infer_freq(head)
+    if freq:
+        return freq
+    intervals = np.diff(values).astype('timedelta64[ns]').astype(np.int64) / 1e9
+    uniques, counts = np.unique(intervals, return_counts=True)
+    mode = uniques[np.argmax(counts)]
+    return f'{int(mode)}S' if mode < 60 else f'{int(mode/60)}T'
+
+
+def prepare_visualization_data_fast(df: pd.DataFrame, verbose: bool = True,
+                                    artifacts: Optional[PreprocessingArtifacts] = None) -> pd.DataFrame:
+    """
+    Equivalente a `prepare_visualization_data` usando solo kernels agrupados nativos.
+
+    - El percentil 95 usa `GroupBy.quantile` en lugar de una lambda por grupo.
+    - La media móvil usa `GroupBy.rolling` en lugar de `transform(lambda ...)`.
+    - No se reordena el DataFrame completo: `groupby` ya ordena por sus claves y
+      `tz_convert` solo cambia la zona horaria (no recalcula valores).
+    - Con `artifacts` (ver `fit_visualization_artifacts`) las categorías de
+      velocidad y el umbral de `speed_anomaly` se aplican sin reajustar, de modo
+      que son estables entre corridas.
+    """
+    timestamp = df['created_at_local'].dt.tz_convert('America/Santiago')
+    frame = df[['truck', 'metric', 'value', 'speed', 'fleet']].set_axis(pd.DatetimeIndex(timestamp, name='timestamp'))
+    grouped = frame.groupby(['truck', 'metric', pd.Grouper(freq=optimal_freq(timestamp))])
+
+    value = grouped['value']
+    speed = grouped['speed']
+    df_agg = pd.DataFrame({
+        'value_mean': value.mean(),
+        'value_max': value.max(),
+        'value_p95': value.quantile(0.95),
+        'speed_mean': speed.mean(),
+        'speed_std': speed.std(),
+        'speed_max': speed.max(),
+        'fleet': grouped['fleet'].first(),
+    }).reset_index()
+
+    # Segmentación de velocidad (mismo ajuste que la versión original, o bordes persistidos)
+    if artifacts is not None:
+        df_agg['speed_category'] = artifacts['speed_category'].transform_labels(df_agg['speed_mean'].to_numpy())
+    else:
+        discretizer = KBinsDiscretizer(
+            n_bins=5, 
+            encode='ordinal', 
+            strategy='quantile',
+            subsample=2_000_000
+        )
+        codes = discretizer.fit_transform(df_agg[['speed_mean']]).astype(int).ravel()
+        df_agg['speed_category'] = pd.Series(codes, index=df_agg.index).map(dict(enumerate(SPEED_LABELS)))
+
+    # Media móvil por serie con el kernel nativo de GroupBy.rolling
+    df_agg['value_rolling'] = (
+        df_agg.groupby(['truck', 'metric'], sort=False)['value_mean']
+        .rolling(5, min_periods=1).mean()
+        .droplevel([0, 1])
+    )
+
+    speed_mean = df_agg['speed_mean'].to_numpy()
+    if artifacts is not None:
+        df_agg['speed_anomaly'] = artifacts['speed_anomaly'].is_outlier(speed_mean).astype(int)
+    else:
+        mu, sigma = np.nanmean(speed_mean), np.nanstd(speed_mean, ddof=1)
+        df_agg['speed_anomaly'] = ((speed_mean > mu + 3 * sigma) | (speed_mean < mu - 3 * sigma)).astype(int)
+
+    if verbose:
+        _quality_report(len(df), df_agg)
+    return df_agg
@@ -0,0 +1,273 @@
+# =============================================
+# Feature store local por camión, ventana y versión
+# =============================================
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from analytics.aggregation.windows import WINDOW_FORMAT, naive_window
+from analytics.feature_engineering.feature import prepare_visualization_data_fast
+from analytics.feature_engineering.preprocessing_artifacts import ARTIFACTS_ROOT, ArtifactRegistry
+
+
+class FeatureDefinition:
+    """
+    Definición versionada de un conjunto de features.
+
+    `fn` recibe los datos crudos de un camión en una ventana y devuelve un
+    DataFrame de features con la columna temporal `time_col`. Cambiar la lógica
+    de `fn` implica subir `version`: cada versión se materializa por separado.
+
+    Los parámetros ajustados (bins por cuantiles, σ de un z-score) no se
+    reajustan por ventana: se ajustan una vez, se guardan en el
+    `ArtifactRegistry` con el nombre `artifacts` y `fn` los recibe como
+    segundo argumento. Los cálculos que miran hacia atrás (medias móviles)
+    declaran `lookback`, y `fn` recibe también ese tramo previo de la ventana.
+    """
+
+    def __init__(self, name: str, version: str, fn: Callable[..., pd.DataFrame],
+                 time_col: str = 'timestamp', inputs: Optional[Iterable[str]] = None,
+                 availability_lag: Optional[str] = None, lookback: Optional[str] = None,
+                 artifacts: Optional[str] = None):
+        """
+        Args:
+            name: Nombre del conjunto de features
+            version: Versión de la definición
+            fn: Función datos crudos (y artefactos, si se indican) -> features
+            time_col: Columna temporal de las features producidas
+            inputs: Columnas crudas que usa `fn` (solo ellas invalidan una ventana)
+            availability_lag: Retraso entre `time_col` y el momento en que la fila
+                ya es conocida (p. ej. el ancho del bin que agrega)
+            lookback: Historial previo a la ventana que necesita `fn`
+            artifacts: Nombre de los artefactos ajustados en el `ArtifactRegistry`
+        """
+        self.name = name
+        self.version = str(version)
+        self.fn = fn
+        self.time_col = time_col
+        self.inputs = list(inputs) if inputs is not None else None
+        self.availability_lag = pd.Timedelta(availability_lag) if availability_lag else pd.Timedelta(0)
+        self.lookback = pd.Timedelta(lookback) if lookback else pd.Timedelta(0)
+        self.artifacts = artifacts
+
+
+class LocalFeatureStore:
+    """
+    Materializa features en Parquet particionado:
+
+        {root}/{name}/version={v}/truck={camión}/window={inicio}/part.parquet
+
+    Un manifiesto guarda la huella de los datos de entrada de cada ventana
+    (incluido su `lookback` y la versión de los artefactos usados), de modo que
+    `materialize` solo recalcula las ventanas cuyos datos cambiaron.
+    """
+
+    def __init__(self, root: Union[str, Path] = os.path.join("..", "data-set", "feature_store"),
+                 window: str = 'D', artifacts_root: Union[str, Path] = ARTIFACTS_ROOT):
+        self.root = Path(root)
+        self.window = window
+        self.registry = ArtifactRegistry(artifacts_root)
+        self.definitions: Dict[str, FeatureDefinition] = {}
+
+    def register(self, definition: FeatureDefinition) -> FeatureDefinition:
+        self.definitions[definition.name] = definition
+        return definition
+
+    # --------------------------------------------------
+    # Rutas y manifiesto
+    # --------------------------------------------------
+    def _version_dir(self, name: str, version: Optional[str] = None) -> Path:
+        version = version or self.definitions[name].version
+        return self.root / name / f"version={version}"
+
+    def _manifest_path(self, name: str, version: Optional[str] = None) -> Path:
+        return self._version_dir(name, version) / "_manifest.json"
+
+    def _load_manifest(self, name: str, version: Optional[str] = None) -> dict:
+        path = self._manifest_path(name, version)
+        if not path.exists():
+            return {}
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _save_manifest(self, name: str, manifest: dict):
+        path = self._manifest_path(name)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+        os.replace(tmp, path)
+
+    @staticmethod
+    def _fingerprint(df: pd.DataFrame) -> str:
+        """Huella independiente del orden de las filas (suma de hashes por fila)."""
+        hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+        return f"{len(df)}-{int(hashes.sum(dtype=np.uint64)):016x}"
+
+    # --------------------------------------------------
+    # Materialización incremental
+    # --------------------------------------------------
+    def materialize(self, name: str, raw_df: pd.DataFrame, truck_col: str = 'truck',
+                    time_col: str = 'created_at_local', force: bool = False,
+                    artifacts_version: Optional[str] = None) -> dict:
+        """
+        Calcula y guarda las features de las ventanas nuevas o modificadas.
+
+        Cada ventana se calcula por separado con los artefactos guardados
+        (la última versión o `artifacts_version`), así que `raw_df` puede traer
+        solo los datos nuevos más el `lookback` de la definición. Una versión
+        nueva de los artefactos invalida todas las ventanas.
+
+        Returns:
+            {'written': [...], 'skipped': n} con las claves camión/ventana recalculadas
+        """
+        definition = self.definitions[name]
+        manifest = self._load_manifest(name)
+        columns = definition.inputs or list(raw_df.columns)
+        artifacts = self.registry.load(definition.artifacts, artifacts_version) if definition.artifacts else None
+        prefix = f"{artifacts.version}:" if artifacts is not None else ''
+        step = pd.tseries.frequencies.to_offset(self.window)
+
+        slices, fingerprints = {}, {}
+        for truck, truck_df in raw_df.groupby(truck_col, sort=True):
+            truck_df = truck_df.sort_values(time_col, kind='stable')
+            times = pd.to_datetime(truck_df[time_col]).reset_index(drop=True)
+            for window in times.dt.floor(self.window).unique():
+                # Filas de la ventana más su historial previo (`lookback`)
+                lo = times.searchsorted(window - definition.lookback, side='left')
+                hi = times.searchsorted(window + step, side='left')
+                key = (truck, naive_window(window))
+                slices[key] = truck_df.iloc[lo:hi]
+                fingerprints[key] = prefix + self._fingerprint(slices[key][columns])
+        changed = [
+            (truck, window) for (truck, window), fingerprint in fingerprints.items()
+            if force or manifest.get(f"{truck}/{window.strftime(WINDOW_FORMAT)}", {}).get('fingerprint') != fingerprint
+        ]
+
+        written = []
+        for truck, window in changed:
+            raw = slices[(truck, window)]
+            features = definition.fn(raw, artifacts) if artifacts is not None else definition.fn(raw)
+            if definition.lookback:
+                # El historial previo solo alimenta el cálculo; se guardan las filas de la ventana
+                features = features[self._windows(features[definition.time_col]) == window]
+            features = features.reset_index(drop=True)
+            if truck_col not in features.columns:
+                features.insert(0, truck_col, truck)
+            self._write_partition(name, truck, window, features)
+
+            key = f"{truck}/{window.strftime(WINDOW_FORMAT)}"
+            manifest[key] = {
+                'fingerprint': fingerprints[(truck, window)],
+                'rows': int(len(features)),
+                'materialized_at': datetime.now().isoformat(timespec='seconds'),
+            }
+            written.append(key)
+
+        skipped = len(fingerprints) - len(changed)
+        self._save_manifest(name, manifest)
+        print(f"[{name} v{definition.version}] Ventanas recalculadas: {len(written)}, sin cambios: {skipped}")
+        return {'written': written, 'skipped': skipped}
+
+    def _windows(self, times: pd.Series) -> pd.Series:
+        """Ventana de cada instante (UTC sin zona si la columna tiene zona horaria)."""
+        times = pd.to_datetime(times)
+        if times.dt.tz is not None:
+            times = times.dt.tz_convert('UTC').dt.tz_localize(None)
+        return times.dt.floor(self.window)
+
+    def _write_partition(self, name: str, truck: str, window: pd.Timestamp, features: pd.DataFrame):
+        partition = self._version_dir(name) / f"truck={truck}" / f"window={window.strftime(WINDOW_FORMAT)}"
+        partition.mkdir(parents=True, exist_ok=True)
+        tmp = partition / "part.parquet.tmp"
+        features.to_parquet(tmp, index=False)
+        os.replace(tmp, partition / "part.parquet")
+
+    # --------------------------------------------------
+    # Lectura
+    # --------------------------------------------------
+    def read(self, name: str, trucks: Optional[Iterable[str]] = None, start=None, end=None,
+             version: Optional[str] = None, time_col: Optional[str] = None) -> pd.DataFrame:
+        """Lee las features podando particiones por camión y ventana antes de abrir archivos."""
+        base = self._version_dir(name, version)
+        time_col = time_col or self.definitions[name].time_col
+        trucks = set(trucks) if trucks is not None else None
+        start = pd.Timestamp(start) if start is not None else None
+        end = pd.Timestamp(end) if end is not None else None
+        step = pd.tseries.frequencies.to_offset(self.window)
+
+        frames = []
+        for truck_dir in sorted(base.glob("truck=*")):
+            if trucks is not None and truck_dir.name.split("=", 1)[1] not in trucks:
+                continue
+            for window_dir in sorted(truck_dir.glob("window=*")):
+                window = pd.Timestamp(datetime.strptime(window_dir.name.split("=", 1)[1], WINDOW_FORMAT))
+                if end is not None and window > naive_window(end):
+                    continue
+                if start is not None and window + step <= naive_window(start):
+                    continue
+                frames.append(pd.read_parquet(window_dir / "part.parquet"))
+
+        if not frames:
+            return pd.DataFrame()
+        df = pd.concat(frames, ignore_index=True)
+        if start is not None:
+            df = df[df[time_col] >= _like(start, df[time_col])]
+        if end is not None:
+            df = df[df[time_col] <= _like(end, df[time_col])]
+        return df.reset_index(drop=True)
+
+    def get_historical_features(self, name: str, entity_df: pd.DataFrame, truck_col: str = 'truck',
+                                time_col: str = 'timestamp', tolerance: Optional[str] = None,
+                                version: Optional[str] = None) -> pd.DataFrame:
+        """
+        Unión point-in-time para entrenamiento: a cada fila de `entity_df` se le
+        asigna la última fila de features disponible (instante + availability_lag)
+        en o antes del instante de la fila, sin mirar nunca al futuro.
+        """
+        definition = self.definitions[name]
+        features = self.read(name, trucks=entity_df[truck_col].unique(), version=version,
+                             end=entity_df[time_col].max())
+        if features.empty:
+            return entity_df.copy()
+
+        features = features.rename(columns={definition.time_col: '_feature_time'})
+        features['_feature_time'] = features['_feature_time'] + definition.availability_lag
+        features = features.sort_values('_feature_time')
+        entities = entity_df.reset_index().sort_values(time_col)
+        merged = pd.merge_asof(
+            entities, features,
+            left_on=time_col, right_on='_feature_time', by=truck_col,
+            direction='backward',
+            tolerance=pd.Timedelta(tolerance) if tolerance else None,
+        )
+        return merged.sort_values('index').set_index('index').rename_axis(entity_df.index.name)
+
+
+def _like(ts: pd.Timestamp, series: pd.Series) -> pd.Timestamp:
+    """Ajusta la zona horaria del límite a la de la columna filtrada."""
+    tz = getattr(series.dt, 'tz', None)
+    if tz is not None and ts.tzinfo is None:
+        return ts.tz_localize(tz)
+    if tz is None and ts.tzinfo is not None:
+        return ts.tz_localize(None)
+    return ts
+
+
+# Features de `prepare_visualization_data` compartidas por el dashboard y el entrenamiento.
+# Requiere artefactos 'visualization' guardados (ver `fit_visualization_artifacts`);
+# el lookback cubre las 4 filas previas de la media móvil (rolling(5)).
+VISUALIZATION_FEATURES = FeatureDefinition(
+    name='visualization',
+    version='2',
+    fn=lambda raw, artifacts: prepare_visualization_data_fast(raw, verbose=False, artifacts=artifacts),
+    time_col='timestamp',
+    inputs=['created_at_local', 'truck', 'metric', 'value', 'speed'],
+    lookback='1h',
+    artifacts='visualization',
+)
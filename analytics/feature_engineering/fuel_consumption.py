@@ -0,0 +1,202 @@
+# =============================================
+# Motor de consumo de combustible y eventos de recarga
+# =============================================
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+INTERVAL_COLUMNS = [
+    'Equipment', 'ShiftDate', 'Shift', 'start', 'end', 'duration_s',
+    'level_start', 'level_end', 'delta_l', 'consumed_l', 'refuel_l',
+    'suspicious_drop_l', 'is_refuel', 'is_suspicious_drop'
+]
+
+
+def _run_totals(mask: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """Suma `values` sobre cada tramo consecutivo de `mask` y la reparte a sus posiciones."""
+    run_id = np.concatenate(([0], np.cumsum(mask[1:] != mask[:-1])))
+    run_starts = np.flatnonzero(np.concatenate(([True], run_id[1:] != run_id[:-1])))
+    return np.add.reduceat(np.where(mask, values, 0.0), run_starts)[run_id]
+
+
+class FuelConsumptionEngine:
+    """
+    Convierte las lecturas de `FuelLevelLiters` en consumo real por camión.
+
+    El cálculo es vectorizado por camión (NumPy) y los camiones se procesan
+    en paralelo. Por cada par de lecturas consecutivas se genera un intervalo
+    con el litraje consumido, las recargas y las caídas sospechosas.
+    """
+
+    def __init__(self, smoothing_window: int = 5, refuel_threshold: float = 50.0,
+                 max_burn_rate: float = 400.0, min_drop: float = 20.0,
+                 time_col: str = 'FullDateTime', max_workers: Optional[int] = None):
+        """
+        Args:
+            smoothing_window: Ventana (en lecturas) de la mediana móvil que elimina ruido del sensor
+            refuel_threshold: Litros mínimos de subida acumulada para considerar una recarga
+            max_burn_rate: Consumo máximo plausible (L/h); caídas más rápidas son sospechosas
+            min_drop: Litros mínimos de una caída para poder marcarla como sospechosa
+            time_col: Columna con fecha y hora completa de cada lectura
+            max_workers: Hilos para procesar camiones en paralelo (None = automático)
+        """
+        if smoothing_window < 1:
+            raise ValueError("smoothing_window debe ser >= 1")
+        self.smoothing_window = smoothing_window
+        self.refuel_threshold = refuel_threshold
+        self.max_burn_rate = max_burn_rate
+        self.min_drop = min_drop
+        self.time_col = time_col
+        self.max_workers = max_workers
+
+    # --------------------------------------------------
+    # Intervalos por camión
+    # --------------------------------------------------
+    def compute_intervals(self, sensor_df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Calcula los intervalos de consumo para toda la flota.
+
+        Las lecturas nulas o <= 0 se descartan (el ETL rellena nulos con 0).
+        `consumed_l` conserva el signo de la diferencia fuera de eventos, así
+        el ruido residual se compensa al agregar por turno o ciclo.
+        """
+        required = ['Equipment', self.time_col, 'FuelLevelLiters']
+        missing = [col for col in required if col not in sensor_df.columns]
+        if missing:
+            raise KeyError(f"Columnas requeridas faltantes: {missing}")
+
+        optional = [col for col in ('ShiftDate', 'Shift') if col in sensor_df.columns]
+        df = sensor_df[required + optional]
+        df = df[df['FuelLevelLiters'] > 0]
+        trucks = [group for _, group in df.groupby('Equipment', sort=True)]
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            results = list(executor.map(self._truck_intervals, trucks))
+
+        results = [r for r in results if not r.empty]
+        if not results:
+            return pd.DataFrame(columns=INTERVAL_COLUMNS)
+        return pd.concat(results, ignore_index=True)
+
+    def _truck_intervals(self, truck_df: pd.DataFrame) -> pd.DataFrame:
+        """Intervalos de un solo camión, íntegramente con operaciones de arreglo."""
+        truck_df = truck_df.sort_values(self.time_col, kind='stable')
+        if len(truck_df) < 2:
+            return pd.DataFrame(columns=INTERVAL_COLUMNS)
+
+        times = pd.to_datetime(truck_df[self.time_col]).to_numpy(dtype='datetime64[ns]')
+        level = (
+            truck_df['FuelLevelLiters'].astype(float)
+            .rolling(self.smoothing_window, center=True, min_periods=1)
+            .median()
+            .to_numpy()
+        )
+
+        delta = np.diff(level)
+        duration_s = np.diff(times).astype('timedelta64[ns]').astype(np.int64) / 1e9
+
+        # Una recarga o un robo se reparten en varias lecturas: se suman los
+        # intervalos consecutivos que suben (recarga) o que caen más rápido
+        # que el consumo máximo plausible (caída sospechosa).
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rate = np.where(duration_s > 0, -delta / (duration_s / 3600.0), np.inf)
+        rising = delta > 0
+        fast_drop = (delta < 0) & (rate > self.max_burn_rate)
+
+        is_refuel = rising & (_run_totals(rising, delta) >= self.refuel_threshold)
+        is_drop = fast_drop & (-_run_totals(fast_drop, delta) >= self.min_drop)
+
+        event = is_refuel | is_drop
+        result = pd.DataFrame({
+            'Equipment': truck_df['Equipment'].iloc[0],
+            'ShiftDate': truck_df['ShiftDate'].to_numpy()[:-1] if 'ShiftDate' in truck_df else pd.NaT,
+            'Shift': truck_df['Shift'].to_numpy()[:-1] if 'Shift' in truck_df else None,
+            'start': times[:-1],
+            'end': times[1:],
+            'duration_s': duration_s,
+            'level_start': level[:-1],
+            'level_end': level[1:],
+            'delta_l': delta,
+            'consumed_l': np.where(event, 0.0, -delta),
+            'refuel_l': np.where(is_refuel, delta, 0.0),
+            'suspicious_drop_l': np.where(is_drop, -delta, 0.0),
+            'is_refuel': is_refuel,
+            'is_suspicious_drop': is_drop,
+        })
+        return result[INTERVAL_COLUMNS]
+
+    # --------------------------------------------------
+    # Agregaciones
+    # --------------------------------------------------
+    @staticmethod
+    def _summarize(grouped) -> pd.DataFrame:
+        summary = grouped.agg(
+            consumed_l=('consumed_l', 'sum'),
+            refuel_l=('refuel_l', 'sum'),
+            refuel_events=('is_refuel', 'sum'),
+            suspicious_drop_l=('suspicious_drop_l', 'sum'),
+            duration_s=('duration_s', 'sum'),
+        )
+        hours = summary['duration_s'] / 3600.0
+        summary['liters_per_hour'] = summary['consumed_l'].div(hours.where(hours > 0))
+        return summary.reset_index()
+
+    def per_shift(self, intervals: pd.DataFrame) -> pd.DataFrame:
+        """Litros consumidos por camión y turno (ShiftDate, Shift)."""
+        return self._summarize(intervals.groupby(['Equipment', 'ShiftDate', 'Shift'], dropna=False))
+
+    def per_cycle(self, intervals: pd.DataFrame, cycle_df: pd.DataFrame,
+                  start_col: str = 'E_TravelingStart', end_col: str = 'L_UnloadingEnd') -> pd.DataFrame:
+        """
+        Litros consumidos por ciclo de acarreo.
+
+        Cada intervalo se asigna al ciclo cuyo rango [start_col, end_col)
+        contiene su inicio, mediante búsqueda binaria por camión.
+        """
+        cycles = cycle_df.reset_index(drop=True).copy()
+        cycles['cycle_id'] = np.arange(len(cycles))
+        cycles['_start'] = pd.to_datetime(cycles[start_col], errors='coerce')
+        cycles['_end'] = pd.to_datetime(cycles[end_col], errors='coerce')
+
+        assigned = np.full(len(intervals), -1, dtype=np.int64)
+        interval_pos = {truck: idx for truck, idx in intervals.groupby('Equipment').indices.items()}
+        for truck, truck_cycles in cycles.dropna(subset=['_start', '_end']).groupby('Equipment'):
+            positions = interval_pos.get(truck)
+            if positions is None:
+                continue
+            truck_cycles = truck_cycles.sort_values('_start')
+            starts = truck_cycles['_start'].to_numpy(dtype='datetime64[ns]')
+            ends = truck_cycles['_end'].to_numpy(dtype='datetime64[ns]')
+            t = intervals['start'].to_numpy(dtype='datetime64[ns]')[positions]
+
+            k = np.searchsorted(starts, t, side='right') - 1
+            inside = (k >= 0) & (t < ends[np.clip(k, 0, None)])
+            assigned[positions[inside]] = truck_cycles['cycle_id'].to_numpy()[k[inside]]
+
+        matched = intervals.assign(cycle_id=assigned)
+        matched = matched[matched['cycle_id'] >= 0]
+        summary = self._summarize(matched.groupby('cycle_id'))
+
+        result = cycles.drop(columns=['_start', '_end']).merge(summary, on='cycle_id', how='left')
+        if 'MeasuredTonnage' in result.columns:
+            tonnage = pd.to_numeric(result['MeasuredTonnage'], errors='coerce')
+            result['liters_per_ton'] = result['consumed_l'].div(tonnage.where(tonnage > 0))
+        return result
+
+
+def compute_fuel_consumption(sensor_df: pd.DataFrame, cycle_df: Optional[pd.DataFrame] = None,
+                             **engine_kwargs) -> dict:
+    """
+    Atajo para obtener intervalos, consumo por turno y (opcional) por ciclo.
+
+    Returns:
+        dict con las claves 'intervals', 'shift' y, si se pasa cycle_df, 'cycle'
+    """
+    engine = FuelConsumptionEngine(**engine_kwargs)
+    intervals = engine.compute_intervals(sensor_df)
+    result = {'intervals': intervals, 'shift': engine.per_shift(intervals)}
+    if cycle_df is not None and not cycle_df.empty:
+        result['cycle'] = engine.per_cycle(intervals, cycle_df)
+    return result
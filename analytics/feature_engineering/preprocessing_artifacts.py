@@ -0,0 +1,211 @@
+# =============================================
+# Artefactos de preprocesamiento persistidos (ajuste único, solo transformación)
+# =============================================
+import hashlib
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+ARTIFACTS_ROOT = os.path.join("..", "data-set", "artifacts", "preprocessing")
+
+
+class QuantileBinner:
+    """
+    Discretización por cuantiles equivalente a
+    `KBinsDiscretizer(encode='ordinal', strategy='quantile')`, pero con los bordes
+    como simple arreglo NumPy: `transform` es un `np.searchsorted` sin validación
+    de sklearn, y los bordes se guardan en JSON para reutilizarlos entre corridas.
+    """
+
+    kind = 'quantile_binner'
+
+    def __init__(self, n_bins: int = 5, labels: Optional[Sequence[str]] = None):
+        if n_bins < 2:
+            raise ValueError("n_bins debe ser al menos 2")
+        if labels is not None and len(labels) != n_bins:
+            raise ValueError("labels debe tener un elemento por bin")
+        self.n_bins = n_bins
+        self.labels = list(labels) if labels is not None else None
+        self.edges: Optional[np.ndarray] = None
+
+    def fit(self, values, subsample: Optional[int] = 2_000_000, random_state: int = 0) -> 'QuantileBinner':
+        x = np.asarray(values, dtype=float).ravel()
+        x = x[~np.isnan(x)]
+        if len(x) == 0:
+            raise ValueError("No hay valores para ajustar los bordes")
+        if subsample is not None and len(x) > subsample:
+            x = np.random.default_rng(random_state).choice(x, subsample, replace=False)
+
+        edges = np.percentile(x, np.linspace(0, 100, self.n_bins + 1))
+        # Igual que sklearn: se eliminan bins de ancho nulo
+        self.edges = edges[np.ediff1d(edges, to_begin=np.inf) > 1e-8]
+        return self
+
+    def transform(self, values) -> np.ndarray:
+        """Código de bin (0..n_bins-1) por valor; -1 para NaN."""
+        if self.edges is None:
+            raise ValueError("QuantileBinner no está ajustado")
+        x = np.asarray(values, dtype=float)
+        codes = np.searchsorted(self.edges[1:-1], x, side='right')
+        return np.where(np.isnan(x), -1, codes)
+
+    def transform_labels(self, values) -> np.ndarray:
+        """Etiqueta por valor (None para NaN) usando `labels`."""
+        codes = self.transform(values)
+        labels = np.asarray(self.labels if self.labels is not None else range(self.n_bins), dtype=object)
+        return np.where(codes >= 0, labels[np.clip(codes, 0, len(labels) - 1)], None)
+
+    def to_dict(self) -> dict:
+        return {'kind': self.kind, 'n_bins': self.n_bins, 'labels': self.labels,
+                'edges': None if self.edges is None else self.edges.tolist()}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'QuantileBinner':
+        binner = cls(data['n_bins'], data.get('labels'))
+        binner.edges = None if data.get('edges') is None else np.asarray(data['edges'], dtype=float)
+        return binner
+
+
+class ZScoreScaler:
+    """Media y desviación ajustadas una vez; `is_outlier` aplica el umbral ±k·σ sin reajustar."""
+
+    kind = 'zscore_scaler'
+
+    def __init__(self, threshold: float = 3.0):
+        self.threshold = threshold
+        self.mean: Optional[float] = None
+        self.std: Optional[float] = None
+
+    def fit(self, values) -> 'ZScoreScaler':
+        x = np.asarray(values, dtype=float)
+        self.mean = float(np.nanmean(x))
+        self.std = float(np.nanstd(x, ddof=1))
+        return self
+
+    def transform(self, values) -> np.ndarray:
+        if self.mean is None:
+            raise ValueError("ZScoreScaler no está ajustado")
+        return (np.asarray(values, dtype=float) - self.mean) / self.std
+
+    def is_outlier(self, values) -> np.ndarray:
+        return np.abs(self.transform(values)) > self.threshold
+
+    def to_dict(self) -> dict:
+        return {'kind': self.kind, 'threshold': self.threshold, 'mean': self.mean, 'std': self.std}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'ZScoreScaler':
+        scaler = cls(data['threshold'])
+        scaler.mean, scaler.std = data['mean'], data['std']
+        return scaler
+
+
+ARTIFACT_TYPES = {cls.kind: cls for cls in (QuantileBinner, ZScoreScaler)}
+
+
+class PreprocessingArtifacts:
+    """Conjunto de transformaciones ajustadas sobre una misma ventana de entrenamiento."""
+
+    def __init__(self, transforms: Dict[str, object], metadata: Optional[dict] = None,
+                 version: Optional[str] = None):
+        self.transforms = transforms
+        self.metadata = metadata or {}
+        self.version = version
+
+    def __getitem__(self, name: str):
+        return self.transforms[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.transforms
+
+    def to_dict(self) -> dict:
+        return {
+            'version': self.version,
+            'metadata': self.metadata,
+            'transforms': {name: t.to_dict() for name, t in self.transforms.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'PreprocessingArtifacts':
+        transforms = {name: ARTIFACT_TYPES[t['kind']].from_dict(t) for name, t in data['transforms'].items()}
+        return cls(transforms, data.get('metadata'), data.get('version'))
+
+
+def fit_visualization_artifacts(df_agg: pd.DataFrame, n_bins: int = 5,
+                                subsample: Optional[int] = 2_000_000) -> PreprocessingArtifacts:
+    """
+    Ajusta los transformadores aprendidos de `prepare_visualization_data`
+    (categorías de velocidad y umbral de speed_anomaly) sobre una salida agregada.
+    """
+    from analytics.feature_engineering.feature import SPEED_LABELS
+
+    speed = df_agg['speed_mean'].to_numpy(dtype=float)
+    metadata = {'n_samples': int(len(df_agg))}
+    if 'timestamp' in df_agg.columns and len(df_agg):
+        metadata['window_start'] = str(df_agg['timestamp'].min())
+        metadata['window_end'] = str(df_agg['timestamp'].max())
+    return PreprocessingArtifacts({
+        'speed_category': QuantileBinner(n_bins, SPEED_LABELS[:n_bins]).fit(speed, subsample),
+        'speed_anomaly': ZScoreScaler(3.0).fit(speed),
+    }, metadata)
+
+
+class ArtifactRegistry:
+    """
+    Registro versionado en disco:
+
+        {root}/{nombre}/{versión}.json   y   {root}/{nombre}/LATEST
+
+    La versión es la fecha de guardado más un hash corto del contenido, así
+    que volver a guardar los mismos bordes no genera una versión distinta.
+    """
+
+    def __init__(self, root: Union[str, Path] = ARTIFACTS_ROOT):
+        self.root = Path(root)
+
+    def save(self, name: str, artifacts: PreprocessingArtifacts) -> str:
+        payload = artifacts.to_dict()
+        payload.pop('version', None)
+        content = json.dumps(payload, sort_keys=True)
+        digest = hashlib.sha1(content.encode('utf-8')).hexdigest()[:10]
+
+        folder = self.root / name
+        folder.mkdir(parents=True, exist_ok=True)
+        existing = sorted(folder.glob(f"*-{digest}.json"))
+        if existing:
+            version = existing[-1].stem
+        else:
+            version = f"{datetime.now().strftime('%Y%m%dT%H%M%S')}-{digest}"
+            payload['version'] = version
+            self._write(folder / f"{version}.json", json.dumps(payload, indent=2, sort_keys=True))
+        self._write(folder / "LATEST", version)
+        artifacts.version = version
+        print(f"💾 Artefactos '{name}' guardados (versión {version})")
+        return version
+
+    def load(self, name: str, version: Optional[str] = None) -> PreprocessingArtifacts:
+        folder = self.root / name
+        if version is None:
+            latest = folder / "LATEST"
+            if not latest.exists():
+                raise FileNotFoundError(f"No hay artefactos guardados para '{name}'")
+            version = latest.read_text(encoding='utf-8').strip()
+        path = folder / f"{version}.json"
+        if not path.exists():
+            raise FileNotFoundError(f"Versión '{version}' de '{name}' no encontrada")
+        with open(path, 'r', encoding='utf-8') as f:
+            return PreprocessingArtifacts.from_dict(json.load(f))
+
+    def versions(self, name: str) -> list:
+        return sorted(p.stem for p in (self.root / name).glob("*.json"))
+
+    @staticmethod
+    def _write(path: Path, text: str):
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        tmp.write_text(text, encoding='utf-8')
+        os.replace(tmp, path)
@@ -0,0 +1,279 @@
+# =============================================
+# Pendiente de camino y perfil de elevación
+# =============================================
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+EARTH_RADIUS_M = 6_371_008.8
+GRAVITY = 9.80665
+METERS_PER_DEG_LAT = 111_320.0
+
+# Fases del ciclo de acarreo: vacío (hacia la pala) y cargado (hacia el destino)
+CYCLE_PHASES = {
+    'empty': ('E_TravelingStart', 'E_TravelingEnd'),
+    'loaded': ('L_HaulingStart', 'L_HaulingEnd'),
+}
+
+
+def _haversine_m(lat1, lon1, lat2, lon2) -> np.ndarray:
+    lat1, lon1, lat2, lon2 = (np.radians(a) for a in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def _bearing_deg(lat1, lon1, lat2, lon2) -> np.ndarray:
+    lat1, lon1, lat2, lon2 = (np.radians(a) for a in (lat1, lon1, lat2, lon2))
+    y = np.sin(lon2 - lon1) * np.cos(lat2)
+    x = np.cos(lat1) * np.sin(lat2) - np.sin(lat1) * np.cos(lat2) * np.cos(lon2 - lon1)
+    return np.degrees(np.arctan2(y, x)) % 360
+
+
+class RoadGradeEngine:
+    """
+    Perfil de elevación por camión: distancia recorrida, pendiente suavizada,
+    ascenso/descenso acumulado por fase del ciclo y trabajo de subida cargado.
+
+    Toda la flota se procesa como un único arreglo ordenado por (Equipment,
+    tiempo). La pendiente se calcula sobre una ventana de distancia (no de
+    muestras), para que no dependa de la velocidad ni de la frecuencia del GPS.
+    """
+
+    def __init__(self, window_m: float = 60.0, min_span_m: float = 10.0, max_abs_grade: float = 0.25,
+                 max_step_m: float = 500.0, empty_mass_t: Optional[float] = None,
+                 cell_m: float = 25.0, heading_bins: int = 8, time_col: str = 'FullDateTime'):
+        """
+        Args:
+            window_m: Largo de la ventana de suavizado/pendiente en metros
+            min_span_m: Distancia mínima dentro de la ventana para estimar pendiente
+            max_abs_grade: Pendiente máxima plausible (fracción, 0.25 = 25 %)
+            max_step_m: Pasos GPS más largos se tratan como corte de trayectoria
+            empty_mass_t: Masa del camión vacío en toneladas (None: solo se cuenta la carga)
+            cell_m: Tamaño de celda de la grilla espacial de segmentos
+            heading_bins: Sectores de rumbo por celda (subida y bajada son segmentos distintos)
+            time_col: Columna con fecha y hora completa
+        """
+        self.window_m = window_m
+        self.min_span_m = min_span_m
+        self.max_abs_grade = max_abs_grade
+        self.max_step_m = max_step_m
+        self.empty_mass_t = empty_mass_t
+        self.cell_m = cell_m
+        self.heading_bins = heading_bins
+        self.time_col = time_col
+
+    # --------------------------------------------------
+    # Perfil por punto
+    # --------------------------------------------------
+    def compute_profile(self, sensor_df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Devuelve el sensor ordenado por (Equipment, tiempo) con: step_distance_m,
+        along_track_m, elevation_smooth, grade, climb_m, descent_m y heading_deg.
+        """
+        required = ['Equipment', self.time_col, 'Latitude', 'Longitude', 'Elevation']
+        missing = [col for col in required if col not in sensor_df.columns]
+        if missing:
+            raise KeyError(f"Columnas requeridas faltantes: {missing}")
+
+        df = sensor_df.sort_values(['Equipment', self.time_col], kind='stable').reset_index(drop=True)
+        lat = df['Latitude'].to_numpy(dtype=float)
+        lon = df['Longitude'].to_numpy(dtype=float)
+        elev = df['Elevation'].to_numpy(dtype=float)
+        truck = pd.factorize(df['Equipment'])[0]
+        n = len(df)
+
+        valid = np.isfinite(lat) & np.isfinite(lon) & np.isfinite(elev) & ~((lat == 0) & (lon == 0))
+        same_truck = np.zeros(n, dtype=bool)
+        same_truck[1:] = truck[1:] == truck[:-1]
+
+        # Distancia por paso solo entre puntos válidos consecutivos del mismo camión
+        step = np.zeros(n)
+        heading = np.full(n, np.nan)
+        if n > 1:
+            linked = same_truck[1:] & valid[1:] & valid[:-1]
+            raw = _haversine_m(lat[:-1], lon[:-1], lat[1:], lon[1:])
+            linked &= raw <= self.max_step_m
+            step[1:] = np.where(linked, raw, 0.0)
+            heading[1:] = np.where(linked & (raw > 0), _bearing_deg(lat[:-1], lon[:-1], lat[1:], lon[1:]), np.nan)
+
+        # Distancia acumulada por camión (cumsum global menos el acumulado al inicio del camión)
+        cumulative = np.cumsum(step)
+        first = np.flatnonzero(~same_truck)
+        along = cumulative - np.repeat(cumulative[first], np.diff(np.append(first, n)))
+
+        # Eje global: cada camión desplazado para que las ventanas no crucen camiones
+        offset = truck * (along.max(initial=0.0) + 10 * self.window_m)
+        axis = along + offset
+        smooth, grade = self._smooth_and_grade(axis, elev, valid)
+
+        dz = np.zeros(n)
+        dz[1:] = np.where(step[1:] > 0, np.diff(smooth), 0.0)
+        dz = np.nan_to_num(dz)
+
+        df['step_distance_m'] = step
+        df['along_track_m'] = along
+        df['elevation_smooth'] = smooth
+        df['grade'] = grade
+        df['climb_m'] = np.maximum(dz, 0.0)
+        df['descent_m'] = np.maximum(-dz, 0.0)
+        df['heading_deg'] = heading
+        return df
+
+    def _smooth_and_grade(self, axis: np.ndarray, elev: np.ndarray, valid: np.ndarray):
+        """
+        Media de elevación en ±window_m/2 con sumas acumuladas + búsqueda binaria,
+        y pendiente como diferencia de esa media entre los extremos de la ventana.
+        """
+        n = len(axis)
+        smooth = np.full(n, np.nan)
+        grade = np.full(n, np.nan)
+        idx = np.flatnonzero(valid)
+        if len(idx) == 0:
+            return smooth, grade
+
+        s, z = axis[idx], elev[idx]
+        csum = np.concatenate(([0.0], np.cumsum(z)))
+        half = self.window_m / 2
+        lo = np.searchsorted(s, s - half, side='left')
+        hi = np.searchsorted(s, s + half, side='right')
+        mean = (csum[hi] - csum[lo]) / (hi - lo)
+        smooth[idx] = mean
+
+        # Pendiente: recta entre la elevación suavizada en los bordes de la ventana
+        left, right = lo, hi - 1
+        span = s[right] - s[left]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            g = (mean[right] - mean[left]) / span
+        g = np.where(span >= self.min_span_m, np.clip(g, -self.max_abs_grade, self.max_abs_grade), np.nan)
+        grade[idx] = g
+        return smooth, grade
+
+    # --------------------------------------------------
+    # Agregación por ciclo y fase
+    # --------------------------------------------------
+    def assign_phases(self, profile: pd.DataFrame, cycle_df: pd.DataFrame) -> pd.DataFrame:
+        """Agrega `cycle_id` y `phase` ('empty'/'loaded', None fuera de ciclo) a cada punto."""
+        cycle_id = np.full(len(profile), -1, dtype=np.int64)
+        phase = np.full(len(profile), None, dtype=object)
+        t_all = pd.to_datetime(profile[self.time_col]).to_numpy(dtype='datetime64[ns]')
+        point_pos = profile.groupby('Equipment').indices
+
+        cycles = cycle_df.reset_index(drop=True)
+        for name, (start_col, end_col) in CYCLE_PHASES.items():
+            if start_col not in cycles.columns or end_col not in cycles.columns:
+                continue
+            bounds = pd.DataFrame({
+                'Equipment': cycles['Equipment'],
+                'cycle_id': np.arange(len(cycles)),
+                'start': pd.to_datetime(cycles[start_col], errors='coerce'),
+                'end': pd.to_datetime(cycles[end_col], errors='coerce'),
+            }).dropna(subset=['start', 'end'])
+            for truck, truck_bounds in bounds.groupby('Equipment'):
+                positions = point_pos.get(truck)
+                if positions is None:
+                    continue
+                truck_bounds = truck_bounds.sort_values('start')
+                starts = truck_bounds['start'].to_numpy(dtype='datetime64[ns]')
+                ends = truck_bounds['end'].to_numpy(dtype='datetime64[ns]')
+                t = t_all[positions]
+                k = np.searchsorted(starts, t, side='right') - 1
+                inside = (k >= 0) & (t < ends[np.clip(k, 0, None)])
+                cycle_id[positions[inside]] = truck_bounds['cycle_id'].to_numpy()[k[inside]]
+                phase[positions[inside]] = name
+
+        return profile.assign(cycle_id=cycle_id, phase=phase)
+
+    def per_cycle(self, profile: pd.DataFrame, cycle_df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Por ciclo: distancia, ascenso/descenso y pendiente media de cada fase,
+        más el trabajo de subida cargado (masa x g x ascenso en la fase cargada).
+        """
+        points = self.assign_phases(profile, cycle_df)
+        points = points[points['cycle_id'] >= 0]
+        weighted = points['grade'].fillna(0.0) * points['step_distance_m']
+        stats = (
+            points.assign(_weighted_grade=weighted)
+            .groupby(['cycle_id', 'phase'])
+            .agg(distance_m=('step_distance_m', 'sum'), climb_m=('climb_m', 'sum'),
+                 descent_m=('descent_m', 'sum'), max_grade=('grade', 'max'),
+                 _weighted_grade=('_weighted_grade', 'sum'))
+        )
+        stats['mean_grade'] = stats.pop('_weighted_grade') / stats['distance_m'].where(stats['distance_m'] > 0)
+        stats = stats.unstack('phase')
+        stats.columns = [f"{phase}_{metric}" for metric, phase in stats.columns]
+
+        cycles = cycle_df.reset_index(drop=True)
+        result = cycles.assign(cycle_id=np.arange(len(cycles))).merge(
+            stats.reset_index(), on='cycle_id', how='left')
+
+        if 'G_Elevation' in result.columns and 'D_Elevation' in result.columns:
+            result['net_lift_m'] = (pd.to_numeric(result['D_Elevation'], errors='coerce')
+                                    - pd.to_numeric(result['G_Elevation'], errors='coerce'))
+        if 'loaded_climb_m' in result.columns:
+            payload = 0.0
+            if 'MeasuredTonnage' in result.columns:
+                payload = pd.to_numeric(result['MeasuredTonnage'], errors='coerce').fillna(0.0)
+            mass_t = (self.empty_mass_t or 0.0) + payload
+            result['loaded_uphill_work_mj'] = mass_t * 1000 * GRAVITY * result['loaded_climb_m'].fillna(0.0) / 1e6
+        return result
+
+    # --------------------------------------------------
+    # Segmentos de camino (grilla espacial compartida entre camiones)
+    # --------------------------------------------------
+    def segment_keys(self, profile: pd.DataFrame) -> pd.DataFrame:
+        """
+        Celda de grilla (cell_x, cell_y) y sector de rumbo por punto.
+
+        La grilla se define en grados a partir de `cell_m` a la latitud media
+        redondeada al grado, de modo que es la misma entre corridas y camiones.
+        """
+        lat = profile['Latitude'].to_numpy(dtype=float)
+        lon = profile['Longitude'].to_numpy(dtype=float)
+        ref_lat = np.round(np.nanmedian(lat)) if np.isfinite(lat).any() else 0.0
+        dlat = self.cell_m / METERS_PER_DEG_LAT
+        dlon = self.cell_m / (METERS_PER_DEG_LAT * np.cos(np.radians(ref_lat)))
+        sector = 360.0 / self.heading_bins
+        with np.errstate(invalid='ignore'):
+            heading_bin = np.floor(((profile['heading_deg'].to_numpy() + sector / 2) % 360) / sector)
+        return pd.DataFrame({
+            'cell_x': np.floor(lon / dlon),
+            'cell_y': np.floor(lat / dlat),
+            'heading_bin': heading_bin,
+        }, index=profile.index)
+
+    def per_segment(self, profile: pd.DataFrame) -> pd.DataFrame:
+        """Pendiente y desnivel medios por celda y sentido, reutilizables entre camiones."""
+        keys = self.segment_keys(profile)
+        points = pd.concat([profile, keys], axis=1)
+        points = points[(points['step_distance_m'] > 0) & points['heading_bin'].notna() & points['grade'].notna()]
+        points = points.assign(_weighted_grade=points['grade'] * points['step_distance_m'])
+        agg = {
+            'n_points': ('grade', 'size'),
+            'n_trucks': ('Equipment', 'nunique'),
+            'distance_m': ('step_distance_m', 'sum'),
+            'climb_m': ('climb_m', 'sum'),
+            'descent_m': ('descent_m', 'sum'),
+            'elevation': ('elevation_smooth', 'mean'),
+            'latitude': ('Latitude', 'mean'),
+            'longitude': ('Longitude', 'mean'),
+            '_weighted_grade': ('_weighted_grade', 'sum'),
+        }
+        segments = points.groupby(['cell_x', 'cell_y', 'heading_bin']).agg(**agg)
+        segments['mean_grade'] = segments.pop('_weighted_grade') / segments['distance_m']
+        return segments.reset_index().astype({'cell_x': np.int64, 'cell_y': np.int64, 'heading_bin': np.int64})
+
+
+def compute_road_grade(sensor_df: pd.DataFrame, cycle_df: Optional[pd.DataFrame] = None, **engine_kwargs) -> dict:
+    """
+    Atajo para obtener el perfil por punto, los segmentos y (opcional) el resumen por ciclo.
+
+    Returns:
+        dict con las claves 'profile', 'segments' y, si se pasa cycle_df, 'cycle'
+    """
+    engine = RoadGradeEngine(**engine_kwargs)
+    profile = engine.compute_profile(sensor_df)
+    result = {'profile': profile, 'segments': engine.per_segment(profile)}
+    if cycle_df is not None and not cycle_df.empty:
+        result['cycle'] = engine.per_cycle(profile, cycle_df)
+    return result
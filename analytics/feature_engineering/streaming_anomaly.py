@@ -0,0 +1,213 @@
+# =============================================
+# Detección de anomalías en streaming por camión y métrica
+# =============================================
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from scipy.signal import lfilter
+
+DEFAULT_METRICS = ('Speed', 'RPM', 'FuelLevelLiters')
+DROP_METRICS = ('FuelLevelLiters',)
+DEFAULT_MIN_STD = {'Speed': 1.0, 'RPM': 25.0, 'FuelLevelLiters': 0.5}
+EVENT_COLUMNS = ['Equipment', 'time', 'metric', 'value', 'expected', 'std', 'zscore', 'kind']
+
+
+class StreamingAnomalyDetector:
+    """
+    Estadísticos EWMA (media y varianza estilo Welford) por camión y métrica.
+
+    Cada muestra se compara con la media y desviación previas a ella (z-score
+    predictivo) y luego actualiza el estado en O(1). Para el nivel de
+    combustible se vigila la variación entre lecturas y solo se reportan caídas.
+
+    A diferencia de `speed_anomaly` en `prepare_visualization_data` (media ± 3σ
+    global), la línea base es propia de cada camión y se adapta con el tiempo.
+    `score_batch` (vectorizado con scipy.signal.lfilter) y `update` (registro a
+    registro) producen los mismos resultados y comparten el estado, así que se
+    puede rellenar el histórico en lote y continuar con datos en vivo.
+    """
+
+    def __init__(self, alpha: float = 0.02, threshold: float = 4.0, warmup: int = 30,
+                 metrics: Sequence[str] = DEFAULT_METRICS, drop_metrics: Sequence[str] = DROP_METRICS,
+                 min_std: Optional[Dict[str, float]] = None, time_col: str = 'FullDateTime'):
+        """
+        Args:
+            alpha: Factor de suavizado EWMA (≈ 2 / (ventana + 1))
+            threshold: |z| a partir del cual una muestra es anómala
+            warmup: Muestras mínimas por camión y métrica antes de emitir eventos
+            metrics: Columnas vigiladas
+            drop_metrics: Métricas evaluadas por su variación (solo caídas)
+            min_std: Piso de desviación por métrica (evita z enormes con señal plana)
+            time_col: Columna con fecha y hora completa
+        """
+        if not 0 < alpha < 1:
+            raise ValueError("alpha debe estar entre 0 y 1")
+        self.alpha = alpha
+        self.threshold = threshold
+        self.warmup = warmup
+        self.metrics = list(metrics)
+        self.drop_metrics = set(drop_metrics)
+        self.min_std = {**DEFAULT_MIN_STD, **(min_std or {})}
+        self.time_col = time_col
+        # (camión, métrica) -> [n, media, varianza, última lectura]
+        self.state: Dict[tuple, list] = {}
+
+    # --------------------------------------------------
+    # Registro a registro
+    # --------------------------------------------------
+    def update(self, truck: str, time, values: Dict[str, float]) -> List[dict]:
+        """Procesa una lectura {métrica: valor} de un camión y devuelve los eventos anómalos."""
+        events = []
+        for metric in self.metrics:
+            x = values.get(metric)
+            if x is None or not np.isfinite(x) or (metric in self.drop_metrics and x <= 0):
+                continue
+            state = self.state.get((truck, metric))
+            if metric in self.drop_metrics:
+                if state is None:
+                    self.state[(truck, metric)] = [0, 0.0, 0.0, x]
+                    continue
+                signal, state[3] = x - state[3], x
+            else:
+                signal = x
+
+            if state is None or state[0] == 0:
+                self.state[(truck, metric)] = [1, signal, 0.0, state[3] if state else x]
+                continue
+
+            n, mean, var = state[0], state[1], state[2]
+            diff = signal - mean
+            std = max(np.sqrt(var), self.min_std.get(metric, 0.0))
+            z = diff / std
+            if n >= self.warmup and self._is_anomaly(metric, z):
+                events.append(self._event(truck, time, metric, x, mean, std, z))
+
+            increment = self.alpha * diff
+            state[0] = n + 1
+            state[1] = mean + increment
+            state[2] = (1 - self.alpha) * (var + diff * increment)
+            state[3] = x
+        return events
+
+    # --------------------------------------------------
+    # Lote (relleno histórico vectorizado)
+    # --------------------------------------------------
+    def score_batch(self, sensor_df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Devuelve `sensor_df` ordenado por (Equipment, tiempo) con `{métrica}_expected`,
+        `{métrica}_std`, `{métrica}_zscore` y `{métrica}_anomaly`, y deja el estado
+        listo para continuar con `update`.
+        """
+        metrics = [m for m in self.metrics if m in sensor_df.columns]
+        df = sensor_df.sort_values(['Equipment', self.time_col], kind='stable').reset_index(drop=True)
+        for metric in metrics:
+            scores = np.full((3, len(df)), np.nan)
+            values = df[metric].to_numpy(dtype=float)
+            for truck, idx in df.groupby('Equipment', sort=False).indices.items():
+                x = values[idx]
+                valid = np.isfinite(x) & ((x > 0) if metric in self.drop_metrics else True)
+                scores[:, idx[valid]] = self._score_series(truck, metric, x[valid])
+            expected, std, zscore = scores
+            df[f'{metric}_expected'] = expected
+            df[f'{metric}_std'] = std
+            df[f'{metric}_zscore'] = zscore
+            df[f'{metric}_anomaly'] = self._is_anomaly(metric, np.nan_to_num(zscore))
+        return df
+
+    def process_batch(self, sensor_df: pd.DataFrame) -> pd.DataFrame:
+        """Eventos anómalos del lote en el mismo formato que `update` (un evento por fila)."""
+        scored = self.score_batch(sensor_df)
+        frames = []
+        for metric in [m for m in self.metrics if f'{m}_anomaly' in scored.columns]:
+            hits = scored[scored[f'{metric}_anomaly']]
+            if hits.empty:
+                continue
+            frames.append(pd.DataFrame({
+                'Equipment': hits['Equipment'].to_numpy(),
+                'time': hits[self.time_col].to_numpy(),
+                'metric': metric,
+                'value': hits[metric].to_numpy(dtype=float),
+                'expected': hits[f'{metric}_expected'].to_numpy(),
+                'std': hits[f'{metric}_std'].to_numpy(),
+                'zscore': hits[f'{metric}_zscore'].to_numpy(),
+            }))
+        if not frames:
+            return pd.DataFrame(columns=EVENT_COLUMNS)
+        events = pd.concat(frames, ignore_index=True)
+        events['kind'] = np.where(
+            events['metric'].isin(list(self.drop_metrics)), 'drop',
+            np.where(events['zscore'] > 0, 'high', 'low'),
+        )
+        events = events.sort_values(['Equipment', 'time'], kind='stable').reset_index(drop=True)
+        return events[EVENT_COLUMNS]
+
+    def _score_series(self, truck: str, metric: str, x: np.ndarray) -> np.ndarray:
+        """
+        Media esperada, desviación y z-score predictivos de una serie (3 x n),
+        continuando desde el estado guardado.
+        """
+        out = np.full((3, len(x)), np.nan)
+        if len(x) == 0:
+            return out
+        key = (truck, metric)
+        state = self.state.get(key)
+
+        if metric in self.drop_metrics:
+            previous = state[3] if state is not None else None
+            signal = np.diff(x, prepend=previous if previous is not None else np.nan)
+        else:
+            signal = x
+        last = x[-1]
+
+        offset = int(np.isnan(signal[0]))
+        signal = signal[offset:]
+        if state is None or state[0] == 0:
+            if len(signal) == 0:
+                self.state[key] = [0, 0.0, 0.0, last]
+                return out
+            n0, mean0, var0 = 1, signal[0], 0.0
+            offset += 1
+            signal = signal[1:]
+        else:
+            n0, mean0, var0 = state[0], state[1], state[2]
+
+        a = self.alpha
+        if len(signal):
+            # m_t = (1-a)·m_{t-1} + a·x_t
+            means = lfilter([a], [1, -(1 - a)], signal, zi=[(1 - a) * mean0])[0]
+            prev_mean = np.concatenate(([mean0], means[:-1]))
+            diff = signal - prev_mean
+            # v_t = (1-a)·v_{t-1} + (1-a)·a·d_t²
+            variances = lfilter([(1 - a) * a], [1, -(1 - a)], diff ** 2, zi=[(1 - a) * var0])[0]
+            prev_var = np.concatenate(([var0], variances[:-1]))
+
+            std = np.maximum(np.sqrt(prev_var), self.min_std.get(metric, 0.0))
+            scores = diff / std
+            warm = n0 + np.arange(len(signal)) >= self.warmup
+            out[:, offset:] = np.where(warm, [prev_mean, std, scores], np.nan)
+            n0, mean0, var0 = n0 + len(signal), means[-1], variances[-1]
+
+        self.state[key] = [n0, mean0, var0, last]
+        return out
+
+    def _is_anomaly(self, metric: str, z):
+        if metric in self.drop_metrics:
+            return z < -self.threshold
+        return np.abs(z) > self.threshold
+
+    def _event(self, truck, time, metric, value, mean, std, z) -> dict:
+        if metric in self.drop_metrics:
+            kind = 'drop'
+        else:
+            kind = 'high' if z > 0 else 'low'
+        return {'Equipment': truck, 'time': time, 'metric': metric, 'value': value,
+                'expected': mean, 'std': std, 'zscore': z, 'kind': kind}
+
+    def feed(self, records: pd.DataFrame) -> List[dict]:
+        """Procesa registros en vivo en orden de llegada (una llamada a `update` por fila)."""
+        metrics = [m for m in self.metrics if m in records.columns]
+        events = []
+        for row in records[['Equipment', self.time_col] + metrics].itertuples(index=False):
+            events.extend(self.update(row[0], row[1], dict(zip(metrics, row[2:]))))
+        return events
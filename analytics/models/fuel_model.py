@@ -0,0 +1,77 @@
+# =============================================
+# Modelo lineal de consumo por turno a partir de rollups
+# =============================================
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+# Variables explicativas (columnas derivadas del rollup por turno)
+FEATURES = ('tonnage_t', 'distance_km', 'idle_h', 'moving_h')
+TARGET = 'fuel_consumed_l'
+
+
+def shift_features(rollup: pd.DataFrame) -> pd.DataFrame:
+    """Convierte filas de rollup (cualquier grano) en variables del modelo."""
+    return pd.DataFrame({
+        'tonnage_t': rollup['tonnage_t'].astype(float),
+        'distance_km': rollup['distance_km'].astype(float),
+        'idle_h': rollup['idle_s'].astype(float) / 3600.0,
+        'moving_h': rollup['moving_s'].astype(float) / 3600.0,
+    }, index=rollup.index)
+
+
+class FuelRateModel:
+    """
+    Regresión lineal (mínimos cuadrados con penalización ridge opcional)
+    del combustible consumido por turno:
+
+        litros = b0 + b1·toneladas + b2·km + b3·horas_ralentí + b4·horas_movimiento
+    """
+
+    def __init__(self, ridge: float = 0.0, features: Sequence[str] = FEATURES):
+        self.ridge = ridge
+        self.features = list(features)
+        self.coef_: Optional[np.ndarray] = None
+        self.intercept_: float = 0.0
+        self.n_samples_: int = 0
+        self.r2_: float = float('nan')
+
+    def fit(self, X: pd.DataFrame, y) -> 'FuelRateModel':
+        X = X[self.features].to_numpy(dtype=float)
+        y = np.asarray(y, dtype=float)
+        keep = np.isfinite(X).all(axis=1) & np.isfinite(y)
+        X, y = X[keep], y[keep]
+        if len(y) <= len(self.features):
+            raise ValueError(f"Se necesitan más de {len(self.features)} observaciones para ajustar (hay {len(y)})")
+
+        design = np.column_stack([np.ones(len(y)), X])
+        penalty = np.sqrt(self.ridge) * np.eye(design.shape[1])
+        penalty[0, 0] = 0.0                     # el intercepto no se penaliza
+        solution, *_ = np.linalg.lstsq(np.vstack([design, penalty]),
+                                       np.concatenate([y, np.zeros(design.shape[1])]), rcond=None)
+        self.intercept_, self.coef_ = float(solution[0]), solution[1:]
+        residual = y - design @ solution
+        total = ((y - y.mean()) ** 2).sum()
+        self.r2_ = float(1 - (residual ** 2).sum() / total) if total > 0 else float('nan')
+        self.n_samples_ = int(len(y))
+        return self
+
+    def predict(self, X: pd.DataFrame) -> np.ndarray:
+        if self.coef_ is None:
+            raise ValueError("El modelo no está ajustado; llamar a fit primero")
+        return self.intercept_ + X[self.features].to_numpy(dtype=float) @ self.coef_
+
+    @classmethod
+    def from_rollup(cls, rollup: pd.DataFrame, ridge: float = 0.0) -> 'FuelRateModel':
+        """Ajusta con las filas que tienen actividad (tiempo cubierto > 0)."""
+        active = rollup[rollup['duration_s'] > 0]
+        return cls(ridge).fit(shift_features(active), active[TARGET])
+
+    def to_dict(self) -> Dict:
+        return {
+            'intercept': self.intercept_,
+            'coefficients': dict(zip(self.features, map(float, self.coef_))) if self.coef_ is not None else {},
+            'r2': self.r2_,
+            'n_samples': self.n_samples_,
+        }
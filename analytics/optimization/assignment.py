@@ -0,0 +1,76 @@
+# =============================================
+# Asignación de viajes camión-ruta (MILP con PuLP)
+# =============================================
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+
+def solve_assignment(trucks: List[Dict], routes: List[Dict], time_limit: Optional[int] = 30) -> Dict:
+    """
+    Minimiza el combustible total asignando viajes enteros de cada camión a
+    cada ruta, cumpliendo el tonelaje objetivo de cada ruta.
+
+        min  Σ x[c,r] · 2 · km[r] · L/km[c]
+        s.a. Σ_c x[c,r] · capacidad[c] >= objetivo[r]     (cada ruta)
+             Σ_r x[c,r] · horas_viaje[c,r] <= horas[c]     (cada camión)
+             x[c,r] entero >= 0
+
+    Args:
+        trucks: [{'truck', 'capacity_t', 'liters_per_km', 'available_h', 'speed_kmh'}]
+        routes: [{'route', 'distance_km', 'target_t', 'load_unload_h'}]
+        time_limit: Segundos máximos del solver CBC
+
+    Returns:
+        {'status', 'total_fuel_l', 'assignments': [...], 'routes': [...]}
+    """
+    import pulp
+
+    if not trucks or not routes:
+        raise ValueError("Se requiere al menos un camión y una ruta")
+    if len({t['truck'] for t in trucks}) < len(trucks) or len({r['route'] for r in routes}) < len(routes):
+        raise ValueError("Los nombres de camiones y de rutas deben ser únicos")
+
+    problem = pulp.LpProblem("asignacion_flota", pulp.LpMinimize)
+    x = {
+        (t['truck'], r['route']): pulp.LpVariable(f"x_{i}_{j}", lowBound=0, cat='Integer')
+        for i, t in enumerate(trucks) for j, r in enumerate(routes)
+    }
+
+    def trip_fuel(t, r):
+        return 2 * r['distance_km'] * t['liters_per_km']
+
+    def trip_hours(t, r):
+        return 2 * r['distance_km'] / t.get('speed_kmh', 25.0) + r.get('load_unload_h', 0.25)
+
+    problem += pulp.lpSum(x[t['truck'], r['route']] * trip_fuel(t, r) for t in trucks for r in routes)
+    for r in routes:
+        problem += (pulp.lpSum(x[t['truck'], r['route']] * t['capacity_t'] for t in trucks) >= r['target_t'],
+                    f"tonelaje_{r['route']}")
+    for t in trucks:
+        problem += (pulp.lpSum(x[t['truck'], r['route']] * trip_hours(t, r) for r in routes) <= t['available_h'],
+                    f"horas_{t['truck']}")
+
+    problem.solve(pulp.PULP_CBC_CMD(msg=False, timeLimit=time_limit))
+    status = pulp.LpStatus[problem.status]
+    if status != 'Optimal':
+        return {'status': status, 'total_fuel_l': None, 'assignments': [], 'routes': []}
+
+    assignments = []
+    for t in trucks:
+        for r in routes:
+            trips = int(round(x[t['truck'], r['route']].value() or 0))
+            if trips:
+                assignments.append({
+                    'truck': t['truck'], 'route': r['route'], 'trips': trips,
+                    'tonnage_t': trips * t['capacity_t'], 'fuel_l': trips * trip_fuel(t, r),
+                    'hours': trips * trip_hours(t, r),
+                })
+    table = pd.DataFrame(assignments, columns=['truck', 'route', 'trips', 'tonnage_t', 'fuel_l', 'hours'])
+    by_route = table.groupby('route')[['trips', 'tonnage_t', 'fuel_l']].sum()
+    return {
+        'status': status,
+        'total_fuel_l': float(table['fuel_l'].sum()),
+        'assignments': assignments,
+        'routes': [{'route': r, **{k: float(v) for k, v in row.items()}} for r, row in by_route.iterrows()],
+    }
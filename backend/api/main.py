@@ -0,0 +1,46 @@
+# =============================================
+# API FastAPI de OptiMine
+#   uvicorn backend.api.main:app --host 0.0.0.0 --port 8000
+# =============================================
+from contextlib import asynccontextmanager
+from typing import Optional
+
+from fastapi import FastAPI, Request
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse
+
+from backend.api.routers import kpis, optimize, predict, telemetry
+from backend.api.services import DATA_ROOT, ROLLUP_ROOT, Services
+
+
+def create_app(data_root: str = DATA_ROOT, rollup_root: str = ROLLUP_ROOT, max_threads: Optional[int] = None,
+               max_processes: Optional[int] = None) -> FastAPI:
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        app.state.services = Services(data_root, rollup_root, max_threads=max_threads, max_processes=max_processes)
+        yield
+        app.state.services.shutdown()
+
+    app = FastAPI(title="OptiMine API", version="0.1", lifespan=lifespan)
+    app.add_middleware(GZipMiddleware, minimum_size=1024)
+    for module in (kpis, predict, optimize, telemetry):
+        app.include_router(module.router)
+
+    # Errores del dominio -> códigos HTTP
+    @app.exception_handler(FileNotFoundError)
+    async def not_found(request: Request, exc: FileNotFoundError):
+        return JSONResponse(status_code=404, content={'detail': str(exc)})
+
+    @app.exception_handler(ValueError)
+    async def invalid(request: Request, exc: ValueError):
+        return JSONResponse(status_code=422, content={'detail': str(exc)})
+
+    @app.get("/health")
+    async def health(request: Request):
+        services = request.app.state.services
+        return {'status': 'ok', 'cache': services.cache_stats(), 'telemetry': services.telemetry.stats()}
+
+    return app
+
+
+app = create_app()
@@ -0,0 +1,53 @@
+# =============================================
+# KPIs por camión y rango de fechas, y descarga de datos
+# =============================================
+from datetime import date
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Query
+
+from backend.api.schemas import Grain, StreamFormat
+from backend.api.services import Services, get_services
+from backend.api.streaming import frame_response
+
+router = APIRouter(tags=["kpis"])
+
+
+@router.get("/trucks")
+async def list_trucks(services: Services = Depends(get_services)) -> List[str]:
+    trucks = await services.cached(('trucks',), lambda: sorted(set(services.data.trucks())
+                                                                | set(services.rollups.trucks())))
+    return trucks
+
+
+@router.get("/kpis")
+async def kpis(trucks: Optional[List[str]] = Query(None), start: Optional[date] = None, end: Optional[date] = None,
+               grain: Grain = 'hour', fleet: bool = False, services: Services = Depends(get_services)):
+    """
+    KPIs del rango (fechas inclusive) desde los rollups: totales y L/h, L/día,
+    L/t, velocidad en movimiento y % ralentí. `fleet=true` agrega la selección.
+    """
+    key = ('kpis', tuple(trucks) if trucks else None, start, end, grain, fleet)
+    table = await services.cached(key, services.rollups.kpis, trucks, start, end, grain,
+                                  by=None if fleet else 'Equipment')
+    return frame_response(table.rename_axis('Equipment').reset_index() if not fleet else table.reset_index(drop=True))
+
+
+@router.get("/kpis/{truck}/series")
+async def kpi_series(truck: str, grain: Grain = 'day', start: Optional[date] = None, end: Optional[date] = None,
+                     format: StreamFormat = 'json', services: Services = Depends(get_services)):
+    """Filas de rollup de un camión (para gráficos diarios/horarios)."""
+    rows = await services.cached(('series', truck, grain, start, end), services.rollups.query, grain, [truck],
+                                 start, end)
+    return frame_response(rows, format)
+
+
+@router.get("/trucks/{truck}/{data_type}")
+async def truck_data(truck: str, data_type: str, start: date, end: date, columns: Optional[List[str]] = Query(None),
+                     format: StreamFormat = 'arrow', services: Services = Depends(get_services)):
+    """
+    Registros procesados del rango, en Arrow IPC (por defecto) o NDJSON por
+    lotes. La lectura usa la caché por día de `FleetDataSource`.
+    """
+    frame = await services.run(services.data.load, truck, start, end, data_type, columns)
+    return frame_response(frame, format)
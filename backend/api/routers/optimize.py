@@ -0,0 +1,37 @@
+# =============================================
+# Optimización de asignación camión-ruta (MILP)
+# =============================================
+import json
+
+from fastapi import APIRouter, Depends
+
+from analytics.optimization.assignment import solve_assignment
+from backend.api.schemas import OptimizeRequest, OptimizeResponse
+from backend.api.services import Services, get_services
+
+router = APIRouter(tags=["optimize"])
+
+
+async def _liters_per_km(body: OptimizeRequest, services: Services) -> dict:
+    """L/km declarados o estimados con los rollups del rango."""
+    missing = [t.truck for t in body.trucks if t.liters_per_km is None]
+    rates = {t.truck: t.liters_per_km for t in body.trucks if t.liters_per_km is not None}
+    if missing:
+        kpis = await services.cached(('kpis', tuple(missing), body.start, body.end, 'day', False),
+                                     services.rollups.kpis, missing, body.start, body.end, 'day')
+        for truck in missing:
+            if truck not in kpis.index or not kpis.loc[truck, 'distance_km'] > 0:
+                raise ValueError(f"Sin distancia registrada para estimar L/km de {truck}; indicar liters_per_km")
+            rates[truck] = float(kpis.loc[truck, 'fuel_consumed_l'] / kpis.loc[truck, 'distance_km'])
+    return rates
+
+
+@router.post("/optimize", response_model=OptimizeResponse)
+async def optimize(body: OptimizeRequest, services: Services = Depends(get_services)):
+    """Resuelve el MILP en el pool de procesos; pedidos idénticos se sirven de la caché."""
+    rates = await _liters_per_km(body, services)
+    trucks = [{**t.model_dump(), 'liters_per_km': rates[t.truck]} for t in body.trucks]
+    routes = [r.model_dump() for r in body.routes]
+    key = ('optimize', json.dumps([trucks, routes, body.time_limit_s], sort_keys=True))
+    result = await services.cached(key, solve_assignment, trucks, routes, body.time_limit_s, cpu=True)
+    return OptimizeResponse(**result, liters_per_km=rates)
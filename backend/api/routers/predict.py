@@ -0,0 +1,31 @@
+# =============================================
+# Predicción de consumo por turno
+# =============================================
+import pandas as pd
+from fastapi import APIRouter, Depends
+
+from analytics.models.fuel_model import FuelRateModel
+from backend.api.schemas import PredictRequest, PredictResponse
+from backend.api.services import Services, get_services
+
+router = APIRouter(tags=["predict"])
+
+
+def _fit(services: Services, truck: str, grain: str, start, end, ridge: float) -> FuelRateModel:
+    rollup = services.rollups.query(grain, [truck], start, end)
+    if rollup.empty:
+        raise FileNotFoundError(f"No hay rollups para {truck} en el rango pedido")
+    return FuelRateModel.from_rollup(rollup, ridge)
+
+
+@router.post("/predict", response_model=PredictResponse)
+async def predict(body: PredictRequest, services: Services = Depends(get_services)):
+    """
+    Ajusta (o reutiliza) el modelo lineal del camión con sus rollups del rango
+    y estima los litros de cada escenario.
+    """
+    model = await services.cached(('model', body.truck, body.grain, body.start, body.end, body.ridge),
+                                  _fit, services, body.truck, body.grain, body.start, body.end, body.ridge)
+    scenarios = pd.DataFrame([s.model_dump() for s in body.scenarios])
+    return PredictResponse(truck=body.truck, model=model.to_dict(),
+                           predictions_l=[float(v) for v in model.predict(scenarios)])
@@ -0,0 +1,64 @@
+# =============================================
+# Ingesta de telemetría y WebSocket de deltas en vivo
+# =============================================
+import asyncio
+from typing import Optional
+
+import pandas as pd
+from fastapi import APIRouter, Depends, Request, WebSocket
+
+from backend.api.services import Services, get_services
+
+router = APIRouter(tags=["telemetry"])
+
+
+@router.post("/telemetry")
+async def ingest(request: Request, services: Services = Depends(get_services)):
+    """
+    Recibe lecturas nuevas (lista JSON de registros con Equipment y
+    FullDateTime), las difunde a los clientes conectados y las suma a los
+    rollups.
+    """
+    payload = await request.json()
+    if not isinstance(payload, list) or not all(isinstance(row, dict) for row in payload):
+        raise ValueError("Se espera una lista de registros")
+    rows = pd.DataFrame(payload)
+    if rows.empty:
+        return {'published': {}}
+    missing = [col for col in ('Equipment', 'FullDateTime') if col not in rows.columns]
+    if missing:
+        raise ValueError(f"Columnas requeridas faltantes: {missing}")
+    rows['FullDateTime'] = pd.to_datetime(rows['FullDateTime'], errors='coerce')
+    invalid = rows['FullDateTime'].isna() | rows['Equipment'].isna()
+    if invalid.any():
+        raise ValueError(f"Registros sin Equipment o con FullDateTime inválido: {invalid.to_numpy().nonzero()[0].tolist()}")
+    deltas = await services.run(services.telemetry.encode, rows)
+    published = {truck: services.telemetry.broadcast(truck, delta) for truck, delta in deltas}
+    # Los rollups guardan estado por camión en disco: una actualización a la vez
+    async with services.ingest_lock:
+        stats = await services.run(services.rollups.update, rows)
+    return {'published': published, 'rollups': stats}
+
+
+@router.websocket("/ws/telemetry/{truck}")
+async def telemetry_ws(websocket: WebSocket, truck: str, since: Optional[int] = None):
+    """Envía los deltas del camión a medida que llegan (con `since`, también los perdidos)."""
+    hub = websocket.app.state.services.telemetry
+    await websocket.accept()
+    subscription = hub.subscribe(truck, since)
+    receiver = asyncio.ensure_future(websocket.receive())
+    try:
+        while True:
+            getter = asyncio.ensure_future(subscription.queue.get())
+            done, _ = await asyncio.wait({getter, receiver}, return_when=asyncio.FIRST_COMPLETED)
+            if receiver in done:
+                getter.cancel()
+                if receiver.result()['type'] == 'websocket.disconnect':
+                    break
+                # Mensajes del cliente (p. ej. ping) se ignoran
+                receiver = asyncio.ensure_future(websocket.receive())
+                continue
+            await websocket.send_text(getter.result())
+    finally:
+        receiver.cancel()
+        hub.unsubscribe(subscription)
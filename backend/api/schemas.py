@@ -0,0 +1,81 @@
+# =============================================
+# Esquemas de entrada/salida de la API (Pydantic v2)
+# =============================================
+from datetime import date
+from typing import Dict, List, Literal, Optional
+
+from pydantic import BaseModel, Field, model_validator
+
+Grain = Literal['hour', 'shift', 'day']
+StreamFormat = Literal['json', 'ndjson', 'arrow']
+
+
+class DateRange(BaseModel):
+    start: Optional[date] = None
+    end: Optional[date] = None
+
+    @model_validator(mode='after')
+    def _ordered(self):
+        if self.start and self.end and self.end < self.start:
+            raise ValueError(f"Rango de fechas inválido: {self.start} > {self.end}")
+        return self
+
+
+class Scenario(BaseModel):
+    """Operación planificada de un turno."""
+    tonnage_t: float = Field(ge=0)
+    distance_km: float = Field(ge=0)
+    idle_h: float = Field(0.0, ge=0)
+    moving_h: float = Field(ge=0)
+
+
+class PredictRequest(DateRange):
+    truck: str
+    grain: Grain = 'shift'
+    ridge: float = Field(0.0, ge=0)
+    scenarios: List[Scenario] = Field(min_length=1)
+
+
+class PredictResponse(BaseModel):
+    truck: str
+    model: Dict
+    predictions_l: List[float]
+
+
+class TruckSpec(BaseModel):
+    truck: str
+    capacity_t: float = Field(gt=0)
+    # Sin valor se estima de los rollups del camión (litros / km recorridos)
+    liters_per_km: Optional[float] = Field(None, gt=0)
+    available_h: float = Field(12.0, gt=0)
+    speed_kmh: float = Field(25.0, gt=0)
+
+
+class RouteSpec(BaseModel):
+    route: str
+    distance_km: float = Field(gt=0)
+    target_t: float = Field(ge=0)
+    load_unload_h: float = Field(0.25, ge=0)
+
+
+class OptimizeRequest(DateRange):
+    trucks: List[TruckSpec] = Field(min_length=1)
+    routes: List[RouteSpec] = Field(min_length=1)
+    time_limit_s: int = Field(30, gt=0, le=600)
+
+    @model_validator(mode='after')
+    def _unique_names(self):
+        # Cada camión y ruta identifica una variable y una restricción del modelo
+        for label, names in (('camiones', [t.truck for t in self.trucks]), ('rutas', [r.route for r in self.routes])):
+            duplicated = sorted({name for name in names if names.count(name) > 1})
+            if duplicated:
+                raise ValueError(f"Nombres de {label} duplicados: {duplicated}")
+        return self
+
+
+class OptimizeResponse(BaseModel):
+    status: str
+    total_fuel_l: Optional[float]
+    assignments: List[Dict]
+    routes: List[Dict]
+    liters_per_km: Dict[str, float]
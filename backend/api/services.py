@@ -0,0 +1,96 @@
+# =============================================
+# Servicios compartidos de la API: datos, caché de respuestas y ejecutores
+# =============================================
+import asyncio
+import functools
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Hashable, Optional
+
+from fastapi import Request
+
+from analytics.aggregation.rollups import RollupStore
+from backend.api.telemetry import TelemetryHub
+from interfaces.web.app.data.fleet_data import FleetDataSource
+from interfaces.web.app.data.frame_cache import FrameCache
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+DATA_ROOT = os.environ.get("OPTIMINE_DATA_ROOT", os.path.join(REPO_ROOT, "data-set", "processed"))
+ROLLUP_ROOT = os.environ.get("OPTIMINE_ROLLUP_ROOT", os.path.join(REPO_ROOT, "data-set", "rollups"))
+RESPONSE_TTL_S = 60
+_MISSING = object()
+
+
+class Services:
+    """
+    Estado compartido por todas las peticiones de un worker de uvicorn.
+
+    El bucle de eventos nunca ejecuta pandas ni el solver: las lecturas y
+    agregaciones van al pool de hilos (parquet y numpy liberan el GIL) y el
+    trabajo CPU puro (MILP) al pool de procesos. Los resultados quedan en una
+    caché de respuestas con TTL corto, común a todos los usuarios; el vuelo
+    único se resuelve en el bucle de eventos, así las peticiones que esperan
+    un cálculo en curso no ocupan hilos del pool.
+    """
+
+    def __init__(self, data_root: str = DATA_ROOT, rollup_root: str = ROLLUP_ROOT,
+                 cache: Optional[FrameCache] = None, max_threads: Optional[int] = None,
+                 max_processes: Optional[int] = None):
+        self.data = FleetDataSource(data_root)
+        self.rollups = RollupStore(rollup_root)
+        self.cache = cache if cache is not None else FrameCache(max_entries=1024, max_bytes=256 * 1024 ** 2,
+                                                                ttl=RESPONSE_TTL_S)
+        self.telemetry = TelemetryHub()
+        self.ingest_lock = asyncio.Lock()
+        self.threads = ThreadPoolExecutor(max_workers=max_threads, thread_name_prefix="optimine-api")
+        self.max_processes = max_processes
+        self._processes = None          # se crea con la primera tarea CPU
+        self._inflight = {}             # clave -> asyncio.Task del cálculo en curso
+        self.coalesced = 0
+
+    @property
+    def processes(self) -> ProcessPoolExecutor:
+        if self._processes is None:
+            self._processes = ProcessPoolExecutor(max_workers=self.max_processes)
+        return self._processes
+
+    async def run(self, fn: Callable, *args, cpu: bool = False, **kwargs) -> Any:
+        """Ejecuta `fn` fuera del bucle de eventos (en procesos si `cpu`)."""
+        executor = self.processes if cpu else self.threads
+        return await asyncio.get_running_loop().run_in_executor(executor, functools.partial(fn, *args, **kwargs))
+
+    async def cached(self, key: Hashable, fn: Callable, *args, cpu: bool = False, **kwargs) -> Any:
+        """
+        Resultado de `fn(*args)` desde la caché de respuestas o calculado en un
+        ejecutor. Peticiones idénticas simultáneas esperan al mismo cálculo.
+        """
+        value = self.cache.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._load(key, fn, args, kwargs, cpu))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self.coalesced += 1
+        # shield: si una petición se cancela, el cálculo sigue para las demás
+        return await asyncio.shield(task)
+
+    async def _load(self, key: Hashable, fn: Callable, args: tuple, kwargs: dict, cpu: bool) -> Any:
+        value = await self.run(fn, *args, cpu=cpu, **kwargs)
+        self.cache.put(key, value)
+        return value
+
+    def cache_stats(self) -> dict:
+        return {**self.cache.stats(), 'coalesced': self.coalesced, 'inflight': len(self._inflight)}
+
+    def shutdown(self):
+        self.threads.shutdown(wait=False, cancel_futures=True)
+        if self._processes is not None:
+            self._processes.shutdown(wait=False, cancel_futures=True)
+
+
+def get_services(request: Request) -> Services:
+    return request.app.state.services
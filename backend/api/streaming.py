@@ -0,0 +1,47 @@
+# =============================================
+# Respuestas de DataFrames: JSON, NDJSON y Arrow IPC por lotes
+# =============================================
+import io
+from typing import Iterator
+
+import pandas as pd
+import pyarrow as pa
+from fastapi.responses import Response, StreamingResponse
+
+ARROW_MEDIA_TYPE = 'application/vnd.apache.arrow.stream'
+NDJSON_MEDIA_TYPE = 'application/x-ndjson'
+BATCH_ROWS = 50_000
+
+
+def ndjson_chunks(df: pd.DataFrame, batch_rows: int = BATCH_ROWS) -> Iterator[bytes]:
+    """Una línea JSON por fila, serializada por lotes."""
+    for start in range(0, len(df), batch_rows):
+        chunk = df.iloc[start:start + batch_rows].to_json(orient='records', lines=True, date_format='iso')
+        yield (chunk if chunk.endswith('\n') else chunk + '\n').encode('utf-8')
+
+
+def arrow_chunks(df: pd.DataFrame, batch_rows: int = BATCH_ROWS) -> Iterator[bytes]:
+    """
+    Flujo Arrow IPC: el esquema en el primer mensaje y luego un record batch
+    por lote, de modo que el cliente puede leerlo con `pa.ipc.open_stream`
+    sin esperar al final.
+    """
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        for batch in table.to_batches(max_chunksize=batch_rows):
+            writer.write_batch(batch)
+            yield sink.getvalue()
+            sink.seek(0)
+            sink.truncate()
+    yield sink.getvalue()
+
+
+def frame_response(df: pd.DataFrame, fmt: str = 'json', batch_rows: int = BATCH_ROWS) -> Response:
+    if fmt == 'arrow':
+        return StreamingResponse(arrow_chunks(df, batch_rows), media_type=ARROW_MEDIA_TYPE)
+    if fmt == 'ndjson':
+        return StreamingResponse(ndjson_chunks(df, batch_rows), media_type=NDJSON_MEDIA_TYPE)
+    if fmt == 'json':
+        return Response(df.to_json(orient='records', date_format='iso'), media_type='application/json')
+    raise ValueError(f"Formato no soportado: {fmt}")
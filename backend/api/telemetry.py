@@ -0,0 +1,120 @@
+# =============================================
+# Telemetría en vivo: deltas por camión con difusión a muchos clientes
+# =============================================
+import asyncio
+import json
+from collections import deque
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+LIVE_COLUMNS = ('FuelLevelLiters', 'Speed', 'RPM')
+
+
+class Subscription:
+    """Cola de mensajes (ya serializados) de un cliente conectado."""
+
+    def __init__(self, truck: str, queue_size: int):
+        self.truck = truck
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.dropped = 0
+
+
+class TelemetryHub:
+    """
+    Canal por camión: cada lote nuevo se codifica una sola vez como delta
+    columnar compacto
+
+        {"type": "delta", "truck": "T-210", "seq": 42,
+         "t": [epoch_ms, ...], "y": {"Speed": [...], ...}}
+
+    y el mismo texto se encola para todos los suscriptores del camión, así el
+    costo es proporcional a las filas nuevas y no a la ventana que muestra
+    cada cliente. Se guardan los últimos `history` deltas para que un cliente
+    que se reconecta con `since=seq` recupere lo que se perdió. Un cliente
+    lento cuya cola se llena recibe un mensaje "resync" en lugar de frenar
+    al resto.
+
+    Todos los métodos salvo `encode` deben llamarse desde el bucle de eventos.
+    """
+
+    def __init__(self, columns: Sequence[str] = LIVE_COLUMNS, history: int = 256, queue_size: int = 256,
+                 decimals: int = 3, time_col: str = 'FullDateTime'):
+        self.columns = list(columns)
+        self.history = history
+        self.queue_size = queue_size
+        self.decimals = decimals
+        self.time_col = time_col
+        self._subscribers: Dict[str, set] = {}
+        self._recent: Dict[str, deque] = {}        # camión -> deque[(seq, mensaje)]
+        self._seq: Dict[str, int] = {}
+
+    def encode(self, rows: pd.DataFrame) -> List[Tuple[str, dict]]:
+        """Deltas (sin número de secuencia) por camión; puro, apto para un hilo."""
+        missing = [c for c in ('Equipment', self.time_col) if c not in rows.columns]
+        if missing:
+            raise KeyError(f"Columnas requeridas faltantes: {missing}")
+        deltas = []
+        for truck, group in rows.groupby('Equipment', sort=True):
+            group = group.sort_values(self.time_col, kind='stable')
+            times = pd.to_datetime(group[self.time_col]).to_numpy(dtype='datetime64[ms]').astype(np.int64)
+            values = {}
+            for col in self.columns:
+                if col in group.columns:
+                    series = pd.to_numeric(group[col], errors='coerce').round(self.decimals)
+                    # NaN no es JSON válido: se envía null
+                    values[col] = [None if np.isnan(v) else v for v in series.tolist()]
+            deltas.append((str(truck), {'type': 'delta', 'truck': str(truck), 't': times.tolist(), 'y': values}))
+        return deltas
+
+    def broadcast(self, truck: str, delta: dict) -> int:
+        """Asigna secuencia, guarda en el historial y encola en cada suscriptor."""
+        seq = self._seq.get(truck, 0) + 1
+        self._seq[truck] = seq
+        message = json.dumps({**delta, 'seq': seq}, separators=(',', ':'))
+        self._recent.setdefault(truck, deque(maxlen=self.history)).append((seq, message))
+        for subscription in self._subscribers.get(truck, ()):
+            self._offer(subscription, message, seq)
+        return seq
+
+    def publish(self, rows: pd.DataFrame) -> Dict[str, int]:
+        """`encode` + `broadcast`; devuelve la última secuencia por camión."""
+        return {truck: self.broadcast(truck, delta) for truck, delta in self.encode(rows)}
+
+    def _offer(self, subscription: Subscription, message: str, seq: int):
+        try:
+            subscription.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            # Se descarta lo pendiente: el cliente debe recargar la ventana
+            while not subscription.queue.empty():
+                subscription.queue.get_nowait()
+            subscription.dropped += 1
+            subscription.queue.put_nowait(json.dumps({'type': 'resync', 'truck': subscription.truck, 'seq': seq}))
+
+    def subscribe(self, truck: str, since: Optional[int] = None) -> Subscription:
+        """Registra un cliente; con `since` reenvía los deltas posteriores aún guardados."""
+        subscription = Subscription(truck, self.queue_size)
+        if since is not None:
+            recent = self._recent.get(truck, ())
+            if recent and since < recent[0][0] - 1:
+                self._offer(subscription, json.dumps({'type': 'resync', 'truck': truck, 'seq': recent[0][0]}), 0)
+            for seq, message in recent:
+                if seq > since:
+                    self._offer(subscription, message, seq)
+        self._subscribers.setdefault(truck, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        subscribers = self._subscribers.get(subscription.truck)
+        if subscribers is not None:
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[subscription.truck]
+
+    def stats(self) -> dict:
+        return {
+            'trucks': len(self._seq),
+            'subscribers': sum(len(s) for s in self._subscribers.values()),
+            'last_seq': dict(self._seq),
+        }
@@ -1,128 +1,152 @@
 import os
-import shutil
-from openpyxl import load_workbook, Workbook
-
-def eliminar_columnas_y_formato():
-    origen = os.path.join("..", "data-set", "val_data_sensor", "raw_data")
-    backup = os.path.join("..", "data-set", "val_data_sensor", "backup_data")
-    inicio = 2
-    paso = 3
-
-    if not os.path.exists(backup):
-        os.makedirs(backup)
-
-    for archivo in os.listdir(origen):
+import re
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, time
+from typing import List, Optional, Tuple
+
+import pandas as pd
+from openpyxl import load_workbook
+
+ORIGEN = os.path.join("..", "data-set", "val_data_sensor", "raw_data")
+DESTINO = os.path.join("..", "data-set", "val_data_sensor", "parquet_data")
+COLUMNAS = ['ShiftDate', 'TimeStamp', 'Equipment', 'FuelLevelLiters']
+
+# Cada hoja EQUIPO*.xlsx trae bloques de 3 columnas lado a lado. Cada bloque
+# empieza con un encabezado "EQUIPO <camión> dd/mm/yyyy" seguido de las filas
+# (CODIGO EQ., RECEPCION, litros); un mismo bloque puede apilar varios días.
+ANCHO_BLOQUE = 3
+COL_CODIGO = 0
+COL_HORA = 1
+COL_LITROS = 2
+ENCABEZADO = re.compile(r'EQUIPO\s+(?P<equipo>\S+)\s+(?P<fecha>\d{1,2}/\d{1,2}/\d{4})', re.IGNORECASE)
+
+
+def leer_encabezado(celdas) -> Optional[Tuple[str, pd.Timestamp]]:
+    """Camión y fecha del encabezado 'EQUIPO T-210 31/01/2025' si alguna celda lo contiene."""
+    for celda in celdas:
+        if isinstance(celda, str):
+            encontrado = ENCABEZADO.search(celda)
+            if encontrado:
+                fecha = pd.to_datetime(encontrado['fecha'], format='%d/%m/%Y')
+                return encontrado['equipo'], fecha
+    return None
+
+
+def hora_del_dia(valor) -> Optional[pd.Timedelta]:
+    """
+    Hora de RECEPCION como desplazamiento desde la medianoche. Acepta time,
+    datetime (solo se usa la hora), fracción de día de Excel o texto 'HH:MM'.
+    """
+    if valor is None or isinstance(valor, bool):
+        return None
+    if isinstance(valor, datetime):
+        valor = valor.time()
+    if isinstance(valor, time):
+        return pd.Timedelta(hours=valor.hour, minutes=valor.minute, seconds=valor.second)
+    if isinstance(valor, (int, float)):
+        return pd.Timedelta(days=float(valor)) if 0 <= valor < 1 else None
+    try:
+        return pd.to_timedelta(str(valor).strip() + (':00' if str(valor).count(':') == 1 else ''))
+    except ValueError:
+        return None
+
+
+def leer_libro(ruta_archivo: str) -> pd.DataFrame:
+    """
+    Lee un libro EQUIPO*.xlsx en modo streaming y devuelve la tabla reestructurada.
+
+    Reemplaza a `eliminar_columnas_y_formato` + `reestructurar_columnas`: en lugar de
+    borrar columnas y recorrer celdas con `ws.cell()`, cada fila se lee una sola vez
+    y se separa directamente en los bloques. El camión y la fecha salen del
+    encabezado del bloque y la hora de la columna RECEPCION.
+    """
+    wb = load_workbook(ruta_archivo, read_only=True, data_only=True)
+    registros = []
+    try:
+        for ws in wb.worksheets:
+            bloques = {}  # inicio del bloque -> [[equipo, fecha, filas], ...] por encabezado
+            for fila in ws.iter_rows(values_only=True):
+                for inicio in range(0, len(fila), ANCHO_BLOQUE):
+                    celdas = fila[inicio:inicio + ANCHO_BLOQUE]
+                    encabezado = leer_encabezado(celdas)
+                    if encabezado:
+                        bloques.setdefault(inicio, []).append([*encabezado, []])
+                        continue
+                    if inicio not in bloques or len(celdas) <= COL_LITROS:
+                        continue  # Filas previas al primer encabezado
+                    hora = hora_del_dia(celdas[COL_HORA])
+                    litros = pd.to_numeric(celdas[COL_LITROS], errors='coerce')
+                    if hora is None or pd.isna(litros):
+                        continue  # Títulos de columna, totales o celdas vacías
+                    bloques[inicio][-1][2].append((hora, float(litros)))
+
+            # Mismo orden que el script original: bloque por bloque, fila por fila
+            for inicio in sorted(bloques):
+                for equipo, fecha, filas in bloques[inicio]:
+                    registros.extend((fecha, fecha + hora, equipo, litros) for hora, litros in filas)
+    finally:
+        wb.close()
+
+    df = pd.DataFrame(registros, columns=COLUMNAS)
+    df['ShiftDate'] = pd.to_datetime(df['ShiftDate'])
+    df['TimeStamp'] = pd.to_datetime(df['TimeStamp'])
+    df['Equipment'] = df['Equipment'].astype(object)
+    df['FuelLevelLiters'] = df['FuelLevelLiters'].astype(float)
+    return df.sort_values(['Equipment', 'TimeStamp'], kind='stable').reset_index(drop=True)
+
+
+def convertir_libro(ruta_archivo: str, destino: str, sobrescribir: bool = False) -> Tuple[str, int]:
+    """Convierte un libro a Parquet sin modificar el archivo de origen."""
+    salida = os.path.join(destino, os.path.splitext(os.path.basename(ruta_archivo))[0] + ".parquet")
+    if not sobrescribir and os.path.exists(salida) and os.path.getmtime(salida) >= os.path.getmtime(ruta_archivo):
+        return salida, -1  # Ya convertido y vigente
+
+    df = leer_libro(ruta_archivo)
+    temporal = salida + ".tmp"
+    df.to_parquet(temporal, index=False)
+    os.replace(temporal, salida)
+    return salida, len(df)
+
+
+def archivos_equipo(origen: str = ORIGEN) -> List[str]:
+    """Lista los libros EQUIPO*.xlsx no vacíos del directorio de origen."""
+    archivos = []
+    for archivo in sorted(os.listdir(origen)):
         if archivo.startswith('EQUIPO') and archivo.endswith('.xlsx'):
-            ruta_archivo = os.path.join(origen, archivo)
-
+            ruta = os.path.join(origen, archivo)
+            if os.path.getsize(ruta) == 0:
+                print(f"⚠️ {archivo} está vacío, se omite.")
+                continue
+            archivos.append(ruta)
+    return archivos
+
+
+def convertir_equipos(origen: str = ORIGEN, destino: str = DESTINO, max_workers: Optional[int] = None,
+                      sobrescribir: bool = False) -> List[str]:
+    """Convierte todos los libros EQUIPO*.xlsx a Parquet en paralelo (un proceso por libro)."""
+    os.makedirs(destino, exist_ok=True)
+    archivos = archivos_equipo(origen)
+    generados = []
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futuros = {executor.submit(convertir_libro, ruta, destino, sobrescribir): ruta for ruta in archivos}
+        for futuro in as_completed(futuros):
+            archivo = os.path.basename(futuros[futuro])
             try:
-                if os.path.getsize(ruta_archivo) == 0:
-                    print(f"⚠️ {archivo} está vacío, se omite.")
-                    continue
-
-                # Backup
-                shutil.copy(ruta_archivo, os.path.join(backup, archivo))
-
-                # Cargar archivo original
-                wb_original = load_workbook(ruta_archivo)
-                wb_limpio = Workbook()
-                wb_limpio.remove(wb_limpio.active)  # Quitar hoja por defecto
-
-                for hoja_nombre in wb_original.sheetnames:
-                    hoja_origen = wb_original[hoja_nombre]
-                    hoja_nueva = wb_limpio.create_sheet(title=hoja_nombre)
-
-                    for fila in hoja_origen.iter_rows(values_only=True):
-                        hoja_nueva.append(list(fila))  # Solo valores
-
-                    # Eliminar columnas en la hoja nueva
-                    total_columnas = hoja_nueva.max_column
-                    columnas_a_eliminar = list(range(2, total_columnas + 1, 3))
-                    
-                    for col in sorted(columnas_a_eliminar, reverse=True):
-                        if col <= hoja_nueva.max_column:
-                            hoja_nueva.delete_cols(col)
-
-                    print(f"   🧹 Hoja '{hoja_nombre}': columnas eliminadas -> {columnas_a_eliminar}")
-
-                # Guardar archivo limpio y reemplazar
-                wb_limpio.save(ruta_archivo)
-                print(f"✅ {archivo} formateado y procesado correctamente")
-
+                salida, registros = futuro.result()
             except Exception as e:
                 print(f"❌ Error en {archivo}: {str(e)}")
+                continue
+            generados.append(salida)
+            if registros < 0:
+                print(f"⏭️ {archivo} sin cambios, se omite")
+            else:
+                print(f"✅ {archivo} -> {os.path.basename(salida)} ({registros:,} registros)")
 
-if __name__ == "__main__":
-    print("=== INICIO DEL LIMPIADOR TOTAL ===")
-    eliminar_columnas_y_formato()
-    print("=== FINALIZADO ===")
-
-
-
-
-
+    return sorted(generados)
 
 
-
-import os
-import shutil
-from openpyxl import load_workbook, Workbook
-
-def reestructurar_columnas():
-    origen = os.path.join("..", "data-set", "val_data_sensor", "raw_data")
-    backup = os.path.join("..", "data-set", "val_data_sensor", "backup_data")
-
-    if not os.path.exists(backup):
-        os.makedirs(backup)
-
-    for archivo in os.listdir(origen):
-        if archivo.startswith("EQUIPO") and archivo.endswith(".xlsx"):
-            ruta_archivo = os.path.join(origen, archivo)
-
-            try:
-                if os.path.getsize(ruta_archivo) == 0:
-                    print(f"⚠️ {archivo} está vacío. Se omite.")
-                    continue
-
-                # Backup
-                shutil.copy(ruta_archivo, os.path.join(backup, archivo))
-
-                # Cargar original
-                wb_origen = load_workbook(ruta_archivo)
-                wb_nuevo = Workbook()
-                hoja_destino = wb_nuevo.active
-                hoja_destino.title = "Unificado"
-
-                fila_actual = 1  # Control de filas en hoja destino
-
-                for nombre_hoja in wb_origen.sheetnames:
-                    ws = wb_origen[nombre_hoja]
-                    max_col = ws.max_column
-                    max_row = ws.max_row
-
-                    # Recorrer columnas de dos en dos (C-D, E-F, etc.)
-                    for col in range(1, max_col + 1, 2):  # 1-based indexing
-                        if col + 1 > max_col:
-                            break  # si no hay par completo, saltar
-
-                        for fila in range(1, max_row + 1):
-                            val1 = ws.cell(row=fila, column=col).value
-                            val2 = ws.cell(row=fila, column=col + 1).value
-
-                            # Solo agregamos si hay al menos un valor
-                            if val1 is not None or val2 is not None:
-                                hoja_destino.cell(row=fila_actual, column=1, value=val1)
-                                hoja_destino.cell(row=fila_actual, column=2, value=val2)
-                                fila_actual += 1
-
-                # Guardar sobre el archivo original
-                wb_nuevo.save(ruta_archivo)
-                print(f"✅ {archivo} reestructurado exitosamente")
-
-            except Exception as e:
-                print(f"❌ Error en {archivo}: {str(e)}")
-
 if __name__ == "__main__":
-    print("=== INICIO REESTRUCTURACIÓN DE COLUMNAS ===")
-    reestructurar_columnas()
+    print("=== INICIO CONVERSIÓN EQUIPO*.xlsx -> PARQUET ===")
+    convertir_equipos()
     print("=== FINALIZADO ===")
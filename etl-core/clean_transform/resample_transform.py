@@ -0,0 +1,132 @@
+# =============================================
+# Remuestreo a grilla fija de los flujos de sensores
+# =============================================
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_COLUMNS = ['FuelLevelLiters', 'Speed', 'RPM', 'Latitude', 'Longitude', 'Elevation']
+
+
+class SensorResampler:
+    """
+    Alinea el flujo irregular de cada camión a una grilla fija (1 s, 10 s, 1 min...).
+
+    Cada registro pesa según el tiempo que cubre dentro de su intervalo de la
+    grilla (`RecordDuration`), y los intervalos vacíos se rellenan hacia adelante
+    solo mientras el último registro siga vigente más una tolerancia (`max_gap`).
+    La grilla está anclada a la época, por lo que todos los camiones la comparten.
+    """
+
+    def __init__(self, freq: str = '10s', columns: Optional[List[str]] = None,
+                 max_gap: str = '30s', time_col: str = 'FullDateTime',
+                 duration_col: str = 'RecordDuration', max_workers: Optional[int] = None):
+        """
+        Args:
+            freq: Paso de la grilla (cualquier alias de pandas.Timedelta)
+            columns: Columnas numéricas a remuestrear (por defecto las del sensor)
+            max_gap: Tolerancia tras el fin de cobertura del último registro para rellenar
+            time_col: Columna con fecha y hora completa
+            duration_col: Columna con la duración de cada registro en segundos
+            max_workers: Hilos para procesar camiones en paralelo
+        """
+        self.step = pd.Timedelta(freq).value
+        if self.step <= 0:
+            raise ValueError("freq debe ser un intervalo positivo")
+        self.freq = freq
+        self.columns = columns or DEFAULT_COLUMNS
+        self.max_gap = pd.Timedelta(max_gap).value
+        self.time_col = time_col
+        self.duration_col = duration_col
+        self.max_workers = max_workers
+
+    def resample(self, sensor_df: pd.DataFrame) -> pd.DataFrame:
+        """Devuelve una fila por camión e intervalo de la grilla (entre el primer y último registro)."""
+        columns = [col for col in self.columns if col in sensor_df.columns]
+        if not columns:
+            raise KeyError(f"Ninguna de las columnas {self.columns} está presente")
+        keep = ['Equipment', self.time_col] + columns
+        if self.duration_col in sensor_df.columns:
+            keep.append(self.duration_col)
+
+        trucks = [group for _, group in sensor_df[keep].groupby('Equipment', sort=True)]
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            frames = list(executor.map(lambda g: self._resample_truck(g, columns), trucks))
+
+        frames = [f for f in frames if not f.empty]
+        if not frames:
+            return pd.DataFrame(columns=['Equipment', self.time_col] + columns + ['n_records', 'coverage_s', 'filled'])
+        return pd.concat(frames, ignore_index=True)
+
+    def _resample_truck(self, truck_df: pd.DataFrame, columns: List[str]) -> pd.DataFrame:
+        truck_df = truck_df.dropna(subset=[self.time_col]).sort_values(self.time_col, kind='stable')
+        if truck_df.empty:
+            return pd.DataFrame()
+
+        t = pd.to_datetime(truck_df[self.time_col]).to_numpy(dtype='datetime64[ns]').astype(np.int64)
+        origin = (t[0] // self.step) * self.step
+        bins = (t - origin) // self.step
+        n_bins = int(bins[-1]) + 1
+        bin_start = origin + np.arange(n_bins, dtype=np.int64) * self.step
+
+        # Duración de cada registro: la declarada o, si falta, hasta el siguiente registro
+        next_gap = np.append(np.diff(t), self.step)
+        fallback = np.minimum(next_gap, self.max_gap if self.max_gap > 0 else self.step)
+        if self.duration_col in truck_df.columns:
+            declared = pd.to_numeric(truck_df[self.duration_col], errors='coerce').to_numpy(dtype=float) * 1e9
+            duration = np.where(declared > 0, declared, fallback)
+        else:
+            duration = fallback.astype(float)
+        record_end = t + duration.astype(np.int64)
+
+        # Peso = tiempo cubierto dentro del propio intervalo de la grilla
+        weight = (np.minimum(record_end, bin_start[bins] + self.step) - t) / 1e9
+        weight = np.maximum(weight, 1e-9)
+
+        n_records = np.bincount(bins, minlength=n_bins)
+        coverage = np.bincount(bins, weights=weight, minlength=n_bins)
+        has_data = n_records > 0
+
+        # Relleno consciente de huecos: solo mientras dure la cobertura previa + max_gap
+        cover_end = np.full(n_bins, np.iinfo(np.int64).min)
+        np.maximum.at(cover_end, bins, record_end)
+        cover_end = np.maximum.accumulate(cover_end)
+        prev_cover = np.concatenate(([np.iinfo(np.int64).min], cover_end[:-1]))
+        fillable = ~has_data & (bin_start < prev_cover + self.max_gap)
+        last_data = np.maximum.accumulate(np.where(has_data, np.arange(n_bins), 0))
+
+        result = {
+            'Equipment': truck_df['Equipment'].iloc[0],
+            self.time_col: bin_start.astype('datetime64[ns]'),
+        }
+        for col in columns:
+            x = pd.to_numeric(truck_df[col], errors='coerce').to_numpy(dtype=float)
+            valid = ~np.isnan(x)
+            w = np.where(valid, weight, 0.0)
+            sum_w = np.bincount(bins, weights=w, minlength=n_bins)
+            sum_wx = np.bincount(bins, weights=w * np.where(valid, x, 0.0), minlength=n_bins)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                mean = np.where(sum_w > 0, sum_wx / sum_w, np.nan)
+            result[col] = np.where(has_data, mean, np.where(fillable, mean[last_data], np.nan))
+
+        result['n_records'] = n_records
+        result['coverage_s'] = coverage
+        result['filled'] = fillable
+        return pd.DataFrame(result)
+
+    def to_arrays(self, resampled: pd.DataFrame, columns: Optional[List[str]] = None,
+                  dtype=np.float32) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+        """
+        Convierte la salida de `resample` en arreglos compactos por camión:
+        {camión: (instantes datetime64[ns], matriz [n_intervalos x n_columnas])}.
+        """
+        columns = columns or [col for col in self.columns if col in resampled.columns]
+        arrays = {}
+        for truck, group in resampled.groupby('Equipment', sort=True):
+            arrays[truck] = (
+                group[self.time_col].to_numpy(dtype='datetime64[ns]'),
+                group[columns].to_numpy(dtype=dtype),
+            )
+        return arrays
@@ -0,0 +1,187 @@
+# =============================================
+# Limpieza vectorizada de trayectorias GPS
+# =============================================
+import numpy as np
+import pandas as pd
+
+EARTH_RADIUS_M = 6_371_008.8
+
+
+def haversine_m(lat1, lon1, lat2, lon2) -> np.ndarray:
+    """Distancia haversine en metros entre arreglos de coordenadas en grados."""
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(a, dtype=float)) for a in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+class TrajectoryCleaner:
+    """
+    Detecta y repara coordenadas cero, saltos (teletransportes) y fixes perdidos.
+
+    Toda la flota se procesa como un único arreglo ordenado por (Equipment, tiempo);
+    los límites entre camiones se enmascaran en lugar de iterar por grupo.
+    """
+
+    def __init__(self, max_speed_kmh: float = 90.0, speed_factor: float = 2.0,
+                 speed_tolerance_kmh: float = 15.0, min_jump_m: float = 50.0,
+                 max_gap_s: float = 120.0, n_passes: int = 2, repair: bool = True,
+                 time_col: str = 'FullDateTime'):
+        """
+        Args:
+            max_speed_kmh: Velocidad implícita máxima físicamente posible
+            speed_factor: Múltiplo tolerado de la columna `Speed` reportada
+            speed_tolerance_kmh: Holgura absoluta sobre `Speed` (ruido GPS a baja velocidad)
+            min_jump_m: Distancia mínima de un paso para considerarlo salto
+            max_gap_s: Intervalo máximo entre fixes antes de considerar pérdida de señal
+            n_passes: Pasadas de detección (saltos consecutivos se revelan en la siguiente)
+            repair: Si es True, interpola en el tiempo los puntos descartados
+            time_col: Columna con fecha y hora completa
+        """
+        self.max_speed_kmh = max_speed_kmh
+        self.speed_factor = speed_factor
+        self.speed_tolerance_kmh = speed_tolerance_kmh
+        self.min_jump_m = min_jump_m
+        self.max_gap_s = max_gap_s
+        self.n_passes = n_passes
+        self.repair = repair
+        self.time_col = time_col
+
+    def clean(self, sensor_df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Devuelve el DataFrame ordenado por (Equipment, tiempo) con columnas adicionales:
+        step_distance_m, implied_speed_kmh, gps_invalid, gps_jump, gps_gap y gps_repaired.
+        """
+        required = ['Equipment', self.time_col, 'Latitude', 'Longitude']
+        missing = [col for col in required if col not in sensor_df.columns]
+        if missing:
+            raise KeyError(f"Columnas requeridas faltantes: {missing}")
+
+        df = sensor_df.sort_values(['Equipment', self.time_col], kind='stable').reset_index(drop=True)
+        if df.empty:
+            return df.assign(step_distance_m=np.float64(), implied_speed_kmh=np.float64(), gps_invalid=np.bool_(),
+                             gps_jump=np.bool_(), gps_gap=np.bool_(), gps_repaired=np.bool_())
+
+        truck = pd.factorize(df['Equipment'])[0]
+        t = pd.to_datetime(df[self.time_col]).to_numpy(dtype='datetime64[ns]').astype(np.int64) / 1e9
+        lat = df['Latitude'].to_numpy(dtype=float).copy()
+        lon = df['Longitude'].to_numpy(dtype=float).copy()
+        elev = df['Elevation'].to_numpy(dtype=float).copy() if 'Elevation' in df else None
+        speed = df['Speed'].to_numpy(dtype=float) if 'Speed' in df else None
+
+        # 1. Coordenadas cero, nulas o fuera de rango
+        invalid = (
+            np.isnan(lat) | np.isnan(lon)
+            | ((lat == 0) & (lon == 0))
+            | (np.abs(lat) > 90) | (np.abs(lon) > 180)
+        )
+
+        # 2. Saltos: se evalúan solo los pasos entre puntos aún válidos
+        jump = np.zeros(len(df), dtype=bool)
+        for _ in range(self.n_passes):
+            keep = np.flatnonzero(~invalid & ~jump)
+            spikes = self._detect_spikes(keep, truck, t, lat, lon, speed)
+            if not spikes.any():
+                break
+            jump[keep[spikes]] = True
+
+        # 3. Pérdida de fixes: paso largo desde el último punto del mismo camión
+        same_truck = np.concatenate(([False], truck[1:] == truck[:-1]))
+        gap = same_truck & (np.diff(t, prepend=t[0]) > self.max_gap_s)
+
+        bad = invalid | jump
+        repaired = np.zeros(len(df), dtype=bool)
+        if self.repair and bad.any():
+            repaired = self._interpolate(bad, truck, t, [lat, lon] + ([elev] if elev is not None else []))
+            unrepaired = bad & ~repaired
+            lat[unrepaired] = np.nan
+            lon[unrepaired] = np.nan
+            if elev is not None:
+                elev[unrepaired] = np.nan
+
+        df['Latitude'] = lat
+        df['Longitude'] = lon
+        if elev is not None and self.repair:
+            df['Elevation'] = elev
+
+        # 4. Distancia y velocidad implícita finales sobre la trayectoria corregida
+        step = np.full(len(df), np.nan)
+        dt = np.full(len(df), np.nan)
+        step[1:] = haversine_m(lat[:-1], lon[:-1], lat[1:], lon[1:])
+        dt[1:] = np.diff(t)
+        step[~same_truck] = np.nan
+        with np.errstate(divide='ignore', invalid='ignore'):
+            implied = np.where(dt > 0, step / dt * 3.6, np.nan)
+
+        df['step_distance_m'] = step
+        df['implied_speed_kmh'] = implied
+        df['gps_invalid'] = invalid
+        df['gps_jump'] = jump
+        df['gps_gap'] = gap
+        df['gps_repaired'] = repaired
+        return df
+
+    def _step_implausible(self, dist, dt, reported) -> np.ndarray:
+        """Un paso es inverosímil si supera la velocidad máxima o no cuadra con `Speed`."""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            implied = np.where(dt > 0, dist / dt * 3.6, np.inf)
+        limit = np.full(dist.shape, self.max_speed_kmh)
+        if reported is not None:
+            cross_check = np.nan_to_num(reported, nan=self.max_speed_kmh) * self.speed_factor + self.speed_tolerance_kmh
+            limit = np.minimum(limit, cross_check)
+        return (dist > self.min_jump_m) & (implied > limit)
+
+    def _detect_spikes(self, keep, truck, t, lat, lon, speed) -> np.ndarray:
+        """
+        Marca como salto el punto cuyo paso de entrada y de salida son ambos inverosímiles.
+        En el primer/último punto de un camión basta con el único paso disponible.
+        """
+        n = len(keep)
+        if n < 2:
+            return np.zeros(n, dtype=bool)
+        k_truck = truck[keep]
+        linked = k_truck[1:] == k_truck[:-1]
+        dist = haversine_m(lat[keep[:-1]], lon[keep[:-1]], lat[keep[1:]], lon[keep[1:]])
+        dt = np.diff(t[keep])
+        reported = None
+        if speed is not None:
+            reported = np.fmax(speed[keep[:-1]], speed[keep[1:]])
+        bad_step = linked & self._step_implausible(dist, dt, reported)
+
+        bad_in = np.concatenate(([False], bad_step))
+        bad_out = np.concatenate((bad_step, [False]))
+        has_in = np.concatenate(([False], linked))
+        has_out = np.concatenate((linked, [False]))
+        interior = bad_in & bad_out
+        next_is_spike = np.concatenate((interior[1:], [False]))
+        prev_is_spike = np.concatenate(([False], interior[:-1]))
+        first = bad_out & ~has_in & ~next_is_spike
+        last = bad_in & ~has_out & ~prev_is_spike
+        return interior | first | last
+
+    def _interpolate(self, bad, truck, t, columns) -> np.ndarray:
+        """Interpolación lineal en el tiempo entre los puntos buenos vecinos del mismo camión."""
+        n = len(bad)
+        positions = np.arange(n)
+        prev_good = np.maximum.accumulate(np.where(~bad, positions, -1))
+        next_good = np.minimum.accumulate(np.where(~bad, positions, n)[::-1])[::-1]
+
+        target = np.flatnonzero(bad)
+        p, q = prev_good[target], next_good[target]
+        ok = (p >= 0) & (q < n)
+        target, p, q = target[ok], p[ok], q[ok]
+        ok = (truck[p] == truck[target]) & (truck[q] == truck[target]) & (t[q] - t[p] <= self.max_gap_s)
+        target, p, q = target[ok], p[ok], q[ok]
+
+        span = t[q] - t[p]
+        w = np.where(span > 0, (t[target] - t[p]) / np.where(span > 0, span, 1), 0.0)
+        for values in columns:
+            values[target] = values[p] + w * (values[q] - values[p])
+
+        repaired = np.zeros(n, dtype=bool)
+        repaired[target] = True
+        return repaired
+
+
+def clean_trajectories(sensor_df: pd.DataFrame, **kwargs) -> pd.DataFrame:
+    """Atajo funcional de `TrajectoryCleaner(**kwargs).clean(sensor_df)`."""
+    return TrajectoryCleaner(**kwargs).clean(sensor_df)
@@ -0,0 +1,81 @@
+import hashlib
+import os
+import tempfile
+import unittest
+from datetime import datetime, time
+
+import pandas as pd
+from openpyxl import Workbook
+
+from clean_transform.data_validator_transform import convertir_equipos, hora_del_dia, leer_libro
+
+
+class TestConvertirEquipos(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.origen = os.path.join(self.tmp.name, "raw_data")
+        self.destino = os.path.join(self.tmp.name, "parquet_data")
+        os.makedirs(self.origen)
+
+        # Formato real: bloques (CODIGO EQ., RECEPCION, litros) lado a lado bajo
+        # un encabezado "EQUIPO <camión> dd/mm/yyyy"; el nombre del archivo es
+        # el del surtidor, no el del camión
+        wb = Workbook()
+        ws = wb.active
+        ws.append(["EQUIPO T-210 31/01/2025", None, None, "EQUIPO T-234 31/01/2025", None, None])
+        ws.append(["CODIGO EQ.", "RECEPCION", "LITROS", "CODIGO EQ.", "RECEPCION", "LITROS"])
+        ws.append([216, time(8, 0), 1500.0, 216, time(9, 0), 1440.0])
+        ws.append([216, time(8, 30), 1470.0, None, None, None])
+        ws.append(["EQUIPO T-210 01/02/2025", None, None, None, None, None])
+        ws.append([216, "07:15", 1380.0, None, None, None])
+        self.archivo = os.path.join(self.origen, "EQUIPO_SURTIDOR_2.xlsx")
+        wb.save(self.archivo)
+        open(os.path.join(self.origen, "EQUIPO_vacio.xlsx"), "w").close()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _digest(self):
+        with open(self.archivo, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+
+    def test_convert_to_parquet_without_touching_source(self):
+        antes = self._digest()
+        salidas = convertir_equipos(self.origen, self.destino, max_workers=1)
+
+        self.assertEqual(self._digest(), antes)
+        self.assertEqual(len(salidas), 1)
+        df = pd.read_parquet(salidas[0])
+        self.assertEqual(list(df.columns), ['ShiftDate', 'TimeStamp', 'Equipment', 'FuelLevelLiters'])
+        self.assertEqual(df['Equipment'].tolist(), ['T-210', 'T-210', 'T-210', 'T-234'])
+        self.assertEqual(df['FuelLevelLiters'].tolist(), [1500.0, 1470.0, 1380.0, 1440.0])
+        self.assertEqual(df['TimeStamp'].tolist(), list(pd.to_datetime([
+            '2025-01-31 08:00', '2025-01-31 08:30', '2025-02-01 07:15', '2025-01-31 09:00'])))
+        self.assertEqual(df['ShiftDate'].dt.day.tolist(), [31, 31, 1, 31])
+
+    def test_up_to_date_output_is_skipped(self):
+        salida = convertir_equipos(self.origen, self.destino, max_workers=1)[0]
+        mtime = os.path.getmtime(salida)
+        convertir_equipos(self.origen, self.destino, max_workers=1)
+
+        self.assertEqual(os.path.getmtime(salida), mtime)
+
+    def test_rows_before_header_are_ignored(self):
+        wb = Workbook()
+        wb.active.append([216, time(8, 0), 1500.0])
+        ruta = os.path.join(self.tmp.name, "EQUIPO_sin_encabezado.xlsx")
+        wb.save(ruta)
+
+        self.assertTrue(leer_libro(ruta).empty)
+
+    def test_hora_del_dia(self):
+        self.assertEqual(hora_del_dia(time(7, 15)), pd.Timedelta(hours=7, minutes=15))
+        self.assertEqual(hora_del_dia(datetime(1899, 12, 30, 7, 15)), pd.Timedelta(hours=7, minutes=15))
+        self.assertEqual(hora_del_dia(0.25), pd.Timedelta(hours=6))
+        self.assertEqual(hora_del_dia("07:15"), pd.Timedelta(hours=7, minutes=15))
+        self.assertIsNone(hora_del_dia(216))
+        self.assertIsNone(hora_del_dia("RECEPCION"))
+
+
+if __name__ == '__main__':
+    unittest.main()
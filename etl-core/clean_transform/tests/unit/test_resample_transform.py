@@ -0,0 +1,54 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from clean_transform.resample_transform import SensorResampler
+
+
+class TestSensorResampler(unittest.TestCase):
+    def setUp(self):
+        base = pd.Timestamp('2025-01-31 08:00:00')
+        self.df = pd.DataFrame({
+            'Equipment': ['T-210', 'T-210', 'T-210', 'T-210', 'T-234'],
+            'FullDateTime': base + pd.to_timedelta([0, 5, 30, 90, 3], unit='s'),
+            'RecordDuration': [4, 5, 25, 5, 2],
+            'Speed': [10.0, 20.0, 30.0, 40.0, 5.0],
+            'RPM': [1000.0, np.nan, 1200.0, 1300.0, 800.0],
+        })
+
+    def test_duration_weighted_mean_and_gap_aware_fill(self):
+        result = SensorResampler(freq='10s', max_gap='0s').resample(self.df)
+        t210 = result[result['Equipment'] == 'T-210'].reset_index(drop=True)
+
+        self.assertEqual(len(t210), 10)
+        self.assertAlmostEqual(t210.loc[0, 'Speed'], (4 * 10 + 5 * 20) / 9)
+        # RPM nulo no pesa en el promedio
+        self.assertAlmostEqual(t210.loc[0, 'RPM'], 1000.0)
+        # El registro de 30 s cubre hasta 55 s: se rellenan los intervalos 40 y 50
+        self.assertEqual(t210['filled'].tolist(), [False] * 4 + [True, True] + [False] * 4)
+        self.assertTrue(np.isnan(t210.loc[1, 'Speed']))
+        self.assertEqual(t210.loc[5, 'Speed'], 30.0)
+        self.assertTrue(np.isnan(t210.loc[6, 'Speed']))
+
+    def test_max_gap_extends_fill(self):
+        result = SensorResampler(freq='10s', max_gap='20s').resample(self.df)
+        t210 = result[result['Equipment'] == 'T-210'].reset_index(drop=True)
+
+        self.assertEqual(t210.loc[7, 'Speed'], 30.0)
+        self.assertTrue(np.isnan(t210.loc[8, 'Speed']))
+
+    def test_shared_grid_and_arrays(self):
+        resampler = SensorResampler(freq='1min', columns=['Speed'])
+        result = resampler.resample(self.df)
+        arrays = resampler.to_arrays(result)
+
+        self.assertEqual(set(arrays), {'T-210', 'T-234'})
+        times, values = arrays['T-234']
+        self.assertEqual(times[0], np.datetime64('2025-01-31T08:00:00'))
+        self.assertEqual(values.shape, (1, 1))
+        self.assertEqual(values.dtype, np.float32)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from clean_transform.sensor_clean_transform import TrajectoryCleaner, haversine_m
+
+
+class TestTrajectoryCleaner(unittest.TestCase):
+    def setUp(self):
+        # Dos camiones avanzando ~10 m cada 2 s (18 km/h) hacia el norte
+        n = 20
+        base = pd.Timestamp('2025-01-31 08:00')
+        frames = []
+        for truck, lon in (('T-210', -66.80), ('T-234', -66.70)):
+            frames.append(pd.DataFrame({
+                'Equipment': truck,
+                'FullDateTime': base + pd.to_timedelta(np.arange(n) * 2, unit='s'),
+                'Latitude': -21.50 + np.arange(n) * 10 / 111_195,
+                'Longitude': lon,
+                'Elevation': 4000.0 + np.arange(n),
+                'Speed': 18.0,
+            }))
+        self.df = pd.concat(frames, ignore_index=True)
+
+    def test_haversine(self):
+        self.assertAlmostEqual(float(haversine_m(0, 0, 1, 0)), 111_195, delta=5)
+
+    def test_zero_coordinates_and_teleport_are_repaired(self):
+        df = self.df.copy()
+        df.loc[5, ['Latitude', 'Longitude']] = 0.0
+        df.loc[10, 'Latitude'] += 0.05  # salto de ~5 km
+        original = self.df.loc[[5, 10], 'Latitude'].to_numpy()
+
+        result = TrajectoryCleaner().clean(df)
+
+        self.assertTrue(result.loc[5, 'gps_invalid'])
+        self.assertTrue(result.loc[10, 'gps_jump'])
+        self.assertEqual(int(result['gps_jump'].sum()), 1)
+        self.assertTrue(result.loc[[5, 10], 'gps_repaired'].all())
+        np.testing.assert_allclose(result.loc[[5, 10], 'Latitude'], original, atol=1e-9)
+        self.assertLess(result['implied_speed_kmh'].max(), 20)
+
+    def test_speed_cross_check(self):
+        df = self.df.copy()
+        # 60 m en 2 s (108 km/h) con Speed=18: inverosímil aun bajo max_speed_kmh=150
+        df.loc[7, 'Latitude'] += 60 / 111_195
+        result = TrajectoryCleaner(max_speed_kmh=150).clean(df)
+
+        self.assertTrue(result.loc[7, 'gps_jump'])
+
+    def test_trucks_are_not_linked_and_gaps_are_flagged(self):
+        df = self.df.drop(index=range(3, 15))
+        result = TrajectoryCleaner(max_gap_s=10).clean(df)
+
+        first_t234 = result.index[result['Equipment'] == 'T-234'][0]
+        self.assertTrue(np.isnan(result.loc[first_t234, 'step_distance_m']))
+        self.assertFalse(result['gps_jump'].any())
+        self.assertEqual(int(result['gps_gap'].sum()), 1)
+
+    def test_empty_input(self):
+        result = TrajectoryCleaner().clean(self.df.iloc[:0])
+
+        self.assertTrue(result.empty)
+        for col in ('step_distance_m', 'implied_speed_kmh', 'gps_invalid', 'gps_jump', 'gps_gap', 'gps_repaired'):
+            self.assertIn(col, result.columns)
+        self.assertEqual(result['gps_jump'].dtype, bool)
+
+
+if __name__ == '__main__':
+    unittest.main()
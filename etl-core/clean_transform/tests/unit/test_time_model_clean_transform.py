@@ -0,0 +1,114 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from clean_transform.time_model_clean_transform import (
+    StatusIntervalIndex,
+    build_status_intervals,
+    shift_utilization,
+)
+
+# Horario de turnos de prueba: A de 08:00 a 20:00 y B de 20:00 a 08:00
+SHIFT_SCHEDULE = {'A': '08:00', 'B': '20:00'}
+
+
+class TestStatusIntervalIndex(unittest.TestCase):
+    def setUp(self):
+        self.time_model = pd.DataFrame({
+            'ShiftDate': pd.Timestamp('2025-02-01'),
+            'Shift': 'A',
+            'Equipment': ['T-210', 'T-210', 'T-210', 'T-234', 'T-234'],
+            'FullDateTime': pd.to_datetime([
+                '2025-02-01 08:00', '2025-02-01 10:00', '2025-02-01 11:00',
+                '2025-02-01 08:00', '2025-02-01 09:00',
+            ]),
+            'RecordDuration': [7200, 3600, 3600, 1800, 3600],
+            'Status': ['Cargando', 'Espera', 'Mantención', 'Acarreo', 'Espera'],
+            'Category': ['Operativo', 'Reserva', 'Mantenimiento', 'Operativo', 'Reserva'],
+            'Event': None,
+        })
+
+    def test_intervals_are_closed_by_next_record_or_duration(self):
+        intervals = build_status_intervals(self.time_model)
+
+        self.assertEqual(len(intervals), 5)
+        t234 = intervals[intervals['Equipment'] == 'T-234']
+        # RecordDuration acota el primer intervalo y deja un hueco de 30 minutos
+        self.assertEqual(t234['duration_s'].tolist(), [1800.0, 3600.0])
+
+    def test_status_at(self):
+        index = StatusIntervalIndex.from_time_model(self.time_model)
+        times = pd.to_datetime(['2025-02-01 07:00', '2025-02-01 09:59', '2025-02-01 10:00', '2025-02-01 11:30'])
+
+        status = index.status_at('T-210', times)
+        self.assertEqual(list(status), [None, 'Cargando', 'Espera', 'Mantención'])
+        self.assertEqual(index.status_at('T-234', ['2025-02-01 08:45'])[0], None)
+        self.assertEqual(index.status_at('T-999', times).tolist(), [None] * 4)
+
+    def test_lookup_many_trucks(self):
+        index = StatusIntervalIndex.from_time_model(self.time_model)
+        events = pd.DataFrame({
+            'Equipment': ['T-234', 'T-210'],
+            'FullDateTime': pd.to_datetime(['2025-02-01 09:15', '2025-02-01 08:30']),
+        })
+
+        result = index.lookup(events)
+        self.assertEqual(result['Category'].tolist(), ['Reserva', 'Operativo'])
+
+    def test_shift_utilization(self):
+        kpis = shift_utilization(build_status_intervals(self.time_model)).set_index('Equipment')
+
+        self.assertAlmostEqual(kpis.loc['T-210', 'availability'], 3 / 4)
+        self.assertAlmostEqual(kpis.loc['T-210', 'utilization'], 2 / 3)
+        self.assertAlmostEqual(kpis.loc['T-210', 'idle_ratio'], 1 / 3)
+        self.assertTrue(np.isclose(kpis.loc['T-234', 'utilization'], 1 / 3))
+
+    def test_last_record_without_duration_ends_at_shift_end(self):
+        time_model = self.time_model.drop(columns='RecordDuration')
+        intervals = build_status_intervals(time_model, shift_schedule=SHIFT_SCHEDULE)
+
+        last = intervals[intervals['Equipment'] == 'T-210'].iloc[-1]
+        self.assertEqual(last['end'], pd.Timestamp('2025-02-01 20:00'))
+        self.assertEqual(last['duration_s'], 9 * 3600.0)
+        self.assertEqual(len(intervals), 5)
+
+    def test_intervals_are_split_at_shift_change(self):
+        time_model = pd.DataFrame({
+            'ShiftDate': pd.Timestamp('2025-02-01'),
+            'Shift': 'A',
+            'Equipment': 'T-210',
+            'FullDateTime': pd.to_datetime(['2025-02-01 18:00', '2025-02-02 07:00']),
+            'RecordDuration': [13 * 3600, 2 * 3600],
+            'Status': ['Acarreo', 'Espera'],
+            'Category': ['Operativo', 'Reserva'],
+            'Event': None,
+        })
+        intervals = build_status_intervals(time_model, shift_schedule=SHIFT_SCHEDULE)
+
+        self.assertEqual(intervals['duration_s'].tolist(), [7200.0, 11 * 3600.0, 3600.0, 3600.0])
+        self.assertEqual(intervals['Shift'].tolist(), ['A', 'B', 'B', 'A'])
+        self.assertEqual(intervals['ShiftDate'].dt.day.tolist(), [1, 1, 1, 2])
+
+        kpis = shift_utilization(intervals).set_index(['ShiftDate', 'Shift'])
+        self.assertAlmostEqual(kpis.loc[(pd.Timestamp('2025-02-01'), 'A'), 'total_h'], 2.0)
+        self.assertAlmostEqual(kpis.loc[(pd.Timestamp('2025-02-01'), 'B'), 'operating_h'], 11.0)
+        self.assertAlmostEqual(kpis.loc[(pd.Timestamp('2025-02-02'), 'A'), 'idle_h'], 1.0)
+
+        # Sin horario se conservan los turnos de origen
+        unsplit = build_status_intervals(time_model)
+        self.assertEqual(unsplit['duration_s'].tolist(), [13 * 3600.0, 2 * 3600.0])
+        self.assertEqual(unsplit['Shift'].tolist(), ['A', 'A'])
+
+    def test_index_on_filtered_intervals(self):
+        intervals = build_status_intervals(self.time_model)
+        # Índice no correlativo y en otro orden que el de las filas
+        t234 = intervals[intervals['Equipment'] == 'T-234'].iloc[::-1]
+        index = StatusIntervalIndex(t234)
+
+        times = pd.to_datetime(['2025-02-01 08:10', '2025-02-01 09:30'])
+        self.assertEqual(index.status_at('T-234', times).tolist(), ['Acarreo', 'Espera'])
+
+
+if __name__ == '__main__':
+    unittest.main()
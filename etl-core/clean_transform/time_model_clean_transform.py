@@ -0,0 +1,213 @@
+# =============================================
+# Time Model: intervalos de estado e indicadores de utilización
+# =============================================
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+# Clasificación de las categorías del modelo de tiempos (comparación en minúsculas).
+# Las categorías no listadas se cuentan como 'other' (solo suman al tiempo total).
+CATEGORY_CLASSES = {
+    'operating': ('operativo', 'efectivo', 'operating', 'operative'),
+    'idle': ('reserva', 'standby', 'demora', 'demora operativa', 'delay', 'operating delay', 'ralenti'),
+    'down': ('mantenimiento', 'mantencion', 'malogrado', 'falla', 'down',
+             'scheduled down', 'unscheduled down'),
+}
+
+
+def _shift_offsets(schedule) -> list:
+    """
+    Horario de turnos de la faena: {nombre: 'HH:MM'} o pares (nombre, 'HH:MM')
+    con la hora local de inicio de cada turno. El turno que cruza la
+    medianoche pertenece al ShiftDate del día en que empieza.
+    """
+    pairs = schedule.items() if isinstance(schedule, dict) else schedule
+    offsets = sorted((pd.Timedelta(f"{start}:00"), name) for name, start in pairs)
+    if not offsets:
+        raise ValueError("El horario de turnos está vacío")
+    return offsets
+
+
+def _shift_bounds(times: np.ndarray, schedule) -> tuple:
+    """
+    Para cada instante: inicio del turno vigente, inicio del siguiente y
+    nombre del turno vigente.
+    """
+    offsets = _shift_offsets(schedule)
+    day = times.astype('datetime64[D]').astype('datetime64[ns]')
+    one_day = np.timedelta64(1, 'D')
+    # Candidatos: inicios del día anterior, del mismo día y del siguiente
+    starts = np.stack([day + delta + off.to_timedelta64()
+                       for delta in (-one_day, np.timedelta64(0, 'D'), one_day) for off, _ in offsets])
+    names = np.array([name for _ in range(3) for _, name in offsets], dtype=object)
+    ns = starts.astype(np.int64)
+    current_pos = np.where(starts <= times, ns, np.iinfo(np.int64).min).argmax(axis=0)
+    current = starts[current_pos, np.arange(len(times))]
+    following = np.where(starts > times, ns, np.iinfo(np.int64).max).min(axis=0).astype('datetime64[ns]')
+    return current, following, names[current_pos]
+
+
+def split_at_shifts(intervals: pd.DataFrame, schedule) -> pd.DataFrame:
+    """
+    Corta los intervalos en los cambios de turno y asigna ShiftDate/Shift de
+    cada tramo según `schedule`, para que cada turno reciba solo su tiempo.
+    """
+    pieces = []
+    remaining = intervals
+    while len(remaining):
+        start = remaining['start'].to_numpy(dtype='datetime64[ns]')
+        end = remaining['end'].to_numpy(dtype='datetime64[ns]')
+        current, following, names = _shift_bounds(start, schedule)
+        piece = remaining.assign(
+            end=np.minimum(end, following),
+            ShiftDate=current.astype('datetime64[D]').astype('datetime64[ns]'),
+            Shift=names,
+        )
+        pieces.append(piece)
+        crosses = end > following
+        remaining = remaining[crosses].assign(start=following[crosses])
+    result = pd.concat(pieces).sort_values(['Equipment', 'start'], kind='stable')
+    result['duration_s'] = (result['end'] - result['start']).dt.total_seconds()
+    return result.reset_index(drop=True)
+
+
+def build_status_intervals(time_model_df: pd.DataFrame, time_col: str = 'FullDateTime',
+                           shift_schedule=None) -> pd.DataFrame:
+    """
+    Convierte los registros de cambio de estado en intervalos cerrados [start, end).
+
+    Cada registro dura hasta el siguiente cambio del mismo equipo. Si existe
+    `RecordDuration` (segundos) y es menor, se usa como límite, de modo que los
+    huecos sin datos quedan fuera de cualquier intervalo. El último registro
+    de un equipo sin duración declarada no tiene fin conocido.
+
+    Por defecto se conservan ShiftDate/Shift de los registros y el último
+    registro sin duración se descarta. Con el horario de turnos de la faena
+    (`shift_schedule`, ver `_shift_offsets`) ese registro se cierra al terminar
+    su turno y los intervalos se cortan y reetiquetan en cada cambio de turno.
+    """
+    required = ['Equipment', time_col, 'Status']
+    missing = [col for col in required if col not in time_model_df.columns]
+    if missing:
+        raise KeyError(f"Columnas requeridas faltantes: {missing}")
+
+    df = time_model_df.dropna(subset=[time_col, 'Status']).copy()
+    df['start'] = pd.to_datetime(df[time_col])
+    df = df.sort_values(['Equipment', 'start'], kind='stable').reset_index(drop=True)
+
+    equipment = df['Equipment'].to_numpy()
+    start = df['start'].to_numpy(dtype='datetime64[ns]')
+    same_truck_next = np.append(equipment[1:] == equipment[:-1], False)
+    next_start = np.append(start[1:], np.datetime64('NaT'))
+    if shift_schedule is not None and len(df):
+        last_end = _shift_bounds(start, shift_schedule)[1]
+    else:
+        last_end = start
+    end = np.where(same_truck_next, next_start, last_end)
+
+    if 'RecordDuration' in df.columns:
+        duration = pd.to_numeric(df['RecordDuration'], errors='coerce').fillna(0).to_numpy()
+        declared_end = start + (duration * 1e9).astype('timedelta64[ns]')
+        end = np.where(duration > 0, np.where(same_truck_next, np.minimum(end, declared_end), declared_end), end)
+
+    df['end'] = end
+    df['duration_s'] = (df['end'] - df['start']).dt.total_seconds()
+    df = df[df['duration_s'] > 0]
+    if shift_schedule is not None and len(df):
+        df = split_at_shifts(df, shift_schedule)
+
+    columns = ['Equipment', 'ShiftDate', 'Shift', 'start', 'end', 'duration_s', 'Status', 'Category', 'Event']
+    return df[[col for col in columns if col in df.columns]].reset_index(drop=True)
+
+
+class StatusIntervalIndex:
+    """
+    Índice de intervalos de estado por camión.
+
+    Los intervalos de cada camión quedan ordenados y sin solapamiento, así que
+    "estado del camión X en el instante t" se resuelve con búsqueda binaria
+    (O(log n)), vectorizada para millones de consultas a la vez.
+    """
+
+    def __init__(self, intervals: pd.DataFrame):
+        # Índice posicional: las filas guardadas se usan como posiciones de arreglo
+        self.intervals = intervals = intervals.reset_index(drop=True)
+        self._trucks: Dict[str, tuple] = {}
+        for truck, group in intervals.groupby('Equipment', sort=False):
+            group = group.sort_values('start')
+            self._trucks[truck] = (
+                group['start'].to_numpy(dtype='datetime64[ns]'),
+                group['end'].to_numpy(dtype='datetime64[ns]'),
+                group.index.to_numpy(),
+            )
+
+    @classmethod
+    def from_time_model(cls, time_model_df: pd.DataFrame, time_col: str = 'FullDateTime',
+                        shift_schedule=None) -> 'StatusIntervalIndex':
+        return cls(build_status_intervals(time_model_df, time_col, shift_schedule))
+
+    @property
+    def trucks(self) -> list:
+        return list(self._trucks)
+
+    def positions_at(self, truck: str, times) -> np.ndarray:
+        """Posición del intervalo vigente para cada instante (-1 si no hay cobertura)."""
+        t = np.asarray(pd.to_datetime(times), dtype='datetime64[ns]')
+        if truck not in self._trucks:
+            return np.full(t.shape, -1, dtype=np.int64)
+
+        starts, ends, rows = self._trucks[truck]
+        k = np.searchsorted(starts, t, side='right') - 1
+        covered = (k >= 0) & (t < ends[np.clip(k, 0, None)])
+        return np.where(covered, rows[np.clip(k, 0, None)], -1)
+
+    def status_at(self, truck: str, times, column: str = 'Status') -> np.ndarray:
+        """Valor de `column` (Status, Category o Event) en cada instante; None sin cobertura."""
+        positions = self.positions_at(truck, times)
+        values = self.intervals[column].to_numpy(dtype=object)
+        return np.where(positions >= 0, values[np.clip(positions, 0, None)], None)
+
+    def lookup(self, events: pd.DataFrame, time_col: str = 'FullDateTime',
+               columns: Iterable[str] = ('Status', 'Category')) -> pd.DataFrame:
+        """Anota un DataFrame (Equipment + instante) con el estado vigente de cada fila."""
+        positions = np.full(len(events), -1, dtype=np.int64)
+        for truck, idx in events.groupby('Equipment').indices.items():
+            positions[idx] = self.positions_at(truck, events[time_col].to_numpy()[idx])
+
+        result = events.copy()
+        for column in columns:
+            values = self.intervals[column].to_numpy(dtype=object)
+            result[column] = np.where(positions >= 0, values[np.clip(positions, 0, None)], None)
+        return result
+
+
+def shift_utilization(intervals: pd.DataFrame, category_classes: Optional[Dict[str, Iterable[str]]] = None,
+                      class_col: str = 'Category') -> pd.DataFrame:
+    """
+    Disponibilidad, utilización y ralentí por camión y turno.
+
+    - availability = (total - down) / total
+    - utilization = operating / (total - down)
+    - idle_ratio = idle / (total - down)
+    """
+    classes = category_classes or CATEGORY_CLASSES
+    lookup = {name.lower(): label for label, names in classes.items() for name in names}
+    labels = intervals[class_col].astype(str).str.strip().str.lower().map(lookup).fillna('other')
+
+    hours = (
+        intervals.assign(time_class=labels, hours=intervals['duration_s'] / 3600.0)
+        .pivot_table(index=['Equipment', 'ShiftDate', 'Shift'], columns='time_class',
+                     values='hours', aggfunc='sum', fill_value=0.0)
+        .reindex(columns=['operating', 'idle', 'down', 'other'], fill_value=0.0)
+        .add_suffix('_h')
+    )
+    hours.columns.name = None
+
+    total = hours.sum(axis=1)
+    available = total - hours['down_h']
+    hours['total_h'] = total
+    hours['availability'] = available / total.where(total > 0)
+    hours['utilization'] = hours['operating_h'] / available.where(available > 0)
+    hours['idle_ratio'] = hours['idle_h'] / available.where(available > 0)
+    return hours.reset_index()
@@ -0,0 +1,81 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import pandas as pd
+import polars as pl
+
+from utils.validator.validator import DataFrameValidator
+
+
+class TestDataFrameValidator(unittest.TestCase):
+    def setUp(self):
+        self.schema = {
+            'Speed': {'type': 'float64', 'nullable': False, 'min': 0, 'max': 80},
+            'RPM': {'min': 0, 'max': 2500},
+            'Equipment': {'nullable': False},
+        }
+        self.validator = DataFrameValidator(self.schema)
+        self.df = pd.DataFrame({
+            'Speed': [10.0, None, 95.0],
+            'RPM': [800, 1200, 1500],
+            'Equipment': ['T-210', 'T-210', 'T-234'],
+        })
+
+    def test_validate_pandas(self):
+        errors = self.validator.validate(self.df)
+
+        self.assertEqual(errors, [
+            "La columna Speed no debe contener valores nulos",
+            "Valor mayor al máximo en Speed: 95.0 > 80",
+        ])
+
+    def test_missing_column_and_type(self):
+        errors = self.validator.validate(self.df.drop(columns='RPM').astype({'Speed': 'float32'}))
+
+        self.assertIn("Falta la columna: RPM", errors)
+        self.assertIn("Tipo incorrecto en Speed: esperado float64, obtenido float32", errors)
+
+    def test_mixed_type_object_column_is_reported(self):
+        dirty = self.df.astype({'Speed': object})
+        dirty.loc[1, 'Speed'] = 'sin dato'
+        dirty['Equipment'] = pd.Series(['T-210', 210, None], dtype=object)
+
+        errors = self.validator.validate(dirty)
+
+        self.assertIn("Tipo incorrecto en Speed: esperado float64, obtenido object", errors)
+        self.assertIn("Valores no numéricos en Speed: no se puede verificar el rango", errors)
+        self.assertIn("La columna Equipment no debe contener valores nulos", errors)
+        self.assertEqual(self.validator.validate_sample(dirty, fraction=1.0)['sampled_rows'], 3)
+
+    def test_validate_lazy_and_partitioned(self):
+        frame = pl.from_pandas(self.df)
+        self.assertEqual(self.validator.validate(frame.lazy()), self.validator.validate(self.df))
+
+        with tempfile.TemporaryDirectory() as tmp:
+            for truck, part in frame.group_by('Equipment'):
+                path = Path(tmp) / f"truck={truck[0]}"
+                path.mkdir()
+                part.write_parquet(path / "part.parquet")
+            errors = self.validator.validate(tmp)
+
+        self.assertIn("Valor mayor al máximo en Speed: 95.0 > 80", errors)
+
+    def test_validate_sample_bounds(self):
+        df = pd.DataFrame({
+            'Speed': [float(i % 100) for i in range(20_000)],
+            'RPM': 1000,
+            'Equipment': 'T-210',
+        })
+        report = self.validator.validate_sample(df, fraction=0.2, seed=1)
+
+        rate, low, high = report['rates']['Speed__above']
+        self.assertGreater(report['sampled_rows'], 3000)
+        self.assertLessEqual(low, 0.19)
+        self.assertGreaterEqual(high, 0.19)
+        self.assertEqual(report['rates']['RPM__below'][0], 0.0)
+        self.assertEqual(len(report['errors']), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,14 +1,28 @@
 # utils/validators.py
+import math
+from statistics import NormalDist
+from pathlib import Path
+from typing import Dict, Any, List, Tuple, Union
+
 import pandas as pd
-from typing import Dict, Any, List, Optional
+import polars as pl
+
+FrameLike = Union[pd.DataFrame, pl.DataFrame, pl.LazyFrame, str, Path, List[Union[str, Path]]]
+
 
 class DataFrameValidator:
-    """Validador para DataFrames."""
-    
+    """
+    Validador para DataFrames.
+
+    El schema se compila en una única expresión de agregación de polars que
+    se evalúa en una sola pasada sobre los datos, ya sean DataFrames de pandas
+    o polars, LazyFrames o datasets Parquet particionados.
+    """
+
     def __init__(self, schema: Dict[str, Any]):
         """
         Inicializa con un schema que especifica los tipos y restricciones.
-        
+
         schema = {
             'column_name': {
                 'type': 'int64',
@@ -19,30 +33,196 @@ def __init__(self, schema: Dict[str, Any]):
         }
         """
         self.schema = schema
-    
-    def validate(self, df: pd.DataFrame) -> List[str]:
-        """Valida un DataFrame contra el schema definido."""
+
+    # --------------------------------------------------
+    # Entrada
+    # --------------------------------------------------
+    def _to_lazy(self, data: FrameLike) -> pl.LazyFrame:
+        """Normaliza cualquier entrada soportada a un LazyFrame."""
+        if isinstance(data, pl.LazyFrame):
+            return data
+        if isinstance(data, pl.DataFrame):
+            return data.lazy()
+        if isinstance(data, pd.DataFrame):
+            # Solo se convierten las columnas del schema. Una columna object con
+            # tipos mezclados (justo lo que se quiere reportar) no se puede
+            # pasar a Arrow: esas se convierten a texto conservando los nulos.
+            subset = data[[c for c in self.schema if c in data.columns]]
+            mixed = [c for c in subset.columns if subset[c].dtype == object and not _arrow_compatible(subset[c])]
+            if mixed:
+                subset = subset.assign(**{c: subset[c].where(subset[c].isna(), subset[c].astype(str))
+                                          for c in mixed})
+            return pl.from_pandas(subset).lazy()
+        if isinstance(data, (str, Path)):
+            path = Path(data)
+            source = str(path / "**" / "*.parquet") if path.is_dir() else str(path)
+            return pl.scan_parquet(source, hive_partitioning=True)
+        if isinstance(data, list):
+            return pl.scan_parquet([str(p) for p in data], hive_partitioning=True)
+        raise TypeError(f"Tipo de datos no soportado: {type(data).__name__}")
+
+    @staticmethod
+    def _dtypes(data: FrameLike, lazy: pl.LazyFrame) -> Dict[str, str]:
+        """Tipos por columna; para pandas se conservan los dtypes originales."""
+        if isinstance(data, pd.DataFrame):
+            return {col: str(dtype) for col, dtype in data.dtypes.items()}
+        return {col: str(dtype) for col, dtype in lazy.collect_schema().items()}
+
+    @staticmethod
+    def _type_matches(expected: str, actual: str) -> bool:
+        return str(expected).lower() == str(actual).lower()
+
+    # --------------------------------------------------
+    # Compilación del schema
+    # --------------------------------------------------
+    def _compile(self, columns: List[str], rangeable: set) -> List[pl.Expr]:
+        """Una expresión por restricción; todas se evalúan en un solo `select`."""
+        exprs = [pl.len().alias("__rows")]
+        for column in columns:
+            specs = self.schema[column]
+            if 'nullable' in specs and not specs['nullable']:
+                exprs.append(pl.col(column).null_count().alias(f"{column}__nulls"))
+            if column not in rangeable:
+                continue
+            if 'min' in specs:
+                exprs.append(pl.col(column).min().alias(f"{column}__min"))
+            if 'max' in specs:
+                exprs.append(pl.col(column).max().alias(f"{column}__max"))
+        return exprs
+
+    def _compile_violations(self, columns: List[str], rangeable: set) -> List[pl.Expr]:
+        """Conteos de violaciones por restricción (para el modo muestreado)."""
+        exprs = [pl.len().alias("__rows")]
+        for column in columns:
+            specs = self.schema[column]
+            if 'nullable' in specs and not specs['nullable']:
+                exprs.append(pl.col(column).null_count().alias(f"{column}__nulls"))
+            if column not in rangeable:
+                continue
+            if 'min' in specs:
+                exprs.append((pl.col(column) < specs['min']).sum().alias(f"{column}__below"))
+            if 'max' in specs:
+                exprs.append((pl.col(column) > specs['max']).sum().alias(f"{column}__above"))
+        return exprs
+
+    def _check_structure(self, data: FrameLike, lazy: pl.LazyFrame) -> Tuple[List[str], List[str], set]:
+        """
+        Columnas faltantes y tipos incorrectos: solo requiere el schema, no los
+        datos. Devuelve también las columnas cuyo rango se puede verificar
+        (numéricas o temporales en la representación polars).
+        """
         errors = []
-        
-        # Verificar columnas requeridas
+        dtypes = self._dtypes(data, lazy)
+        schema = lazy.collect_schema()
+        present, rangeable = [], set()
         for column, specs in self.schema.items():
-            if column not in df.columns:
+            if column not in dtypes:
                 errors.append(f"Falta la columna: {column}")
                 continue
-            
-            # Verificar tipo de datos
-            if 'type' in specs and df[column].dtype != specs['type']:
-                errors.append(f"Tipo incorrecto en {column}: esperado {specs['type']}, obtenido {df[column].dtype}")
-            
+            present.append(column)
+            if 'type' in specs and not self._type_matches(specs['type'], dtypes[column]):
+                errors.append(f"Tipo incorrecto en {column}: esperado {specs['type']}, obtenido {dtypes[column]}")
+            if 'min' in specs or 'max' in specs:
+                if schema[column].is_numeric() or schema[column].is_temporal():
+                    rangeable.add(column)
+                else:
+                    errors.append(f"Valores no numéricos en {column}: no se puede verificar el rango")
+        return errors, present, rangeable
+
+    # --------------------------------------------------
+    # Validación completa
+    # --------------------------------------------------
+    def validate(self, data: FrameLike) -> List[str]:
+        """Valida los datos contra el schema definido con una sola pasada."""
+        lazy = self._to_lazy(data)
+        errors, columns, rangeable = self._check_structure(data, lazy)
+        if not columns:
+            return errors
+
+        stats = lazy.select(self._compile(columns, rangeable)).collect().row(0, named=True)
+
+        for column in columns:
+            specs = self.schema[column]
+
             # Verificar valores nulos
-            if 'nullable' in specs and not specs['nullable'] and df[column].isnull().any():
+            if stats.get(f"{column}__nulls", 0):
                 errors.append(f"La columna {column} no debe contener valores nulos")
-            
+
             # Verificar rango
-            if 'min' in specs and df[column].min() < specs['min']:
-                errors.append(f"Valor menor al mínimo en {column}: {df[column].min()} < {specs['min']}")
-            
-            if 'max' in specs and df[column].max() > specs['max']:
-                errors.append(f"Valor mayor al máximo en {column}: {df[column].max()} > {specs['max']}")
-        
-        return errors
\ No newline at end of file
+            col_min = stats.get(f"{column}__min")
+            if col_min is not None and col_min < specs['min']:
+                errors.append(f"Valor menor al mínimo en {column}: {col_min} < {specs['min']}")
+
+            col_max = stats.get(f"{column}__max")
+            if col_max is not None and col_max > specs['max']:
+                errors.append(f"Valor mayor al máximo en {column}: {col_max} > {specs['max']}")
+
+        return errors
+
+    # --------------------------------------------------
+    # Validación muestreada
+    # --------------------------------------------------
+    def validate_sample(self, data: FrameLike, fraction: float = 0.01,
+                        confidence: float = 0.95, seed: int = 0) -> Dict[str, Any]:
+        """
+        Estima la tasa de violaciones sobre una muestra de Bernoulli de las filas.
+
+        La muestra se decide con un hash del número de fila, así que funciona
+        sobre LazyFrames sin materializar los datos. Para cada restricción se
+        devuelve la tasa observada y su intervalo de Wilson.
+
+        Returns:
+            {'errors': [...], 'sampled_rows': n, 'rates': {restricción: (tasa, inferior, superior)}}
+        """
+        if not 0 < fraction <= 1:
+            raise ValueError("fraction debe estar en (0, 1]")
+
+        lazy = self._to_lazy(data)
+        errors, columns, rangeable = self._check_structure(data, lazy)
+        report = {'errors': errors, 'sampled_rows': 0, 'rates': {}}
+        if not columns:
+            return report
+
+        threshold = int(fraction * 2**32)
+        sample = lazy.filter(pl.int_range(pl.len(), dtype=pl.UInt64).hash(seed) % 2**32 < threshold)
+        stats = sample.select(self._compile_violations(columns, rangeable)).collect().row(0, named=True)
+
+        n = stats.pop("__rows")
+        report['sampled_rows'] = n
+        messages = {
+            'nulls': "La columna {column} contiene valores nulos",
+            'below': "Valores menores al mínimo en {column}",
+            'above': "Valores mayores al máximo en {column}",
+        }
+        for key, count in stats.items():
+            column, check = key.rsplit("__", 1)
+            rate = count / n if n else 0.0
+            report['rates'][key] = (rate, *_wilson_interval(count, n, confidence))
+            if count:
+                errors.append(
+                    messages[check].format(column=column)
+                    + f" (~{rate:.2%} estimado en {n:,} filas muestreadas)"
+                )
+        return report
+
+
+def _arrow_compatible(series: pd.Series) -> bool:
+    try:
+        pl.from_pandas(series)
+        return True
+    except (ValueError, TypeError):
+        # pyarrow.ArrowInvalid / ArrowTypeError
+        return False
+
+
+def _wilson_interval(successes: int, n: int, confidence: float) -> Tuple[float, float]:
+    """Intervalo de confianza de Wilson para una proporción."""
+    if n == 0:
+        return 0.0, 1.0
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    p = successes / n
+    denom = 1 + z**2 / n
+    center = (p + z**2 / (2 * n)) / denom
+    half = z * math.sqrt(p * (1 - p) / n + z**2 / (4 * n**2)) / denom
+    return max(0.0, center - half), min(1.0, center + half)
+
@@ -1,7 +1,29 @@
+import os
+import sys
+from datetime import timedelta
+
 import streamlit as st
 import pandas as pd
 import plotly.express as px
 
+# Raíz del repositorio en el path para importar analytics/ e interfaces/
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from interfaces.web.app.components.charts.density_charts.density_chart import render_density_chart, render_density_map
+from interfaces.web.app.components.charts.line_charts.downsampled_chart import render_downsampled_chart
+from interfaces.web.app.components.charts.line_charts.live_chart import render_live_chart
+from interfaces.web.app.data.queries import (cache_stats, list_trucks, load_kpis, load_rollup, load_truck_data,
+                                             truck_date_bounds)
+
+DATA_ROOT = os.path.join(REPO_ROOT, "data-set", "processed")
+ROLLUP_ROOT = os.path.join(REPO_ROOT, "data-set", "rollups")
+
+# Telemetría en vivo (se configura en Ajustes)
+st.session_state.setdefault("api_url", os.environ.get("OPTIMINE_API_URL", "http://localhost:8000"))
+st.session_state.setdefault("telemetria_en_vivo", False)
+
 # Configuración básica
 st.set_page_config(
     page_title="OptiMine v0.1",
@@ -41,8 +63,16 @@ def load_sample_data():
     )
     
     st.header("Configuración")
-    fecha_inicio = st.date_input("Fecha inicial")
-    fecha_fin = st.date_input("Fecha final")
+    camiones = list_trucks(DATA_ROOT)
+    camion = st.selectbox("Camión", camiones) if camiones else None
+    if camion:
+        fecha_min, fecha_max = truck_date_bounds(camion, DATA_ROOT)
+        fecha_min, fecha_max = fecha_min.date(), fecha_max.date()
+    else:
+        fecha_min = fecha_max = pd.Timestamp.today().date()
+    fecha_inicio = st.date_input("Fecha inicial", value=max(fecha_min, fecha_max - timedelta(days=7)),
+                                 min_value=fecha_min, max_value=fecha_max)
+    fecha_fin = st.date_input("Fecha final", value=fecha_max, min_value=fecha_min, max_value=fecha_max)
 
 # --------------------------------------------------
 # Contenido Dinámico según Página
@@ -51,20 +81,66 @@ def load_sample_data():
 
 if PAGINAS[pagina_seleccionada] == "inicio":
     st.title("📊 Monitor de Consumo - MSC")
-    
-    # Sección principal
-    st.subheader("Datos de Ejemplo")
-    st.dataframe(df)
-    
-    # Gráfico interactivo
-    st.subheader("Tendencia de Consumo")
-    fig = px.line(df, x='Fecha', y='Consumo_diesel', title='Consumo Diario')
-    st.plotly_chart(fig, use_container_width=True)
-    
-    # Widget básico
-    with st.expander("Diagnóstico Rápido"):
-        consumo_promedio = df['Consumo_diesel'].mean()
-        st.metric("Consumo Promedio", f"{consumo_promedio:.1f} L/día")
+
+    if camion and fecha_inicio <= fecha_fin:
+        sensor = load_truck_data(camion, fecha_inicio, fecha_fin, root=DATA_ROOT)
+        st.subheader(f"Camión {camion}: {fecha_inicio} a {fecha_fin}")
+        st.caption(f"{len(sensor):,} registros")
+
+        if not sensor.empty:
+            # Nivel de combustible a resolución completa, reducido en el servidor
+            etiquetas = {'FuelLevelLiters': 'Litros', 'FullDateTime': 'Fecha'}
+            if st.session_state["telemetria_en_vivo"]:
+                # Las lecturas nuevas llegan por WebSocket sin reejecutar la página
+                render_live_chart(sensor, camion, 'FullDateTime', 'FuelLevelLiters', st.session_state["api_url"],
+                                  title='Nivel de Combustible', labels=etiquetas)
+            else:
+                render_downsampled_chart(sensor, 'FullDateTime', 'FuelLevelLiters', title='Nivel de Combustible',
+                                         labels=etiquetas, key='fuel_level')
+
+            col1, col2 = st.columns(2)
+            col1.metric("Velocidad media", f"{sensor['Speed'].mean():.1f} km/h")
+            col2.metric("RPM media", f"{sensor['RPM'].mean():.0f}")
+
+            # Todos los registros agregados en una grilla fija (sin muestreo)
+            with st.expander("Densidad Velocidad / RPM"):
+                render_density_chart(sensor, 'Speed', 'RPM', title='Velocidad vs RPM')
+            with st.expander("Mapa de posiciones"):
+                render_density_map(sensor, color='Speed', title='Posiciones (velocidad media por celda)')
+
+        # KPIs desde los rollups materializados (python -m analytics.aggregation.rollups)
+        kpis = load_kpis((camion,), fecha_inicio, fecha_fin, ROLLUP_ROOT)
+        if camion in kpis.index:
+            fila = kpis.loc[camion]
+            col1, col2, col3 = st.columns(3)
+            col1.metric("Consumo Promedio", f"{fila['liters_per_day']:.1f} L/día")
+            col2.metric("Consumo por hora", f"{fila['liters_per_hour']:.1f} L/h")
+            col3.metric("Ralentí", f"{fila['idle_share']:.0%}")
+            diario = load_rollup(camion, 'day', fecha_inicio, fecha_fin, ROLLUP_ROOT)
+            fig = px.bar(diario, x='period', y='fuel_consumed_l', title='Consumo Diario',
+                         labels={'period': 'Fecha', 'fuel_consumed_l': 'Litros'})
+            st.plotly_chart(fig, use_container_width=True)
+        else:
+            st.info("Sin rollups para este camión: ejecutar `python -m analytics.aggregation.rollups`")
+
+        with st.expander("Caché de datos"):
+            st.json(cache_stats(DATA_ROOT))
+    else:
+        if fecha_inicio > fecha_fin:
+            st.warning("La fecha inicial es posterior a la final")
+        # Sin datos procesados: datos de ejemplo
+        st.subheader("Datos de Ejemplo")
+        st.dataframe(df)
+        
+        # Gráfico interactivo
+        st.subheader("Tendencia de Consumo")
+        fig = px.line(df, x='Fecha', y='Consumo_diesel', title='Consumo Diario')
+        st.plotly_chart(fig, use_container_width=True)
+        
+        # Widget básico
+        with st.expander("Diagnóstico Rápido"):
+            consumo_promedio = df['Consumo_diesel'].mean()
+            st.metric("Consumo Promedio", f"{consumo_promedio:.1f} L/día")
 
 elif PAGINAS[pagina_seleccionada] == "Lineal":
     st.title("📈 Modelo de Regresión Lineal")
@@ -140,336 +216,9 @@ def load_sample_data():
         if st.form_submit_button("Guardar"):
             st.success("Configuración actualizada")
 
-
-
-
-
-
-
-
-
-
-
-            class InteractiveDataExplorer:
-    def __init__(self, loader: ExploreDataLoader):
-        self.loader = loader
-        self.output = Output()
-        self._is_running = False
-        self._current_process = None
-        self._setup_ui()
-        
-    def _setup_ui(self):
-        """Configura los componentes de la interfaz de usuario"""
-        # Widgets de selección
-        self.truck_dropdown = widgets.Dropdown(
-            options=self.loader.available_trucks,
-            description='Camión:',
-            style={'description_width': 'initial'}
-        )
-        
-        self.metrics_selector = widgets.SelectMultiple(
-            options=['fuel', 'rpm', 'cycle', 'time_model'],
-            value=['rpm'],
-            description='Métricas:',
-            rows=4,
-            style={'description_width': 'initial'}
-        )
-        
-        self.years_selector = widgets.SelectMultiple(
-            options=[str(y) for y in range(2024, 2031)],
-            value=['2024'],
-            description='Años:',
-            rows=7,
-            style={'description_width': 'initial'}
-        )
-        
-        # Botones de control
-        self.start_btn = widgets.Button(
-            description='▶️ Iniciar',
-            button_style='success',
-            tooltip='Iniciar búsqueda y visualización'
-        )
-        
-        self.stop_btn = widgets.Button(
-            description='⏹ Detener',
-            button_style='danger',
-            tooltip='Detener proceso actual',
-            disabled=True
-        )
-        
-        self.cancel_btn = widgets.Button(
-            description='⏹ Cancelar',
-            button_style='warning',
-            tooltip='Cancelar operación'
-        )
-        
-        # Indicador de estado
-        self.status = widgets.HTML(
-            value="🟢 Listo",
-            style={'font_size': '16px'}
-        )
-        
-        # Diseño
-        self.controls = VBox([
-            self.truck_dropdown,
-            self.metrics_selector,
-            self.years_selector,
-            HBox([self.start_btn, self.stop_btn, self.cancel_btn, self.status]),
-            self.output
-        ])
-        
-        # Eventos
-        self.start_btn.on_click(self._start_search)
-        self.stop_btn.on_click(self._stop_search)
-        self.cancel_btn.on_click(self._cancel_search)
-        
-    def _update_ui_state(self, running: bool):
-        """Actualiza el estado de los controles UI"""
-        self.start_btn.disabled = running
-        self.stop_btn.disabled = not running
-        self.cancel_btn.disabled = not running
-        self.status.value = "🟠 Procesando..." if running else "🟢 Listo"
-        
-    def _start_search(self, btn):
-        """Inicia el proceso de búsqueda y visualización"""
-        if self._is_running:
-            return
-            
-        self._is_running = True
-        self._update_ui_state(True)
-        
-        # Ejecutar en un hilo separado para no bloquear la UI
-        self._current_process = threading.Thread(target=self._execute_search)
-        self._current_process.start()
-        
-    def _execute_search(self):
-        """Ejecuta la búsqueda real con logging detallado"""
-        try:
-            with self.output:
-                clear_output(wait=True)
-                print("🔄 Iniciando proceso de búsqueda...\n")
-                
-                # 1. Generar patrones
-                patterns = self.loader._generate_file_patterns(
-                    self.truck_dropdown.value,
-                    self.metrics_selector.value,
-                    self.years_selector.value
-                )
-                print("🔍 Patrones generados:")
-                for idx, pattern in enumerate(patterns, 1):
-                    print(f"  {idx}. {pattern}")
-                
-                # 2. Buscar archivos
-                print("\n📂 Búsqueda de archivos...")
-                files = self.loader._find_matching_files(patterns)
-                if not files:
-                    raise FileNotFoundError("No se encontraron archivos")
-                    
-                print("\n✅ Archivos encontrados:")
-                for idx, file in enumerate(files, 1):
-                    print(f"  {idx}. {os.path.basename(file)}")
-                
-                # 3. Cargar datos
-                print("\n⏳ Cargando datos...")
-                data = self.loader._load_and_merge_data(files)
-                
-                # 4. Resumen final
-                print("\n📊 Resumen de datos cargados:")
-                print(f"- Total registros: {len(data):,}")
-                print(f"- Métricas cargadas: {', '.join(data['metric'].unique())}")
-                print(f"- Rango temporal: {data['timestamp'].min()} a {data['timestamp'].max()}")
-                
-                # 5. Generar visualización
-                print("\n🎨 Generando visualización...")
-                self._plot_data(data)
-                print("\n✅ Proceso completado con éxito!")
-                
-        except Exception as e:
-            print(f"\n🚨 Error crítico: {str(e)}")
-        finally:
-            self._is_running = False
-            self._update_ui_state(False)
-        
-    def _stop_search(self, btn):
-        """Detiene el proceso actual"""
-        if self._is_running:
-            with self.output:
-                print("⏹ Proceso detenido por el usuario")
-            self._is_running = False
-            self._update_ui_state(False)
-        
-    def _cancel_search(self, btn):
-        """Cancela y reinicia los parámetros"""
-        with self.output:
-            clear_output()
-            print("⚠️ Operación cancelada")
-        self._is_running = False
-        self._update_ui_state(False)
-      
-    def _plot_data(self, data: pd.DataFrame):
-        """Crea la visualización interactiva con Plotly"""
-        fig = go.Figure()
-        
-        # Agrupar por métrica y año
-        grouped = data.groupby(['metric', pd.to_datetime(data['timestamp']).dt.year])
-        
-        for (metric, year), group in grouped:
-            fig.add_trace(go.Scatter(
-                x=group['timestamp'],
-                y=group['value'],
-                mode='lines+markers',
-                name=f"{metric.upper()} {year}",
-                hovertemplate="%{y:.2f}<extra>%{x|%Y-%m-%d %H:%M}</extra>"
-            ))
-        
-        fig.update_layout(
-            title=f"Datos del camión {self.truck_dropdown.value}",
-            xaxis_title='Fecha y Hora',
-            yaxis_title='Valor',
-            hovermode='x unified',
-            height=600,
-            template='plotly_dark'
-        )
-        
-        fig.show()
-
-    def show(self):
-        """Muestra la interfaz de usuario"""
-        display(self.controls)
-
-# Configuración y ejecución
-if __name__ == "__main__":
-    project_root = os.path.normpath(os.path.join(os.getcwd(), '..'))
-    loader = ExploreDataLoader(project_root)
-    explorer = InteractiveDataExplorer(loader)
-    explorer.show()
-    
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-# =============================================
-# Bloque 6 - Visualización Interactiva Completa
-# =============================================
-import plotly.graph_objects as go
-from ipywidgets import interact, widgets
-from IPython.display import display
-
-# 1. Preparación de datos
-def prepare_data(df):
-    # Convertir a datetime si no está en el formato correcto
-    if not pd.api.types.is_datetime64_any_dtype(df['created_at_local']):
-        df['created_at_local'] = pd.to_datetime(df['created_at_local'], errors='coerce')
-    
-    # Crear columna año-mes y día
-    df['year_month'] = df['created_at_local'].dt.strftime('%Y-%m')
-    df['day'] = df['created_at_local'].dt.day
-    
-    # Eliminar registros sin fecha válida
-    return df.dropna(subset=['created_at_local'])
-
-# 2. Función de visualización mejorada
-def interactive_daily_histogram(clean_df):
-    # Widget para selección de mes
-    month_selector = widgets.Dropdown(
-        options=sorted(clean_df['year_month'].unique()),
-        description='Seleccionar Mes:',
-        style={'description_width': 'initial'},
-        layout={'width': '300px'}
-    )
-
-    # Widget para selección de métrica
-    metric_selector = widgets.Dropdown(
-        options=clean_df['metric'].unique().tolist(),
-        description='Seleccionar Métrica:',
-        style={'description_width': 'initial'},
-        layout={'width': '300px'}
-    )
-
-    @interact(Mes=month_selector, Métrica=metric_selector)
-    def update_plot(Mes, Métrica):
-        # Filtrar datos
-        filtered_data = clean_df[
-            (clean_df['year_month'] == Mes) & 
-            (clean_df['metric'] == Métrica)
-        ]
-        
-        # Crear conteos diarios
-        days = list(range(1, 32))
-        daily_counts = filtered_data.groupby('day').size().reindex(days, fill_value=0)
-
-        # Crear gráfico interactivo
-        fig = go.Figure()
-
-        fig.add_trace(go.Bar(
-            x=daily_counts.index,
-            y=daily_counts.values,
-            marker=dict(
-                color=daily_counts.values,
-                colorscale='Tealgrn',
-                cmin=0,
-                cmax=daily_counts.max(),
-                colorbar=dict(title='Registros')
-        ))
-
-        # Líneas de referencia
-        avg = daily_counts.mean()
-        max_day = daily_counts.idxmax()
-        
-        fig.update_layout(
-            title=f'{Métrica} - Registros Diarios: {Mes}',
-            xaxis=dict(
-                title='Día del Mes',
-                tickvals=days,
-                tickangle=45),
-            yaxis=dict(title='Total de Registros'),
-            template='plotly_white',
-            height=500,
-            annotations=[
-                dict(
-                    x=max_day,
-                    y=daily_counts[max_day],
-                    text="Máximo",
-                    showarrow=True,
-                    arrowhead=1,
-                    ax=0,
-                    ay=-40
-                )
-            ]
-        )
-
-        fig.add_hline(y=avg, 
-                     line_dash="dot", 
-                     line_color="orange",
-                     annotation_text=f'Promedio: {avg:.1f}')
-
-        fig.show()
-
-    # Mostrar controles
-    display(month_selector)
-    display(metric_selector)
-
-# 3. Ejecutar la visualización con los datos
-clean_df_prepared = prepare_data(clean_df.copy())
-interactive_daily_histogram(clean_df_prepared)
\ No newline at end of file
+    with st.expander("Telemetría en vivo"):
+        # Reemplaza la recarga periódica: solo se envían las lecturas nuevas
+        # Valores fuera de las claves de widget: se conservan al cambiar de página
+        st.session_state["api_url"] = st.text_input("URL de la API", value=st.session_state["api_url"])
+        st.session_state["telemetria_en_vivo"] = st.toggle("Actualizar gráficos en vivo (WebSocket)",
+                                                           value=st.session_state["telemetria_en_vivo"])
@@ -2,60 +2,79 @@
 import plotly.graph_objs as go
 import pandas as pd
 
-# Crear histograma
-fig = px.histogram(
-    df_events,
-    x='SensorHL',
-    y='cantidad',
-    title='Eventos capturados por el sensor por hora del día',
-    nbins=24,
-    color_discrete_sequence=['#636efa'],
-    text_auto=True,
-    barmode='group'
-)
+from analytics.aggregation.rollups import daily_activity
 
-# Ordenar los datos para identificar los 4 más grandes y 4 más pequeños
-df_sorted = df_events.sort_values(by='cantidad')
-lowest = df_sorted.head(4)
-highest = df_sorted.tail(4)
 
-# Añadir marcadores para los más pequeños y más grandes valores del histograma
-fig.add_trace(go.Scatter(
-    x=lowest['SensorHL'],
-    y=lowest['cantidad'],
-    mode='markers',
-    marker=dict(color='red', size=10, symbol='circle'),
-    name='Más pequeños'
-))
+def events_per_hour(rollups, truck_id: str) -> pd.DataFrame:
+    """Registros por hora del día (SensorHL, cantidad) desde el rollup horario, sin leer registros."""
+    hourly = rollups.rollup(truck_id, 'hour')
+    hours = pd.to_datetime(hourly['period']).dt.hour
+    return (
+        hourly.groupby(hours)['records'].sum().reindex(range(24), fill_value=0).astype(int)
+        .rename_axis('SensorHL').reset_index(name='cantidad')
+    )
 
-fig.add_trace(go.Scatter(
-    x=highest['SensorHL'],
-    y=highest['cantidad'],
-    mode='markers',
-    marker=dict(color='green', size=10, symbol='circle'),
-    name='Más grandes'
-))
 
-# Personalización del layout
-fig.update_layout(
-    xaxis_title='Hora del día',
-    yaxis_title='Cantidad de eventos',
-    xaxis=dict(
-        tick0=0,
-        dtick=1,
-        tickformat='%H'
-    ),
-    yaxis=dict(
-        tickformat=".0f",
-        hoverformat=".0f"
+def plot_hourly_histogram(rollups, truck_id: str):
+    """Histograma de eventos del sensor por hora del día desde el rollup horario del camión."""
+    df_events = events_per_hour(rollups, truck_id)
+
+    # Crear histograma
+    fig = px.histogram(
+        df_events,
+        x='SensorHL',
+        y='cantidad',
+        title='Eventos capturados por el sensor por hora del día',
+        nbins=24,
+        color_discrete_sequence=['#636efa'],
+        text_auto=True,
+        barmode='group'
     )
-)
 
-fig.show()
+    # Ordenar los datos para identificar los 4 más grandes y 4 más pequeños
+    df_sorted = df_events.sort_values(by='cantidad')
+    lowest = df_sorted.head(4)
+    highest = df_sorted.tail(4)
+
+    # Añadir marcadores para los más pequeños y más grandes valores del histograma
+    fig.add_trace(go.Scatter(
+        x=lowest['SensorHL'],
+        y=lowest['cantidad'],
+        mode='markers',
+        marker=dict(color='red', size=10, symbol='circle'),
+        name='Más pequeños'
+    ))
+
+    fig.add_trace(go.Scatter(
+        x=highest['SensorHL'],
+        y=highest['cantidad'],
+        mode='markers',
+        marker=dict(color='green', size=10, symbol='circle'),
+        name='Más grandes'
+    ))
+
+    # Personalización del layout
+    fig.update_layout(
+        xaxis_title='Hora del día',
+        yaxis_title='Cantidad de eventos',
+        xaxis=dict(
+            tick0=0,
+            dtick=1,
+            tickformat='%H'
+        ),
+        yaxis=dict(
+            tickformat=".0f",
+            hoverformat=".0f"
+        )
+    )
+
+    fig.show()
+    return fig
 
 
 
 # libreria para generare graficos en python
+# (resolución por minuto: los rollups llegan a la hora, este conteo sigue saliendo de los registros)
 import plotly.express as px
 
 fig = px.histogram(
@@ -110,7 +129,13 @@
 from ipywidgets import interact, widgets
 import plotly.express as px
 
-def prepare_daily_data(df: pd.DataFrame, truck_id: str) -> pd.DataFrame:
+def prepare_daily_data(df: pd.DataFrame, truck_id: str, rollups=None) -> pd.DataFrame:
+    # Con un RollupStore los conteos salen del rollup diario
+    if rollups is not None:
+        daily = rollups.rollup(truck_id, 'day')
+        if not daily.empty:
+            return daily_activity(daily)
+
     # Filtrar por camión
     df = df[df['Truck'] == truck_id].copy()
     
@@ -133,9 +158,9 @@ def prepare_daily_data(df: pd.DataFrame, truck_id: str) -> pd.DataFrame:
     return daily_counts.sort_values(['año', 'mes', 'dia_mes'])
 
 
-def plot_daily_histogram_interactive(df_sensor: pd.DataFrame, truck_id: str):
+def plot_daily_histogram_interactive(df_sensor: pd.DataFrame, truck_id: str, rollups=None):
     # Prepara datos
-    hist_data = prepare_daily_data(df_sensor, truck_id)
+    hist_data = prepare_daily_data(df_sensor, truck_id, rollups)
     meses_disponibles = hist_data['mes'].dropna().unique()
 
     @interact(
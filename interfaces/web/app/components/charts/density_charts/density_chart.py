@@ -0,0 +1,21 @@
+import pandas as pd
+import streamlit as st
+
+from analytics.eda.density import bin_2d, bin_geo, density_heatmap_figure, density_map_figure
+
+
+def render_density_chart(df: pd.DataFrame, x: str, y: str, color: str = None, title: str = '',
+                         width: int = 300, height: int = 200):
+    """Dispersión x vs y como heatmap de densidad con todos los registros (grilla fija)."""
+    grid = bin_2d(df[x], df[y], width=width, height=height, values=df[color] if color else None)
+    fig = density_heatmap_figure(grid, title=title, x_label=x, y_label=y, value_label=color)
+    st.plotly_chart(fig, use_container_width=True)
+    st.caption(f"{int(grid.counts.sum()):,} registros agregados en {width}x{height} celdas")
+
+
+def render_density_map(df: pd.DataFrame, lat: str = 'Latitude', lon: str = 'Longitude', color: str = None,
+                       title: str = '', width: int = 300):
+    """Mapa de posiciones agregadas por celda (a lo sumo una marca por celda no vacía)."""
+    grid = bin_geo(df[lat], df[lon], width=width, values=df[color] if color else None)
+    fig = density_map_figure(grid, title=title, value_label=color)
+    st.plotly_chart(fig, use_container_width=True)
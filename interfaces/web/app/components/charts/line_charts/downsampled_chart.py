@@ -0,0 +1,31 @@
+import pandas as pd
+import streamlit as st
+
+from analytics.eda.downsampling import DEFAULT_POINTS, downsampled_line_figure
+
+
+def render_downsampled_chart(df: pd.DataFrame, x: str, y, title: str = '', n_out: int = DEFAULT_POINTS,
+                             labels: dict = None, key: str = 'downsampled_chart'):
+    """
+    Serie larga reducida en el servidor (LTTB sobre preselección min-max).
+    El control de ventana acota el rango visible y vuelve a reducir solo esa
+    porción, así que al acercarse aparece el detalle a resolución completa.
+    """
+    if df.empty:
+        st.info("No hay datos para graficar")
+        return None
+
+    lo, hi = df[x].min(), df[x].max()
+    is_time = pd.api.types.is_datetime64_any_dtype(df[x])
+    if is_time:
+        lo, hi = lo.to_pydatetime(), hi.to_pydatetime()
+    x_range = None
+    if lo < hi:
+        x_range = st.slider("Ventana visible", min_value=lo, max_value=hi, value=(lo, hi), key=f"{key}_window",
+                            format="YYYY-MM-DD HH:mm" if is_time else None)
+        if is_time:
+            x_range = tuple(pd.Timestamp(v) for v in x_range)
+
+    fig = downsampled_line_figure(df, x, y, n_out=n_out, title=title, x_range=x_range, labels=labels)
+    st.plotly_chart(fig, use_container_width=True, key=key)
+    return fig
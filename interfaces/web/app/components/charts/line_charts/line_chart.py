@@ -1,7 +1,8 @@
 import pandas as pd
-import plotly.express as px
 from datetime import time
 
+from analytics.eda.downsampling import downsampled_line_figure
+
 # 1. Cargar datos del sensor
 etl_processor = ETLDataProcessor("T-210")
 processed_data = etl_processor.run_etl()
@@ -40,13 +41,13 @@
 
 # 5. Crear el gráfico si hay datos
 if not sensor_day.empty:
-    fig = px.line(
+    # Serie del día reducida a ~2000 puntos (LTTB) en lugar de un marcador por registro
+    fig = downsampled_line_figure(
         sensor_day,
         x='TimeStamp',
         y='FuelLevelLiters',
         title=f'Nivel de Combustible - T-210 {fecha_objetivo}',
-        labels={'FuelLevelLiters': 'Litros', 'TimeStamp': 'Hora'},
-        markers=True
+        labels={'FuelLevelLiters': 'Litros', 'TimeStamp': 'Hora'}
     )
 
     fig.update_traces(
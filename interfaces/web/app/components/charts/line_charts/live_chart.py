@@ -0,0 +1,84 @@
+import json
+
+import pandas as pd
+import streamlit.components.v1 as components
+
+from analytics.eda.downsampling import DEFAULT_POINTS, downsampled_line_figure
+
+# Al llegar deltas se agregan al final; la traza conserva como máximo estos puntos
+MAX_LIVE_POINTS = 4 * DEFAULT_POINTS
+
+_LIVE_SCRIPT = """
+<script>
+(function() {
+  const div = document.getElementById(%(div_id)s);
+  const columns = %(columns)s;
+  let lastT = %(last_t)s;
+  let lastSeq = null;
+  const status = document.getElementById(%(status_id)s);
+
+  function connect() {
+    const url = %(ws_url)s + (lastSeq === null ? "?since=0" : "?since=" + lastSeq);
+    const ws = new WebSocket(url);
+    ws.onopen = () => { status.textContent = "🟢 En vivo"; };
+    ws.onmessage = (event) => {
+      const msg = JSON.parse(event.data);
+      lastSeq = msg.seq;
+      if (msg.type === "resync") { status.textContent = "🟡 Se perdieron datos: recargar la página"; return; }
+      // Solo puntos posteriores a lo ya dibujado (el historial puede repetirse)
+      const keep = msg.t.map((t, i) => t > lastT ? i : -1).filter(i => i >= 0);
+      if (!keep.length) return;
+      const xs = [], ys = [], idx = [];
+      columns.forEach((col, trace) => {
+        if (!msg.y[col]) return;
+        // Fechas sin zona, igual que los datos iniciales
+        xs.push(keep.map(i => new Date(msg.t[i]).toISOString().slice(0, -1)));
+        ys.push(keep.map(i => msg.y[col][i]));
+        idx.push(trace);
+      });
+      lastT = msg.t[keep[keep.length - 1]];
+      if (idx.length) Plotly.extendTraces(div, {x: xs, y: ys}, idx, %(max_points)d);
+    };
+    ws.onclose = () => { status.textContent = "🔴 Desconectado, reintentando..."; setTimeout(connect, 3000); };
+  }
+  connect();
+})();
+</script>
+"""
+
+
+def render_live_chart(df: pd.DataFrame, truck: str, x: str, y, api_url: str, title: str = '',
+                      n_out: int = DEFAULT_POINTS, labels: dict = None, height: int = 480,
+                      max_points: int = MAX_LIVE_POINTS):
+    """
+    Gráfico con la ventana inicial reducida en el servidor que luego recibe
+    por WebSocket (`/ws/telemetry/{truck}` de la API) solo las lecturas
+    nuevas y las agrega con `Plotly.extendTraces`, sin reejecutar el script
+    de Streamlit.
+    """
+    columns = [y] if isinstance(y, str) else list(y)
+    fig = downsampled_line_figure(df, x, columns, n_out=n_out, title=title, labels=labels)
+    fig.update_layout(height=height - 40, margin=dict(l=40, r=20, t=50, b=40))
+    for trace in fig.data:
+        # extendTraces necesita arreglos JS simples, no los binarios de plotly.py;
+        # las fechas van como texto ISO sin zona, igual que los deltas del script
+        xs = pd.Series(trace.x)
+        if pd.api.types.is_datetime64_any_dtype(xs):
+            xs = xs.dt.strftime('%Y-%m-%dT%H:%M:%S.%f')
+        trace.x, trace.y = xs.tolist(), list(trace.y)
+
+    div_id, status_id = f"live-{truck}", f"live-status-{truck}"
+    last_t = int(pd.Timestamp(df[x].max()).value // 1_000_000) if not df.empty else 0
+    ws_url = api_url.rstrip('/').replace('https://', 'wss://').replace('http://', 'ws://')
+    html = (f'<div id="{status_id}" style="font-family:sans-serif;font-size:13px">⚪ Conectando...</div>'
+            + fig.to_html(include_plotlyjs='cdn', full_html=False, div_id=div_id)
+            + _LIVE_SCRIPT % {
+                'div_id': json.dumps(div_id),
+                'status_id': json.dumps(status_id),
+                'columns': json.dumps(columns),
+                'last_t': last_t,
+                'ws_url': json.dumps(f"{ws_url}/ws/telemetry/{truck}"),
+                'max_points': max_points,
+            })
+    components.html(html, height=height)
+    return fig
@@ -0,0 +1,104 @@
+# =============================================
+# Visualización interactiva de registros diarios (Jupyter)
+# =============================================
+import pandas as pd
+
+
+# 1. Preparación de datos
+def prepare_data(df):
+    # Convertir a datetime si no está en el formato correcto
+    if not pd.api.types.is_datetime64_any_dtype(df['created_at_local']):
+        df['created_at_local'] = pd.to_datetime(df['created_at_local'], errors='coerce')
+
+    # Crear columna año-mes y día
+    df['year_month'] = df['created_at_local'].dt.strftime('%Y-%m')
+    df['day'] = df['created_at_local'].dt.day
+
+    # Eliminar registros sin fecha válida
+    return df.dropna(subset=['created_at_local'])
+
+
+# 2. Función de visualización mejorada
+def interactive_daily_histogram(clean_df):
+    import plotly.graph_objects as go
+    from IPython.display import display
+    from ipywidgets import interact, widgets
+
+    # Widget para selección de mes
+    month_selector = widgets.Dropdown(
+        options=sorted(clean_df['year_month'].unique()),
+        description='Seleccionar Mes:',
+        style={'description_width': 'initial'},
+        layout={'width': '300px'}
+    )
+
+    # Widget para selección de métrica
+    metric_selector = widgets.Dropdown(
+        options=clean_df['metric'].unique().tolist(),
+        description='Seleccionar Métrica:',
+        style={'description_width': 'initial'},
+        layout={'width': '300px'}
+    )
+
+    @interact(Mes=month_selector, Métrica=metric_selector)
+    def update_plot(Mes, Métrica):
+        # Filtrar datos
+        filtered_data = clean_df[
+            (clean_df['year_month'] == Mes) &
+            (clean_df['metric'] == Métrica)
+        ]
+
+        # Crear conteos diarios
+        days = list(range(1, 32))
+        daily_counts = filtered_data.groupby('day').size().reindex(days, fill_value=0)
+
+        # Crear gráfico interactivo
+        fig = go.Figure()
+
+        fig.add_trace(go.Bar(
+            x=daily_counts.index,
+            y=daily_counts.values,
+            marker=dict(
+                color=daily_counts.values,
+                colorscale='Tealgrn',
+                cmin=0,
+                cmax=daily_counts.max(),
+                colorbar=dict(title='Registros'))
+        ))
+
+        # Líneas de referencia
+        avg = daily_counts.mean()
+        max_day = daily_counts.idxmax()
+
+        fig.update_layout(
+            title=f'{Métrica} - Registros Diarios: {Mes}',
+            xaxis=dict(
+                title='Día del Mes',
+                tickvals=days,
+                tickangle=45),
+            yaxis=dict(title='Total de Registros'),
+            template='plotly_white',
+            height=500,
+            annotations=[
+                dict(
+                    x=max_day,
+                    y=daily_counts[max_day],
+                    text="Máximo",
+                    showarrow=True,
+                    arrowhead=1,
+                    ax=0,
+                    ay=-40
+                )
+            ]
+        )
+
+        fig.add_hline(y=avg,
+                      line_dash="dot",
+                      line_color="orange",
+                      annotation_text=f'Promedio: {avg:.1f}')
+
+        fig.show()
+
+    # Mostrar controles
+    display(month_selector)
+    display(metric_selector)
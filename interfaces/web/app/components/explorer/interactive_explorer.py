@@ -0,0 +1,342 @@
+# =============================================
+# Explorador interactivo (Jupyter) con carga cancelable y progresiva
+# =============================================
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Sequence
+
+import pandas as pd
+
+from analytics.eda.downsampling import DEFAULT_POINTS, downsample_frame
+
+
+class SearchCancelled(Exception):
+    """La búsqueda se detuvo por el usuario o fue reemplazada por otra."""
+
+
+class CancellationToken:
+    """Marca de cancelación cooperativa: el trabajo la consulta entre archivos."""
+
+    def __init__(self):
+        self._event = threading.Event()
+        self.reason = None
+
+    def cancel(self, reason: str = "cancelada"):
+        if not self._event.is_set():
+            self.reason = reason
+            self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def raise_if_cancelled(self):
+        if self._event.is_set():
+            raise SearchCancelled(self.reason)
+
+
+class SearchRunner:
+    """
+    Ejecuta una búsqueda a la vez en un único hilo reutilizado.
+
+    Enviar una búsqueda nueva cancela la anterior (que termina en el próximo
+    punto de control) y la nueva espera en la cola del mismo hilo, así que
+    nunca hay más de un hilo vivo por explorador.
+    """
+
+    def __init__(self):
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="explorer")
+        self._lock = threading.Lock()
+        self._token: Optional[CancellationToken] = None
+        self._future: Optional[Future] = None
+
+    def submit(self, job: Callable[[CancellationToken], None]) -> Future:
+        with self._lock:
+            if self._token is not None:
+                self._token.cancel("reemplazada por una búsqueda nueva")
+            self._token = token = CancellationToken()
+            self._future = self._executor.submit(job, token)
+            return self._future
+
+    def cancel(self, reason: str = "cancelada") -> bool:
+        """Cancela la búsqueda en curso; devuelve False si no había ninguna."""
+        with self._lock:
+            if self._future is None or self._future.done():
+                return False
+            self._token.cancel(reason)
+            return True
+
+    @property
+    def running(self) -> bool:
+        return self._future is not None and not self._future.done()
+
+    def is_current(self, token: CancellationToken) -> bool:
+        return token is self._token
+
+    def shutdown(self, wait: bool = True):
+        self.cancel("explorador cerrado")
+        self._executor.shutdown(wait=wait)
+
+
+def load_in_batches(loader, files: Sequence[str], token: CancellationToken, batch_size: int = 1,
+                    on_batch: Optional[Callable[[pd.DataFrame, int, int], None]] = None) -> pd.DataFrame:
+    """
+    Carga `files` de a `batch_size` con `loader._load_and_merge_data`,
+    revisando `token` antes y después de cada lote y entregando cada lote a
+    `on_batch` (lote, archivos cargados, total). Un lote que termina de leerse
+    después de cancelar no se entrega. Si se cancela, `SearchCancelled` lleva
+    lo cargado hasta ese momento en `partial`.
+    """
+    parts: List[pd.DataFrame] = []
+
+    def checkpoint():
+        try:
+            token.raise_if_cancelled()
+        except SearchCancelled as e:
+            e.partial = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame()
+            raise
+
+    for start in range(0, len(files), batch_size):
+        checkpoint()
+        batch = loader._load_and_merge_data(list(files[start:start + batch_size]))
+        if batch is not None and not batch.empty:
+            parts.append(batch)
+            checkpoint()
+            if on_batch is not None:
+                on_batch(batch, min(start + batch_size, len(files)), len(files))
+    return pd.concat(parts, ignore_index=True) if parts else pd.DataFrame()
+
+
+class InteractiveDataExplorer:
+    """
+    Explorador de archivos por camión, métricas y años (ipywidgets).
+
+    La búsqueda corre en un `SearchRunner`: Detener corta la carga en el
+    siguiente archivo y deja visible lo ya cargado; Cancelar además limpia la
+    salida; Iniciar con una búsqueda en curso la reemplaza. El gráfico se
+    actualiza con cada lote de archivos.
+
+    `loader` sigue la interfaz de `ExploreDataLoader` de los notebooks de
+    exploración: `available_trucks`, `_generate_file_patterns(camión,
+    métricas, años)`, `_find_matching_files(patrones)` y
+    `_load_and_merge_data(archivos)` (columnas metric, timestamp, value).
+    """
+
+    def __init__(self, loader, batch_size: int = 1, n_out: int = DEFAULT_POINTS):
+        from ipywidgets import Output
+
+        self.loader = loader
+        self.batch_size = batch_size
+        self.n_out = n_out
+        self.output = Output()
+        self.runner = SearchRunner()
+        self.figure = None
+        self._setup_ui()
+
+    def _setup_ui(self):
+        """Configura los componentes de la interfaz de usuario"""
+        from ipywidgets import HBox, VBox, widgets
+
+        # Widgets de selección
+        self.truck_dropdown = widgets.Dropdown(
+            options=self.loader.available_trucks,
+            description='Camión:',
+            style={'description_width': 'initial'}
+        )
+
+        self.metrics_selector = widgets.SelectMultiple(
+            options=['fuel', 'rpm', 'cycle', 'time_model'],
+            value=['rpm'],
+            description='Métricas:',
+            rows=4,
+            style={'description_width': 'initial'}
+        )
+
+        self.years_selector = widgets.SelectMultiple(
+            options=[str(y) for y in range(2024, 2031)],
+            value=['2024'],
+            description='Años:',
+            rows=7,
+            style={'description_width': 'initial'}
+        )
+
+        # Botones de control
+        self.start_btn = widgets.Button(
+            description='▶️ Iniciar',
+            button_style='success',
+            tooltip='Iniciar búsqueda (reemplaza la que esté en curso)'
+        )
+
+        self.stop_btn = widgets.Button(
+            description='⏹ Detener',
+            button_style='danger',
+            tooltip='Detener y conservar lo cargado',
+            disabled=True
+        )
+
+        self.cancel_btn = widgets.Button(
+            description='⏹ Cancelar',
+            button_style='warning',
+            tooltip='Cancelar operación y limpiar',
+            disabled=True
+        )
+
+        # Indicador de estado
+        self.status = widgets.HTML(
+            value="🟢 Listo",
+            style={'font_size': '16px'}
+        )
+
+        # Diseño
+        self.controls = VBox([
+            self.truck_dropdown,
+            self.metrics_selector,
+            self.years_selector,
+            HBox([self.start_btn, self.stop_btn, self.cancel_btn, self.status]),
+            self.output
+        ])
+
+        # Eventos
+        self.start_btn.on_click(self._start_search)
+        self.stop_btn.on_click(self._stop_search)
+        self.cancel_btn.on_click(self._cancel_search)
+
+    def _update_ui_state(self, running: bool, message: Optional[str] = None):
+        """Actualiza el estado de los controles UI"""
+        self.stop_btn.disabled = not running
+        self.cancel_btn.disabled = not running
+        self.status.value = message or ("🟠 Procesando..." if running else "🟢 Listo")
+
+    def _start_search(self, btn):
+        """Inicia la búsqueda; si hay una en curso, la reemplaza"""
+        params = (self.truck_dropdown.value, tuple(self.metrics_selector.value), tuple(self.years_selector.value))
+        self._update_ui_state(True)
+        self.runner.submit(lambda token: self._execute_search(token, *params))
+
+    def _execute_search(self, token: CancellationToken, truck: str, metrics: tuple, years: tuple):
+        """Busca y carga por lotes, actualizando el gráfico con cada uno"""
+        from IPython.display import clear_output
+
+        series: Dict[tuple, List[pd.DataFrame]] = {}
+        with self.output:
+            try:
+                token.raise_if_cancelled()
+                clear_output(wait=True)
+                print("🔄 Iniciando proceso de búsqueda...\n")
+
+                # 1. Generar patrones
+                patterns = self.loader._generate_file_patterns(truck, metrics, years)
+                print("🔍 Patrones generados:")
+                for idx, pattern in enumerate(patterns, 1):
+                    print(f"  {idx}. {pattern}")
+
+                # 2. Buscar archivos
+                print("\n📂 Búsqueda de archivos...")
+                files = self.loader._find_matching_files(patterns)
+                if not files:
+                    raise FileNotFoundError("No se encontraron archivos")
+                print(f"\n✅ {len(files)} archivos encontrados")
+
+                # 3. Cargar por lotes con vista progresiva
+                print("\n⏳ Cargando datos...")
+                self._new_figure(truck)
+
+                def on_batch(batch: pd.DataFrame, loaded: int, total: int):
+                    self._add_batch(series, batch)
+                    self.status.value = f"🟠 {loaded}/{total} archivos"
+
+                data = load_in_batches(self.loader, files, token, self.batch_size, on_batch)
+
+                # 4. Resumen final
+                self._print_summary(data)
+                print("\n✅ Proceso completado con éxito!")
+                self._finish(token, "🟢 Listo")
+            except SearchCancelled as e:
+                partial = getattr(e, 'partial', pd.DataFrame())
+                print(f"\n⏹ Búsqueda {e} ({len(partial):,} registros cargados)")
+                self._finish(token, f"⏹ {str(e).capitalize()}")
+            except Exception as e:
+                print(f"\n🚨 Error crítico: {str(e)}")
+                self._finish(token, "🔴 Error")
+
+    def _finish(self, token: CancellationToken, message: str):
+        # Una búsqueda reemplazada no toca los controles de la que sigue
+        if self.runner.is_current(token):
+            self._update_ui_state(False, message)
+
+    def _stop_search(self, btn):
+        """Detiene la carga en el próximo archivo; lo cargado queda visible"""
+        self.runner.cancel("detenida por el usuario")
+
+    def _cancel_search(self, btn):
+        """Cancela la carga y limpia la salida"""
+        from IPython.display import clear_output
+
+        # La figura no se toca desde aquí: el hilo de la búsqueda puede estar
+        # entregando un lote; se reemplaza con la próxima búsqueda
+        self.runner.cancel("cancelada")
+        with self.output:
+            clear_output()
+            print("⚠️ Operación cancelada")
+
+    def _new_figure(self, truck: str):
+        """Crea la figura vacía que se irá completando por lotes"""
+        import plotly.graph_objects as go
+        from IPython.display import display
+
+        self.figure = go.FigureWidget(layout=dict(
+            title=f"Datos del camión {truck}",
+            xaxis_title='Fecha y Hora',
+            yaxis_title='Valor',
+            hovermode='x unified',
+            height=600,
+            template='plotly_dark'
+        ))
+        display(self.figure)
+
+    def _add_batch(self, series: Dict[tuple, List[pd.DataFrame]], batch: pd.DataFrame):
+        """Agrega un lote: redibuja (reducidas con LTTB) solo las trazas que cambiaron"""
+        import plotly.graph_objects as go
+
+        if self.figure is None:
+            return
+        batch = batch.assign(timestamp=pd.to_datetime(batch['timestamp']))
+        touched = []
+        for key, group in batch.groupby(['metric', batch['timestamp'].dt.year]):
+            series.setdefault(key, []).append(group)
+            touched.append(key)
+
+        names = {trace.name: trace for trace in self.figure.data}
+        with self.figure.batch_update():
+            for metric, year in touched:
+                parts = series[(metric, year)]
+                full = pd.concat(parts, ignore_index=True) if len(parts) > 1 else parts[0]
+                series[(metric, year)] = [full]
+                shown = downsample_frame(full, 'timestamp', 'value', self.n_out)
+                name = f"{metric.upper()} {year}"
+                if name in names:
+                    names[name].x, names[name].y = shown['timestamp'], shown['value']
+                else:
+                    self.figure.add_trace(go.Scattergl(
+                        x=shown['timestamp'], y=shown['value'], mode='lines', name=name,
+                        hovertemplate="%{y:.2f}<extra>%{x|%Y-%m-%d %H:%M}</extra>"
+                    ))
+
+    @staticmethod
+    def _print_summary(data: pd.DataFrame):
+        print("\n📊 Resumen de datos cargados:")
+        print(f"- Total registros: {len(data):,}")
+        if not data.empty:
+            print(f"- Métricas cargadas: {', '.join(map(str, data['metric'].unique()))}")
+            print(f"- Rango temporal: {data['timestamp'].min()} a {data['timestamp'].max()}")
+
+    def show(self):
+        """Muestra la interfaz de usuario"""
+        from IPython.display import display
+
+        display(self.controls)
+
+    def close(self):
+        """Detiene la búsqueda en curso y libera el hilo del explorador"""
+        self.runner.shutdown(wait=False)
+
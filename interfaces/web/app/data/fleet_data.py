@@ -0,0 +1,130 @@
+# =============================================
+# Acceso a datos procesados de la flota para el dashboard
+# =============================================
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+from analytics.eda.fleet import PROCESSED_ROOT, ProcessedDataCache
+from interfaces.web.app.data.frame_cache import FrameCache
+
+ONE_DAY = pd.Timedelta(days=1)
+
+
+def _day_runs(days: List[pd.Timestamp]) -> List[Tuple[pd.Timestamp, pd.Timestamp]]:
+    """Agrupa días ordenados en tramos contiguos [inicio, fin]."""
+    runs = []
+    for day in days:
+        if runs and day - runs[-1][1] == ONE_DAY:
+            runs[-1][1] = day
+        else:
+            runs.append([day, day])
+    return [tuple(run) for run in runs]
+
+
+class FleetDataSource:
+    """
+    Lectura de los datasets procesados (`ProcessedDataCache`) filtrados por
+    camión y rango de fechas.
+
+    Los resultados se guardan en `cache` por (dataset, camión, columnas, día):
+    al mover o achicar el rango solo se leen los días que faltan, con un único
+    escaneo por tramo contiguo y el filtro de fechas empujado al lector
+    parquet (se saltan los row groups fuera de rango).
+    """
+
+    def __init__(self, root: str = PROCESSED_ROOT, cache: Optional[FrameCache] = None,
+                 time_col: str = 'FullDateTime'):
+        self.store = ProcessedDataCache(root)
+        self.cache = cache if cache is not None else FrameCache()
+        self.time_col = time_col
+
+    def trucks(self) -> List[str]:
+        return self.store.trucks()
+
+    def date_bounds(self, truck: str, data_type: str = 'sensor') -> Tuple[pd.Timestamp, pd.Timestamp]:
+        """Primer y último instante disponibles (lee solo la columna temporal)."""
+        def load():
+            times = pd.read_parquet(self._file(data_type, truck), columns=[self.time_col])[self.time_col]
+            return pd.Series([times.min(), times.max()])
+        bounds = self.cache.get_or_load(('bounds', data_type, truck), load)
+        return bounds.iloc[0], bounds.iloc[1]
+
+    def _file(self, data_type: str, truck: str):
+        path = self.store.path(data_type, truck)
+        if not path.exists():
+            raise FileNotFoundError(f"No hay datos '{data_type}' procesados para {truck}: {path}")
+        return path
+
+    def load(self, truck: str, start, end, data_type: str = 'sensor',
+             columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """
+        Registros de `truck` entre las fechas `start` y `end` (ambas inclusive).
+
+        Args:
+            truck: Camión (p. ej. 'T-210')
+            start, end: Fechas del rango (date, str o Timestamp)
+            data_type: 'sensor', 'time_model' o 'cycle'
+            columns: Columnas a leer (None = todas)
+        """
+        start, end = pd.Timestamp(start).normalize(), pd.Timestamp(end).normalize()
+        if end < start:
+            raise ValueError(f"Rango de fechas inválido: {start.date()} > {end.date()}")
+        cols = tuple(columns) if columns is not None else None
+        days = list(pd.date_range(start, end, freq='D'))
+
+        parts = {}
+        for day in days:
+            frame = self.cache.get((data_type, truck, cols, day))
+            if frame is not None:
+                parts[day] = frame
+        missing = [day for day in days if day not in parts]
+        if missing:
+            path = self._file(data_type, truck)
+            for run_start, run_end in _day_runs(missing):
+                # Sesiones que piden el mismo tramo a la vez comparten un solo escaneo;
+                # los días quedan guardados uno por uno dentro de `_scan_days`
+                parts.update(self.cache.get_or_load(
+                    ('scan', data_type, truck, cols, run_start, run_end),
+                    lambda: self._scan_days(path, data_type, truck, cols, run_start, run_end),
+                    store=False,
+                ))
+
+        return pd.concat([parts[day] for day in days], ignore_index=True)
+
+    def _scan_days(self, path, data_type: str, truck: str, cols: Optional[tuple],
+                   first: pd.Timestamp, last: pd.Timestamp) -> dict:
+        """Lee [first, last + 1 día) en un solo escaneo y lo guarda en caché día por día."""
+        read_cols = None
+        if cols is not None:
+            # Columnas pedidas que el archivo no tiene se devuelven como NaN
+            available = set(pq.read_schema(path).names)
+            read_cols = [c for c in dict.fromkeys(cols + (self.time_col,)) if c in available]
+        scanned = pd.read_parquet(
+            path, columns=read_cols,
+            filters=[(self.time_col, '>=', first), (self.time_col, '<', last + ONE_DAY)],
+        )
+        output = scanned if cols is None else scanned.reindex(columns=list(cols))
+        by_day = scanned[self.time_col].dt.normalize().to_numpy()
+        indices = {pd.Timestamp(day): idx for day, idx in output.groupby(by_day, sort=False).indices.items()}
+
+        parts = {}
+        for day in pd.date_range(first, last, freq='D'):
+            idx = indices.get(day)
+            frame = output.iloc[idx] if idx is not None else output.iloc[0:0]
+            # Días sin registros también se guardan: no vuelven a escanearse
+            self.cache.put((data_type, truck, cols, day), frame)
+            parts[day] = frame
+        return parts
+
+    def load_fleet(self, trucks: Iterable[str], start, end, data_type: str = 'sensor',
+                   columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """Concatena `load` de varios camiones (omite los que no tienen datos)."""
+        frames = []
+        for truck in trucks:
+            try:
+                frames.append(self.load(truck, start, end, data_type, columns))
+            except FileNotFoundError as e:
+                print(f"⚠️ {str(e)}")
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=list(columns or []))
@@ -0,0 +1,170 @@
+# =============================================
+# Caché en memoria de DataFrames con TTL, límite de entradas y de bytes
+# =============================================
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+import pandas as pd
+
+
+def frame_nbytes(value: Any) -> int:
+    """Memoria aproximada de un resultado (incluye strings de columnas object)."""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True, deep=True))
+    return sys.getsizeof(value)
+
+
+class _Flight:
+    """Carga en curso de una clave: los demás hilos esperan su resultado."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error: Optional[BaseException] = None
+
+
+class FrameCache:
+    """
+    Caché LRU segura entre hilos para resultados del dashboard.
+
+    Cada entrada vence `ttl` segundos después de guardarse. Al superar
+    `max_entries` o `max_bytes` se desalojan las entradas usadas hace más
+    tiempo; una entrada más grande que `max_bytes` no se guarda.
+
+    `get_or_load` es de vuelo único: si varios hilos piden a la vez una clave
+    ausente, solo el primero ejecuta el loader y el resto recibe su resultado
+    (o su excepción, que no se guarda). Con `store=False` solo se comparte el
+    cálculo en curso y el resultado no se guarda bajo esa clave.
+    """
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 512 * 1024 ** 2, ttl: Optional[float] = 900.0,
+                 clock: Callable[[], float] = time.monotonic):
+        if max_entries <= 0 or max_bytes <= 0:
+            raise ValueError("max_entries y max_bytes deben ser positivos")
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._clock = clock
+        self._entries = OrderedDict()          # clave -> (valor, bytes, vence)
+        self._inflight = {}                    # clave -> _Flight
+        self._lock = threading.RLock()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.coalesced = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return self._lookup(key) is not None
+
+    def _lookup(self, key: Hashable):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[2] is not None and entry[2] <= self._clock():
+            self._drop(key)
+            return None
+        return entry
+
+    def _drop(self, key: Hashable):
+        _, size, _ = self._entries.pop(key)
+        self.nbytes -= size
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._lookup(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, value: Any, nbytes: Optional[int] = None, ttl: Optional[float] = None) -> bool:
+        """Guarda `value` (con `ttl` propio si se indica); devuelve False si no cabe en `max_bytes`."""
+        size = frame_nbytes(value) if nbytes is None else nbytes
+        ttl = self.ttl if ttl is None else ttl
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            if size > self.max_bytes:
+                return False
+            expires = self._clock() + ttl if ttl is not None else None
+            self._entries[key] = (value, size, expires)
+            self.nbytes += size
+            self._evict()
+            return True
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any], ttl: Optional[float] = None,
+                    store: bool = True) -> Any:
+        with self._lock:
+            entry = self._lookup(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _Flight()
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = loader()
+            if store:
+                self.put(key, flight.value, ttl=ttl)
+            return flight.value
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight.done.set()
+
+    def _evict(self):
+        now = self._clock()
+        expired = [k for k, (_, _, exp) in self._entries.items() if exp is not None and exp <= now]
+        for key in expired:
+            self._drop(key)
+        while self._entries and (len(self._entries) > self.max_entries or self.nbytes > self.max_bytes):
+            key = next(iter(self._entries))
+            self._drop(key)
+            self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self.nbytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+                'evictions': self.evictions,
+                'coalesced': self.coalesced,
+                'inflight': len(self._inflight),
+            }
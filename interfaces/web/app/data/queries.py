@@ -0,0 +1,91 @@
+# =============================================
+# Consultas del dashboard con caché compartida entre sesiones
+# =============================================
+from typing import Optional, Tuple
+
+import pandas as pd
+import streamlit as st
+
+from analytics.aggregation.rollups import ROLLUP_ROOT, RollupStore
+from analytics.eda.fleet import PROCESSED_ROOT
+from interfaces.web.app.data.fleet_data import FleetDataSource
+from interfaces.web.app.data.frame_cache import FrameCache
+from interfaces.web.app.data.shared_cache import SharedQueryCache
+
+# Columnas que usan las vistas del dashboard (se leen solo estas del parquet)
+SENSOR_COLUMNS = ('FullDateTime', 'Equipment', 'Speed', 'RPM', 'FuelLevelLiters', 'Latitude', 'Longitude')
+QUERY_TTL_S = 600
+ROLLUP_TTL_S = 60
+DAY_CACHE_BYTES = 512 * 1024 ** 2
+# Solo resultados chicos (listas, límites, KPIs y rollups): los registros
+# viven únicamente en la caché por día
+SHARED_CACHE_BYTES = 128 * 1024 ** 2
+
+
+@st.cache_resource(show_spinner=False)
+def get_data_source(root: str = PROCESSED_ROOT) -> FleetDataSource:
+    """
+    Una fuente por proceso del servidor, compartida por todas las sesiones.
+    Su caché por día está acotada en bytes y entradas y vence a la hora.
+    """
+    return FleetDataSource(root, FrameCache(max_entries=2048, max_bytes=DAY_CACHE_BYTES, ttl=3600))
+
+
+@st.cache_resource(show_spinner=False)
+def get_rollup_store(root: str = ROLLUP_ROOT) -> RollupStore:
+    return RollupStore(root)
+
+
+@st.cache_resource(show_spinner=False)
+def get_shared_cache() -> SharedQueryCache:
+    """
+    Resultados de consultas para todo el proceso. A diferencia de
+    `st.cache_data`, que entrega una copia deserializada a cada sesión, todas
+    las sesiones reciben el mismo DataFrame (copia superficial) y consultas
+    idénticas simultáneas se calculan una sola vez.
+    """
+    return SharedQueryCache(max_entries=512, max_bytes=SHARED_CACHE_BYTES, ttl=QUERY_TTL_S)
+
+
+def list_trucks(root: str = PROCESSED_ROOT) -> list:
+    return get_shared_cache().query('trucks', lambda: get_data_source(root).trucks(), root=root)
+
+
+def truck_date_bounds(truck: str, root: str = PROCESSED_ROOT) -> Tuple[pd.Timestamp, pd.Timestamp]:
+    return get_shared_cache().query('bounds', lambda: get_data_source(root).date_bounds(truck), truck=truck,
+                                    root=root)
+
+
+def load_truck_data(truck: str, start, end, data_type: str = 'sensor',
+                    columns: Optional[Tuple[str, ...]] = SENSOR_COLUMNS,
+                    root: str = PROCESSED_ROOT) -> pd.DataFrame:
+    """
+    Resultado exacto por (camión, rango, columnas), armado desde la caché por
+    día de `get_data_source`: solo se escanean los días que nunca se leyeron.
+    No pasa por la caché compartida para no guardar las mismas filas dos veces;
+    la caché por día ya es de vuelo único y está acotada en bytes.
+    """
+    with st.spinner("Cargando datos..."):
+        return get_data_source(root).load(truck, start, end, data_type, columns)
+
+
+def load_kpis(trucks: Tuple[str, ...], start, end, root: str = ROLLUP_ROOT) -> pd.DataFrame:
+    """
+    KPIs por camión del rango desde los rollups materializados (no lee
+    registros crudos). TTL corto: los rollups se actualizan con cada lote.
+    """
+    return get_shared_cache().query(
+        'kpis', lambda: get_rollup_store(root).kpis(trucks, start, end, grain='day'),
+        truck=tuple(trucks), start=start, end=end, resolution='day', ttl=ROLLUP_TTL_S, root=root,
+    )
+
+
+def load_rollup(truck: str, grain: str, start, end, root: str = ROLLUP_ROOT) -> pd.DataFrame:
+    return get_shared_cache().query(
+        'rollup', lambda: get_rollup_store(root).query(grain, [truck], start, end),
+        truck=truck, start=start, end=end, resolution=grain, ttl=ROLLUP_TTL_S, root=root,
+    )
+
+
+def cache_stats(root: str = PROCESSED_ROOT) -> dict:
+    return {'dias': get_data_source(root).cache.stats(), 'consultas': get_shared_cache().stats()}
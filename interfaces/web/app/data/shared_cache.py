@@ -0,0 +1,71 @@
+# =============================================
+# Caché de consultas compartida por todas las sesiones del servidor
+# =============================================
+import datetime as dt
+from typing import Any, Callable, Optional
+
+import pandas as pd
+
+from interfaces.web.app.data.frame_cache import FrameCache
+
+
+def _normalize(value: Any) -> Any:
+    """Forma canónica de un parámetro de consulta (hashable y estable)."""
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    if isinstance(value, str):
+        return value.strip()
+    if isinstance(value, (dt.date, dt.datetime, pd.Timestamp)):
+        stamp = pd.Timestamp(value)
+        # Un día sin hora se compara igual que su medianoche
+        return stamp.normalize() if stamp == stamp.normalize() else stamp
+    if isinstance(value, (dt.timedelta, pd.Timedelta)):
+        return pd.Timedelta(value)
+    if isinstance(value, (set, frozenset)):
+        return tuple(sorted(_normalize(v) for v in value))
+    if isinstance(value, (list, tuple)):
+        return tuple(_normalize(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _normalize(v)) for k, v in value.items()))
+    return value
+
+
+def query_key(kind: str, truck=None, metric=None, start=None, end=None, resolution=None, **extra) -> tuple:
+    """
+    Clave normalizada (tipo, camión, métrica, inicio, fin, resolución, extras):
+    '2024-03-01', date(2024, 3, 1) y Timestamp('2024-03-01') generan la misma
+    clave; las resoluciones tipo '1min' se comparan como intervalos.
+    """
+    if isinstance(resolution, str):
+        try:
+            resolution = pd.Timedelta(resolution)
+        except ValueError:
+            pass
+    if isinstance(start, str):
+        start = pd.Timestamp(start)
+    if isinstance(end, str):
+        end = pd.Timestamp(end)
+    return (kind, _normalize(truck), _normalize(metric), _normalize(start), _normalize(end),
+            _normalize(resolution), _normalize(extra))
+
+
+class SharedQueryCache(FrameCache):
+    """
+    Una instancia por proceso (p. ej. vía `st.cache_resource`) para que todas
+    las sesiones compartan cálculo y memoria: consultas idénticas simultáneas
+    se resuelven una sola vez (vuelo único) y el resultado se guarda una vez,
+    con desalojo LRU por bytes.
+
+    Los DataFrames se entregan como copias superficiales: comparten los datos
+    con la entrada en caché, pero agregar o quitar columnas en una sesión no
+    afecta a las demás. Modificar valores en el lugar sí lo haría, por eso no
+    se debe hacer sobre resultados de la caché.
+    """
+
+    def query(self, kind: str, compute: Callable[[], Any], truck=None, metric=None, start=None, end=None,
+              resolution=None, ttl: Optional[float] = None, **extra) -> Any:
+        key = query_key(kind, truck, metric, start, end, resolution, **extra)
+        value = self.get_or_load(key, compute, ttl=ttl)
+        if isinstance(value, (pd.DataFrame, pd.Series)):
+            return value.copy(deep=False)
+        return value
@@ -12,7 +12,6 @@
 # Configuración de modelos
 with st.expander("Parámetros Avanzados"):
     st.checkbox("Usar GPU para inferencia", value=False)
-    st.slider("Frecuencia de actualización (min)", 1, 60, 15)
 
 if st.button("Guardar Cambios"):
     st.success("Configuraciones actualizadas correctamente")
\ No newline at end of file
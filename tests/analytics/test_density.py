@@ -0,0 +1,51 @@
+import unittest
+
+import numpy as np
+
+from analytics.eda.density import bin_2d, bin_geo, shade
+
+
+class TestDensity(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.rpm = np.r_[rng.normal(1500, 100, 200_000), np.full(7, 2400.0)]  # régimen raro
+        self.speed = np.r_[rng.normal(25, 5, 200_000), np.full(7, 5.0)]
+
+    def test_counts_every_point_and_matches_histogram2d(self):
+        grid = bin_2d(self.rpm, self.speed, width=120, height=80, values=self.speed)
+        self.assertEqual(grid.counts.sum(), len(self.rpm))
+        self.assertEqual(grid.counts.shape, (80, 120))
+
+        expected, _, _ = np.histogram2d(self.speed, self.rpm, bins=[grid.y_edges, grid.x_edges])
+        np.testing.assert_array_equal(grid.counts, expected)
+
+        # El régimen de 7 registros sigue visible (sin muestreo)
+        ix = np.searchsorted(grid.x_edges, 2400.0, side='right') - 1
+        iy = np.searchsorted(grid.y_edges, 5.0, side='right') - 1
+        self.assertEqual(grid.counts[iy, min(ix, 119)], 7)
+        self.assertAlmostEqual(grid.values[iy, min(ix, 119)], 5.0)
+
+    def test_fixed_ranges_and_nan(self):
+        grid = bin_2d([0, 1, np.nan, 5], [0, 1, 1, 1], width=2, height=2, x_range=(0, 2), y_range=(0, 2))
+        self.assertEqual(grid.counts.sum(), 2)
+        self.assertEqual(bin_2d([], [], 4, 3).counts.shape, (3, 4))
+
+    def test_geo_grid_is_square_in_meters(self):
+        lat = np.array([-22.30, -22.29, 0.0])
+        lon = np.array([-68.90, -68.88, 0.0])
+        grid = bin_geo(lat, lon, width=200)
+        self.assertEqual(grid.counts.sum(), 2)
+        expected_h = round(200 * 0.01 / (0.02 * np.cos(np.radians(-22.295))))
+        self.assertEqual(grid.counts.shape, (expected_h, 200))
+
+    def test_shade_eq_hist(self):
+        grid = bin_2d(self.rpm, self.speed, width=50, height=40)
+        image = shade(grid.counts, how='eq_hist')
+        self.assertEqual(image.shape, (40, 50, 4))
+        np.testing.assert_array_equal(image[..., 3] > 0, grid.counts > 0)
+        with self.assertRaises(ValueError):
+            shade(grid.counts, how='cubic')
+
+
+if __name__ == '__main__':
+    unittest.main()
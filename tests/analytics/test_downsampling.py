@@ -0,0 +1,80 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from analytics.eda.downsampling import (
+    downsample_frame, downsample_indices, downsampled_line_figure, lttb_indices, minmax_indices, points_for_width,
+)
+
+
+def reference_lttb(x, y, n_out):
+    """LTTB punto a punto (implementación de referencia del algoritmo original)."""
+    n = len(x)
+    every = (n - 2) / (n_out - 2)
+    # Bordes de bloque; el último se fija en n - 1 para no perder puntos por redondeo
+    bounds = [int(np.floor(j * every)) + 1 for j in range(n_out - 2)] + [n - 1]
+    a, out = 0, [0]
+    for i in range(n_out - 2):
+        start, stop = bounds[i], bounds[i + 1]
+        if i == n_out - 3:
+            avg_x, avg_y = x[-1], y[-1]
+        else:
+            avg_x, avg_y = x[stop:bounds[i + 2]].mean(), y[stop:bounds[i + 2]].mean()
+        area = np.abs((x[a] - avg_x) * (y[start:stop] - y[a]) - (x[a] - x[start:stop]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        out.append(a)
+    return np.array(out + [n - 1])
+
+
+class TestDownsampling(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.n = 200_000
+        self.x = pd.date_range('2024-03-01', periods=self.n, freq='s').to_numpy()
+        self.y = np.cumsum(rng.normal(size=self.n))
+        self.y[123_456] = 1e3        # pico aislado que no debe perderse
+
+    def test_lttb_matches_reference(self):
+        x = np.arange(5003, dtype=float)
+        y = self.y[:5003]
+        np.testing.assert_array_equal(lttb_indices(x, y, 257), reference_lttb(x, y, 257))
+
+    def test_methods_keep_size_order_and_peaks(self):
+        for method in ('lttb', 'minmax', 'minmax_lttb'):
+            idx = downsample_indices(self.x, self.y, 1000, method)
+            self.assertLessEqual(len(idx), 1000)
+            self.assertTrue(np.all(np.diff(idx) > 0))
+            self.assertIn(123_456, idx)
+            if method != 'minmax':
+                self.assertEqual((idx[0], idx[-1]), (0, self.n - 1))
+
+    def test_minmax_keeps_extremes(self):
+        idx = minmax_indices(self.y, 50)
+        self.assertIn(int(np.argmin(self.y)), idx)
+        self.assertIn(int(np.argmax(self.y)), idx)
+
+    def test_short_series_and_nan(self):
+        y = np.array([1.0, np.nan, 3.0, 4.0])
+        np.testing.assert_array_equal(downsample_indices(np.arange(4), y, 10), [0, 2, 3])
+        with self.assertRaises(ValueError):
+            downsample_indices(self.x, self.y, 100, method='random')
+
+    def test_zoom_requeries_window(self):
+        df = pd.DataFrame({'t': self.x, 'v': self.y})
+        full = downsample_frame(df, 't', 'v', 500)
+        window = (pd.Timestamp('2024-03-01 10:00'), pd.Timestamp('2024-03-01 10:05'))
+        zoomed = downsample_frame(df, 't', 'v', 500, x_range=window)
+        self.assertEqual(len(zoomed), 301)        # 5 minutos a 1 Hz caben completos
+        self.assertTrue(zoomed['t'].between(*window).all())
+        self.assertLess(full['t'].between(*window).sum(), 10)
+
+    def test_figure_and_width(self):
+        df = pd.DataFrame({'t': self.x, 'a': self.y, 'b': -self.y})
+        fig = downsampled_line_figure(df, 't', ['a', 'b'], n_out=points_for_width(400))
+        self.assertEqual(len(fig.data), 2)
+        self.assertTrue(all(len(trace.x) <= 800 for trace in fig.data))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import contextlib
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from analytics.eda.__main__ import main
+from analytics.eda.fleet import ProcessedDataCache
+from tests.analytics.test_fleet_eda import make_truck
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+# Presupuesto de importación en frío (pandas incluido, sin backends de gráficos)
+IMPORT_BUDGET_S = 2.0
+HEAVY_MODULES = ['matplotlib', 'seaborn', 'plotly', 'ipywidgets']
+
+
+def import_probe(module):
+    code = (
+        "import json, sys, time\n"
+        "start = time.perf_counter()\n"
+        f"import {module}\n"
+        "elapsed = time.perf_counter() - start\n"
+        f"print(json.dumps({{'elapsed': elapsed, 'loaded': [m for m in {HEAVY_MODULES + ['pandas']!r} "
+        "if m in sys.modules]}))\n"
+    )
+    env = dict(os.environ, PYTHONPATH=REPO_ROOT)
+    out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, env=env, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+class TestEDAImport(unittest.TestCase):
+    def test_module_import_is_light(self):
+        probe = import_probe('analytics.eda.eda')
+        self.assertEqual([m for m in probe['loaded'] if m != 'pandas'], [])
+        self.assertLess(probe['elapsed'], IMPORT_BUDGET_S)
+
+    def test_package_import_is_lazy(self):
+        self.assertEqual(import_probe('analytics.eda')['loaded'], [])
+
+
+class TestHeadlessCLI(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache_root = os.path.join(self.tmp.name, 'processed')
+        ProcessedDataCache(self.cache_root).put('T-1', make_truck('T-1'))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_writes_only_requested_sections(self):
+        out = os.path.join(self.tmp.name, 'reports')
+        with contextlib.redirect_stdout(io.StringIO()):
+            code = main(['T-1', '--cache-root', self.cache_root, '--output-dir', out,
+                         '--sections', 'quality', 'spatial', '--workers', '1'])
+        self.assertEqual(code, 0)
+        files = set(os.listdir(os.path.join(out, 'T-1')))
+        self.assertIn('missing_profile_sensor.csv', files)
+        self.assertIn('trajectories_map.html', files)
+        self.assertNotIn('correlation_matrix.png', files)
+        self.assertNotIn('performance_distributions.png', files)
+
+    def test_missing_truck_fails(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            code = main(['T-9', '--cache-root', self.cache_root, '--output-dir', self.tmp.name])
+        self.assertEqual(code, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
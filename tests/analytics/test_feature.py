@@ -0,0 +1,36 @@
+import contextlib
+import io
+import unittest
+
+import pandas as pd
+
+from analytics.feature_engineering.benchmark_feature import make_dataset
+from analytics.feature_engineering.feature import (
+    prepare_visualization_data,
+    prepare_visualization_data_fast,
+)
+
+
+class TestPrepareVisualizationData(unittest.TestCase):
+    def test_fast_version_matches_original(self):
+        df = make_dataset(5_000, trucks=3)
+        with contextlib.redirect_stdout(io.StringIO()):
+            expected = prepare_visualization_data(df.copy())
+            result = prepare_visualization_data_fast(df.copy())
+
+        pd.testing.assert_frame_equal(expected, result, check_exact=False)
+        self.assertEqual(list(result.columns[:3]), ['truck', 'metric', 'timestamp'])
+        self.assertEqual(str(result['timestamp'].dt.tz), 'America/Santiago')
+
+    def test_irregular_timestamps(self):
+        df = make_dataset(3_000, trucks=2)
+        df['created_at_local'] += pd.to_timedelta(df.index % 7, unit='s')
+        with contextlib.redirect_stdout(io.StringIO()):
+            expected = prepare_visualization_data(df.copy())
+            result = prepare_visualization_data_fast(df.copy(), verbose=False)
+
+        pd.testing.assert_frame_equal(expected, result, check_exact=False)
+
+
+if __name__ == '__main__':
+    unittest.main()
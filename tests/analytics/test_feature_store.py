@@ -0,0 +1,124 @@
+import contextlib
+import io
+import tempfile
+import unittest
+
+import pandas as pd
+
+from analytics.feature_engineering.benchmark_feature import make_dataset
+from analytics.feature_engineering.feature import prepare_visualization_data_fast
+from analytics.feature_engineering.feature_store import (
+    VISUALIZATION_FEATURES,
+    FeatureDefinition,
+    LocalFeatureStore,
+)
+from analytics.feature_engineering.preprocessing_artifacts import fit_visualization_artifacts
+
+
+def hourly_mean(raw):
+    return (
+        raw.assign(timestamp=raw['created_at_local'].dt.floor('h'))
+        .groupby('timestamp', as_index=False)['value'].mean()
+    )
+
+
+class TestLocalFeatureStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = LocalFeatureStore(self.tmp.name, window='D')
+        self.raw = pd.DataFrame({
+            'created_at_local': pd.date_range('2024-01-01', periods=72, freq='h', tz='UTC').repeat(2),
+            'truck': ['T-210', 'T-211'] * 72,
+            'value': [float(i) for i in range(144)],
+        })
+        self.store.register(FeatureDefinition('hourly', '1', hourly_mean, availability_lag='1h'))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def materialize(self, name, raw):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return self.store.materialize(name, raw)
+
+    def test_only_changed_windows_are_recomputed(self):
+        first = self.materialize('hourly', self.raw)
+        self.assertEqual(len(first['written']), 6)  # 2 camiones x 3 días
+
+        again = self.materialize('hourly', self.raw.sample(frac=1.0, random_state=0))
+        self.assertEqual(again, {'written': [], 'skipped': 6})
+
+        changed = self.raw.copy()
+        changed.loc[changed['created_at_local'] == '2024-01-02 05:00+00:00', 'value'] = -1.0
+        third = self.materialize('hourly', changed)
+        self.assertEqual(sorted(third['written']), ['T-210/2024-01-02T00-00', 'T-211/2024-01-02T00-00'])
+
+        features = self.store.read('hourly', trucks=['T-210'], start='2024-01-02', end='2024-01-02 23:00')
+        self.assertEqual(len(features), 24)
+        self.assertEqual(features.loc[features['timestamp'].dt.hour == 5, 'value'].item(), -1.0)
+
+    def test_versions_are_isolated(self):
+        self.materialize('hourly', self.raw)
+        self.store.register(FeatureDefinition('hourly', '2', lambda raw: hourly_mean(raw).assign(value=0.0)))
+        self.assertEqual(len(self.materialize('hourly', self.raw)['written']), 6)
+
+        self.assertTrue((self.store.read('hourly')['value'] == 0).all())
+        self.assertFalse((self.store.read('hourly', version='1')['value'] == 0).all())
+
+    def test_point_in_time_join_never_reads_the_future(self):
+        self.materialize('hourly', self.raw)
+        entities = pd.DataFrame({
+            'truck': ['T-210', 'T-211', 'T-210'],
+            'timestamp': pd.to_datetime(['2024-01-01 00:30', '2024-01-01 02:00', '2024-01-03 23:59'], utc=True),
+        })
+        result = self.store.get_historical_features('hourly', entities)
+
+        # La fila horaria solo está disponible al cerrar su hora (availability_lag='1h')
+        self.assertTrue(pd.isna(result.loc[0, 'value']))
+        self.assertEqual(result.loc[1, 'value'], 3.0)  # hora 01:00 de T-211
+        self.assertEqual(result.loc[2, 'value'], 140.0)  # hora 22:00 de T-210
+        self.assertEqual(list(result.index), [0, 1, 2])
+
+    def test_visualization_features_match_direct_computation(self):
+        raw = make_dataset(4 * 3600, trucks=2)  # 4 horas, cada segundo
+        store = LocalFeatureStore(f"{self.tmp.name}/hourly_store", window='h',
+                                  artifacts_root=f"{self.tmp.name}/artifacts")
+        store.register(VISUALIZATION_FEATURES)
+        with contextlib.redirect_stdout(io.StringIO()):
+            artifacts = fit_visualization_artifacts(prepare_visualization_data_fast(raw, verbose=False))
+            store.registry.save('visualization', artifacts)
+            first = store.materialize('visualization', raw)
+        self.assertEqual(len(first['written']), 8)  # 2 camiones x 4 horas
+
+        # Cada ventana con los bins/σ guardados y su lookback reproduce el cálculo completo
+        stored = store.read('visualization').sort_values(['truck', 'metric', 'timestamp'])
+        expected = (prepare_visualization_data_fast(raw, verbose=False, artifacts=artifacts)
+                    .sort_values(['truck', 'metric', 'timestamp']))
+        pd.testing.assert_frame_equal(stored.reset_index(drop=True), expected.reset_index(drop=True),
+                                      check_dtype=False, check_categorical=False)
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertEqual(store.materialize('visualization', raw)['written'], [])
+
+            # Un cambio en la primera hora invalida esa ventana y la siguiente (por su lookback)
+            changed = raw.copy()
+            first_row = changed['created_at_local'].idxmin()
+            changed.loc[first_row, 'value'] += 1.0
+            truck = changed.loc[first_row, 'truck']
+            self.assertEqual(sorted(store.materialize('visualization', changed)['written']),
+                             [f"{truck}/2024-01-01T00-00", f"{truck}/2024-01-01T01-00"])
+
+            # Solo datos nuevos: los bins no se reajustan sobre el subconjunto
+            recent = changed[changed['created_at_local'] >= '2024-01-01 02:00+00:00']
+            self.assertEqual(len(store.materialize('visualization', recent, force=True)['written']), 4)
+        keys = ['truck', 'metric', 'timestamp']
+        pd.testing.assert_series_equal(
+            store.read('visualization').set_index(keys)['speed_category'].sort_index(),
+            expected.set_index(keys)['speed_category'].sort_index())
+
+        # Una versión nueva de los artefactos invalida todas las ventanas
+        with contextlib.redirect_stdout(io.StringIO()):
+            store.registry.save('visualization', fit_visualization_artifacts(expected, n_bins=4))
+            self.assertEqual(len(store.materialize('visualization', changed)['written']), 8)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from analytics.eda.fleet import ProcessedDataCache, compare_fleet, run_fleet_eda, truck_summary
+
+BURN = {'T-1': 0.010, 'T-2': 0.020, 'T-3': 0.015}
+
+
+def make_truck(truck):
+    """Loader de prueba: sensor sintético con consumo constante distinto por camión."""
+    n = 720
+    rng = np.random.default_rng(len(truck) + int(truck[-1]))
+    times = pd.date_range('2024-03-01 08:00', periods=n, freq='10s')
+    sensor = pd.DataFrame({
+        'Equipment': truck,
+        'FullDateTime': times,
+        'ShiftDate': times.normalize(),
+        'Shift': 'A',
+        'FuelLevelLiters': 1000 - BURN[truck] * np.arange(n) * 10,
+        'Speed': np.abs(rng.normal(20 + int(truck[-1]), 5, n)),
+        'RPM': rng.normal(1500, 50, n),
+        'Latitude': -22.0 + rng.normal(0, 1e-3, n),
+        'Longitude': -68.0 + rng.normal(0, 1e-3, n),
+    })
+    return {'sensor': sensor, 'time_model': pd.DataFrame(), 'cycle': pd.DataFrame()}
+
+
+class TestFleetEDA(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self.tmp.name, 'processed')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_cache_uses_loader_once(self):
+        calls = []
+
+        def loader(truck):
+            calls.append(truck)
+            return make_truck(truck)
+
+        cache = ProcessedDataCache(self.root, loader)
+        first = cache.get('T-1')
+        second = cache.get('T-1')
+        self.assertEqual(calls, ['T-1'])
+        self.assertEqual(cache.trucks(), ['T-1'])
+        pd.testing.assert_frame_equal(first['sensor'], second['sensor'], check_dtype=False)
+        self.assertTrue(second['cycle'].empty)
+
+    def test_missing_truck_without_loader(self):
+        with self.assertRaises(FileNotFoundError):
+            ProcessedDataCache(self.root).get('T-9')
+
+    def test_summary_fuel_rate(self):
+        summary = truck_summary(make_truck('T-2'), 'T-2')
+        # 0.2 L cada 10 s -> 72 L/h (el suavizado recorta los bordes)
+        self.assertAlmostEqual(summary['fuel_l_per_hour'], 72.0, delta=0.5)
+        self.assertEqual(summary['duplicate_rate'], 0.0)
+        self.assertAlmostEqual(summary['quality_score'], 1.0)
+        self.assertLess(summary['speed_p50'], summary['speed_p90'])
+
+    def test_compare_ranks_and_common_bins(self):
+        result = compare_fleet([truck_summary(make_truck(t), t) for t in BURN])
+        table = result['summary']
+        self.assertEqual(table['rank_fuel_l_per_hour'].to_dict(), {'T-1': 1, 'T-2': 3, 'T-3': 2})
+        dist = result['speed_distribution']
+        self.assertEqual(list(dist.index), ['T-1', 'T-2', 'T-3'])
+        np.testing.assert_allclose(dist.sum(axis=1), 1.0)
+        fleet = pd.concat([make_truck(t)['sensor'] for t in BURN])
+        pd.testing.assert_frame_equal(result['correlation'], fleet[['Speed', 'RPM', 'FuelLevelLiters']].corr(),
+                                      atol=1e-9)
+
+    def test_run_fleet_eda_parallel(self):
+        out = os.path.join(self.tmp.name, 'fleet')
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = run_fleet_eda(list(BURN), loader=make_truck, cache_root=self.root, output_dir=out,
+                                   max_workers=2, render_reports=False)
+        self.assertEqual(sorted(result['summary'].index), sorted(BURN))
+        self.assertTrue(os.path.exists(os.path.join(out, 'fleet_summary.csv')))
+        self.assertEqual(ProcessedDataCache(self.root).trucks(), sorted(BURN))
+
+
+if __name__ == '__main__':
+    unittest.main()
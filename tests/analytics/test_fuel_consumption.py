@@ -0,0 +1,63 @@
+import unittest
+import numpy as np
+import pandas as pd
+
+from analytics.feature_engineering.fuel_consumption import FuelConsumptionEngine
+
+
+class TestFuelConsumptionEngine(unittest.TestCase):
+    def setUp(self):
+        # Camión que consume 1 L/min, recarga 500 L y sufre una caída brusca de 200 L
+        times = pd.date_range('2025-01-31 08:00', periods=120, freq='min')
+        level = 1500.0 - np.arange(120, dtype=float)
+        level[40:] += 500.0
+        level[80:] -= 200.0
+        self.sensor = pd.DataFrame({
+            'Equipment': 'T-210',
+            'ShiftDate': pd.Timestamp('2025-01-31'),
+            'Shift': np.where(np.arange(120) < 60, 'A', 'B'),
+            'FullDateTime': times,
+            'FuelLevelLiters': level,
+        })
+        self.engine = FuelConsumptionEngine(smoothing_window=3)
+
+    def test_detects_refuel_and_suspicious_drop(self):
+        intervals = self.engine.compute_intervals(self.sensor)
+
+        self.assertEqual(len(intervals), 119)
+        self.assertAlmostEqual(intervals['refuel_l'].sum(), 499.0, delta=3)
+        self.assertAlmostEqual(intervals['suspicious_drop_l'].sum(), 201.0, delta=3)
+        self.assertEqual(intervals['is_refuel'].sum(), 1)
+
+    def test_consumption_per_shift(self):
+        intervals = self.engine.compute_intervals(self.sensor)
+        shifts = self.engine.per_shift(intervals).set_index('Shift')
+
+        self.assertAlmostEqual(shifts['consumed_l'].sum(), 119.0, delta=6)
+        self.assertAlmostEqual(shifts.loc['A', 'liters_per_hour'], 60.0, delta=4)
+
+    def test_zero_readings_are_ignored(self):
+        sensor = self.sensor.copy()
+        sensor.loc[10, 'FuelLevelLiters'] = 0
+        intervals = self.engine.compute_intervals(sensor)
+
+        self.assertEqual(len(intervals), 118)
+        self.assertEqual(intervals['is_suspicious_drop'].sum(), 1)
+
+    def test_consumption_per_cycle(self):
+        intervals = self.engine.compute_intervals(self.sensor)
+        cycles = pd.DataFrame({
+            'Equipment': ['T-210', 'T-210'],
+            'E_TravelingStart': ['2025-01-31 08:00', '2025-01-31 08:20'],
+            'L_UnloadingEnd': ['2025-01-31 08:20', '2025-01-31 08:30'],
+            'MeasuredTonnage': [220.0, 0.0],
+        })
+        result = self.engine.per_cycle(intervals, cycles)
+
+        self.assertAlmostEqual(result.loc[0, 'consumed_l'], 20.0, delta=1)
+        self.assertAlmostEqual(result.loc[0, 'liters_per_ton'], result.loc[0, 'consumed_l'] / 220.0)
+        self.assertTrue(np.isnan(result.loc[1, 'liters_per_ton']))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from analytics.eda.missingness import duplicate_count, missingness_profile, time_bins
+
+
+class TestMissingness(unittest.TestCase):
+    def setUp(self):
+        n = 1_200
+        self.df = pd.DataFrame({
+            'ShiftDate': pd.Timestamp('2024-03-01') + pd.to_timedelta(np.arange(n) // 400, unit='D'),
+            'Shift': np.where(np.arange(n) % 400 < 200, 'A', 'B'),
+            'FullDateTime': pd.date_range('2024-03-01', periods=n, freq='min'),
+            'Speed': np.arange(n, dtype=float),
+            'RPM': np.arange(n, dtype=float),
+        })
+        self.df.loc[self.df.index < 100, 'Speed'] = np.nan  # mitad del primer turno
+        self.df.loc[self.df.index >= 1000, 'RPM'] = np.nan  # último turno completo
+
+    def test_profile_by_shift(self):
+        profile = missingness_profile(self.df)
+        self.assertEqual(list(profile.index), ['2024-03-01 A', '2024-03-01 B', '2024-03-02 A',
+                                               '2024-03-02 B', '2024-03-03 A', '2024-03-03 B'])
+        self.assertEqual(profile['n_rows'].sum(), len(self.df))
+        self.assertAlmostEqual(profile.loc['2024-03-01 A', 'Speed'], 0.5)
+        self.assertEqual(profile.loc['2024-03-03 B', 'RPM'], 1.0)
+        self.assertEqual(profile['ShiftDate'].max(), 0.0)
+
+        overall = (profile.drop(columns='n_rows').mul(profile['n_rows'], axis=0).sum() / len(self.df))
+        pd.testing.assert_series_equal(overall, self.df.isnull().mean(), check_names=False)
+
+    def test_profile_by_frequency(self):
+        profile = missingness_profile(self.df.drop(columns=['Shift']), freq='h')
+        self.assertEqual(len(profile), 20)
+        self.assertEqual(profile.iloc[0]['Speed'], 1.0)
+        self.assertEqual(time_bins(self.df, freq='D').nunique(), 1)
+
+    def test_duplicate_count_matches_pandas(self):
+        df = pd.concat([self.df, self.df.iloc[:37]], ignore_index=True)
+        self.assertEqual(duplicate_count(df), df.duplicated().sum())
+        self.assertEqual(duplicate_count(df, subset=['Shift']), len(df) - 2)
+        self.assertEqual(duplicate_count(df.iloc[:0]), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
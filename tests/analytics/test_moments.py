@@ -0,0 +1,68 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from analytics.aggregation.moments import MomentAccumulator, build_moments
+
+
+class TestMomentAccumulator(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        n = 20_000
+        speed = rng.gamma(3.0, 6.0, n)
+        self.df = pd.DataFrame({
+            'truck': rng.choice(['T-1', 'T-2', 'T-3'], n),
+            'Speed': speed,
+            # Valores grandes y casi constantes: prueban la estabilidad numérica
+            'Odometer': 1e9 + np.cumsum(speed) + rng.normal(0, 1, n),
+            'RPM': 900 + 40 * speed + rng.normal(0, 100, n),
+        })
+        self.df.loc[rng.random(n) < 0.1, 'RPM'] = np.nan
+        self.columns = ['Speed', 'Odometer', 'RPM']
+        self.bins = {'Speed': np.linspace(0, 100, 201)}
+
+    def test_partitions_merge_to_full_frame_stats(self):
+        parts = build_moments(self.df, self.columns, by=['truck'], bins=self.bins)
+        merged = MomentAccumulator.merged(parts.values())
+        expected = self.df[self.columns]
+
+        pd.testing.assert_frame_equal(merged.corr(), expected.corr(), atol=1e-9)
+        pd.testing.assert_series_equal(merged.count, expected.count().astype(float), check_names=False)
+        np.testing.assert_allclose(merged.means(), expected.mean(), rtol=1e-12)
+        np.testing.assert_allclose(merged.std(), expected.std(), rtol=1e-9)
+        self.assertEqual(merged.min[0], expected['Speed'].min())
+
+    def test_chunked_update_matches_single_pass(self):
+        single = MomentAccumulator(self.columns).update(self.df)
+        chunked = MomentAccumulator(self.columns).update(self.df, chunk_size=777)
+        pd.testing.assert_frame_equal(single.cov(), chunked.cov(), rtol=1e-9)
+
+    def test_histogram_quantiles_and_describe(self):
+        acc = MomentAccumulator(self.columns, self.bins).update(self.df)
+        counts, edges = acc.histogram('Speed')
+        self.assertEqual(counts.sum(), (self.df['Speed'] <= 100).sum())
+        median = float(acc.quantile('Speed', 0.5))
+        self.assertAlmostEqual(median, self.df['Speed'].median(), delta=0.5)
+        summary = acc.describe()
+        self.assertEqual(list(summary.index), ['count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max'])
+        self.assertTrue(np.isnan(summary.loc['50%', 'RPM']))
+
+    def test_zscore_bounds(self):
+        acc = MomentAccumulator(['Speed']).update(self.df)
+        bounds = acc.zscore_bounds(3.0).loc['Speed']
+        mean, std = self.df['Speed'].mean(), self.df['Speed'].std()
+        self.assertAlmostEqual(bounds['upper'], mean + 3 * std, places=9)
+
+    def test_round_trip_and_incompatible_merge(self):
+        acc = MomentAccumulator(self.columns, self.bins).update(self.df)
+        restored = MomentAccumulator.from_dict(acc.to_dict())
+        pd.testing.assert_frame_equal(restored.corr(), acc.corr())
+        with self.assertRaises(ValueError):
+            acc.merge(MomentAccumulator(['Speed']))
+        with self.assertRaises(KeyError):
+            MomentAccumulator(['Speed']).update(self.df[['RPM']])
+
+
+if __name__ == '__main__':
+    unittest.main()
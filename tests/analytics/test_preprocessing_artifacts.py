@@ -0,0 +1,71 @@
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import KBinsDiscretizer
+
+from analytics.feature_engineering.benchmark_feature import make_dataset
+from analytics.feature_engineering.feature import prepare_visualization_data_fast
+from analytics.feature_engineering.preprocessing_artifacts import (
+    ArtifactRegistry,
+    QuantileBinner,
+    fit_visualization_artifacts,
+)
+
+
+class TestQuantileBinner(unittest.TestCase):
+    def test_matches_kbins_discretizer(self):
+        values = np.random.default_rng(0).gamma(4.0, 5.0, 10_000)
+        values[:50] = 0.0  # bordes repetidos
+        expected = KBinsDiscretizer(n_bins=5, encode='ordinal', strategy='quantile').fit_transform(values[:, None])
+
+        binner = QuantileBinner(5).fit(values)
+        np.testing.assert_array_equal(binner.transform(values), expected.ravel().astype(int))
+        self.assertEqual(binner.transform([np.nan]).tolist(), [-1])
+
+    def test_unfitted_transform_raises(self):
+        with self.assertRaises(ValueError):
+            QuantileBinner(5).transform([1.0])
+
+
+class TestArtifactRegistry(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.registry = ArtifactRegistry(self.tmp.name)
+        training = prepare_visualization_data_fast(make_dataset(6_000, trucks=3, seed=1), verbose=False)
+        self.artifacts = fit_visualization_artifacts(training)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_roundtrip_and_stable_versions(self):
+        version = self.registry.save('visualization', self.artifacts)
+        self.assertEqual(self.registry.save('visualization', self.artifacts), version)
+        self.assertEqual(self.registry.versions('visualization'), [version])
+
+        loaded = self.registry.load('visualization')
+        self.assertEqual(loaded.version, version)
+        np.testing.assert_array_equal(loaded['speed_category'].edges, self.artifacts['speed_category'].edges)
+        self.assertEqual(loaded.metadata['n_samples'], self.artifacts.metadata['n_samples'])
+
+        with self.assertRaises(FileNotFoundError):
+            self.registry.load('otro')
+
+    def test_transform_only_scoring_is_stable_across_batches(self):
+        self.registry.save('visualization', self.artifacts)
+        artifacts = self.registry.load('visualization')
+        batch = make_dataset(3_000, trucks=2, seed=2)
+
+        full = prepare_visualization_data_fast(batch, verbose=False, artifacts=artifacts)
+        part = prepare_visualization_data_fast(batch[batch['truck'] == 'T-200'], verbose=False, artifacts=artifacts)
+        merged = full[full['truck'] == 'T-200'].reset_index(drop=True)
+        pd.testing.assert_series_equal(merged['speed_category'], part['speed_category'], check_dtype=False)
+
+        binner = artifacts['speed_category']
+        expected = np.asarray(binner.labels, dtype=object)[binner.transform(full['speed_mean'])]
+        self.assertEqual(full['speed_category'].tolist(), expected.tolist())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from analytics.aggregation.quantile_sketch import SketchStore, TDigest
+from analytics.eda.eda import AdvancedEDA
+from analytics.feature_engineering.benchmark_feature import make_dataset
+
+QS = [0.01, 0.25, 0.5, 0.95, 0.99]
+
+
+def rank_error(values, estimates, qs):
+    return np.max(np.abs([(values <= e).mean() - q for e, q in zip(estimates, qs)]))
+
+
+class TestTDigest(unittest.TestCase):
+    def setUp(self):
+        self.values = np.random.default_rng(0).gamma(2.0, 10.0, 200_000)
+
+    def test_quantiles_are_accurate_and_bounded(self):
+        digest = TDigest().update(self.values)
+        self.assertLessEqual(len(digest), 200)
+        self.assertLess(rank_error(self.values, digest.quantile(QS), QS), 0.002)
+        self.assertEqual(digest.quantile(0.0), self.values.min())
+        self.assertEqual(digest.quantile(1.0), self.values.max())
+        self.assertEqual(digest.count, len(self.values))
+
+    def test_merging_partitions_matches_single_pass(self):
+        parts = [TDigest().update(chunk) for chunk in np.array_split(self.values, 300)]
+        merged = TDigest.merged(parts)
+        self.assertEqual(merged.count, len(self.values))
+        self.assertLess(rank_error(self.values, merged.quantile(QS), QS), 0.002)
+
+    def test_serialization_roundtrip_and_nan(self):
+        digest = TDigest(100).update(np.r_[self.values[:1000], np.nan])
+        copy = TDigest.from_dict(digest.to_dict())
+        np.testing.assert_allclose(copy.quantile(QS), digest.quantile(QS))
+        self.assertTrue(np.isnan(TDigest().quantile(0.5)))
+
+
+class TestSketchStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = SketchStore(self.tmp.name, window='h')
+        self.df = make_dataset(20_000, trucks=4)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_fleet_and_range_percentiles_from_sketches(self):
+        self.store.write(self.df)
+
+        fleet = self.store.quantiles([0.5, 0.95], group_by='metric')
+        for metric, row in fleet.iterrows():
+            values = self.df.loc[self.df['metric'] == metric, 'value'].to_numpy()
+            self.assertEqual(row['count'], len(values))
+            self.assertLess(rank_error(values, row[['p50', 'p95']], [0.5, 0.95]), 0.01)
+
+        start, end = pd.Timestamp('2024-01-01 02:00', tz='UTC'), pd.Timestamp('2024-01-01 03:59:59', tz='UTC')
+        digest = self.store.query('speed', trucks=['T-200', 'T-201'], start=start, end=end)
+        mask = self.df['truck'].isin(['T-200', 'T-201']) & self.df['created_at_local'].between(start, end)
+        self.assertEqual(digest.count, mask.sum())
+
+    def test_append_merges_with_existing_partition(self):
+        first, second = self.df.iloc[:10_000], self.df.iloc[10_000:]
+        self.store.write(first)
+        self.store.write(second, append=True)
+
+        digests = self.store.query('value', group_by='truck', where={'metric': 'fuel'})
+        counts = self.df[self.df['metric'] == 'fuel'].groupby('truck').size()
+        self.assertEqual({k: d.count for k, d in digests.items()}, counts.astype(float).to_dict())
+
+    def test_eda_quartiles_are_scoped_to_the_frame(self):
+        self.store.write(self.df)
+        one_truck = self.df[self.df['truck'] == 'T-200']
+
+        quartiles = AdvancedEDA(one_truck, sketches=self.store)._sketch_quartiles('value')
+        self.assertIsNotNone(quartiles)
+        self.assertLess(rank_error(one_truck['value'].to_numpy(), quartiles, [0.25, 0.75]), 0.01)
+
+        # Ventana parcial: los sketches resumen más filas que el frame
+        partial = one_truck[one_truck['created_at_local'].dt.minute < 30]
+        self.assertIsNone(AdvancedEDA(partial, sketches=self.store)._sketch_quartiles('value'))
+
+
+if __name__ == '__main__':
+    unittest.main()
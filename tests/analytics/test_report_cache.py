@@ -0,0 +1,70 @@
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from analytics.eda.report_cache import ReportCache, ReportSection, frame_fingerprint, section_key
+
+
+def write_summary(df, path):
+    df.describe().to_csv(path)
+
+
+def fail(*_):
+    raise RuntimeError("boom")
+
+
+class TestReportCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = self.tmp.name
+        rng = np.random.default_rng(0)
+        self.data = {
+            'speed': pd.DataFrame({'Speed': rng.normal(20, 5, 1000)}),
+            'rpm': pd.DataFrame({'RPM': rng.normal(1500, 50, 1000)}),
+        }
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def sections(self, params=None):
+        return [
+            ReportSection(name, write_summary, (df, os.path.join(self.dir, f'{name}.csv')),
+                          section_key({name: df}, params), [f'{name}.csv'])
+            for name, df in self.data.items()
+        ]
+
+    def run_cache(self, sections):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return ReportCache(self.dir).run(sections, max_workers=2)
+
+    def test_only_changed_sections_are_rendered(self):
+        self.assertEqual(self.run_cache(self.sections()), {'speed': 'rendered', 'rpm': 'rendered'})
+        self.assertEqual(self.run_cache(self.sections()), {'speed': 'cached', 'rpm': 'cached'})
+
+        self.data['rpm'].iloc[10, 0] = 0.0
+        self.assertEqual(self.run_cache(self.sections()), {'speed': 'cached', 'rpm': 'rendered'})
+
+        os.remove(os.path.join(self.dir, 'speed.csv'))
+        self.assertEqual(self.run_cache(self.sections()), {'speed': 'rendered', 'rpm': 'cached'})
+
+        self.assertEqual(self.run_cache(self.sections({'dpi': 150})), {'speed': 'rendered', 'rpm': 'rendered'})
+
+    def test_failed_section_is_not_cached(self):
+        broken = ReportSection('broken', fail, (), 'key', [])
+        self.assertEqual(self.run_cache([broken]), {'broken': 'error'})
+        self.assertNotIn('broken', ReportCache(self.dir).manifest)
+
+    def test_fingerprint_depends_on_content_and_schema(self):
+        df = self.data['speed']
+        self.assertEqual(frame_fingerprint(df), frame_fingerprint(df.copy()))
+        self.assertNotEqual(frame_fingerprint(df), frame_fingerprint(df.rename(columns={'Speed': 'Velocidad'})))
+        self.assertNotEqual(frame_fingerprint(df), frame_fingerprint(df.iloc[:-1]))
+
+
+if __name__ == '__main__':
+    unittest.main()
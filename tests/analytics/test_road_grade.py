@@ -0,0 +1,93 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from analytics.feature_engineering.road_grade import GRAVITY, RoadGradeEngine, compute_road_grade
+
+DEG_PER_M = 1 / 111_195.0
+
+
+def make_ramp(truck, start, direction=1, n=200, speed=10.0, grade=0.08, seed=0):
+    """Camión que recorre 2 km hacia el norte: 1 km de rampa y 1 km plano (o al revés)."""
+    rng = np.random.default_rng(seed)
+    distance = np.arange(n) * speed
+    elevation = np.minimum(distance, 1000.0) * grade
+    if direction < 0:
+        distance, elevation = distance[::-1], elevation[::-1]
+    return pd.DataFrame({
+        'Equipment': truck,
+        'FullDateTime': pd.date_range(start, periods=n, freq='1s'),
+        'Latitude': -22.3 + distance * DEG_PER_M,
+        'Longitude': -68.9,
+        'Elevation': 3000 + elevation + rng.normal(0, 0.3, n),
+    })
+
+
+class TestRoadGradeEngine(unittest.TestCase):
+    def setUp(self):
+        self.engine = RoadGradeEngine(window_m=60.0, empty_mass_t=150.0)
+        self.sensor = pd.concat([
+            make_ramp('T-210', '2024-03-01 08:00'),
+            make_ramp('T-211', '2024-03-01 08:00', direction=-1, seed=1),
+        ], ignore_index=True)
+
+    def test_profile_distance_and_grade(self):
+        profile = self.engine.compute_profile(self.sensor)
+        for truck, group in profile.groupby('Equipment'):
+            self.assertAlmostEqual(group['along_track_m'].iloc[-1], 1990.0, delta=1.0)
+            self.assertEqual(group['along_track_m'].iloc[0], 0.0)
+
+        up = profile[profile['Equipment'] == 'T-210']
+        ramp = up[(up['along_track_m'] > 100) & (up['along_track_m'] < 900)]
+        flat = up[up['along_track_m'] > 1100]
+        self.assertAlmostEqual(ramp['grade'].median(), 0.08, delta=0.01)
+        self.assertAlmostEqual(flat['grade'].median(), 0.0, delta=0.01)
+        self.assertAlmostEqual(up['climb_m'].sum() - up['descent_m'].sum(), 80.0, delta=2.0)
+
+        down = profile[profile['Equipment'] == 'T-211']
+        self.assertAlmostEqual(down['descent_m'].sum() - down['climb_m'].sum(), 80.0, delta=2.0)
+
+    def test_cycle_phases_and_loaded_work(self):
+        cycle = pd.DataFrame({
+            'Equipment': ['T-210', 'T-211'],
+            'E_TravelingStart': pd.to_datetime(['2024-03-01 07:00', '2024-03-01 08:00']),
+            'E_TravelingEnd': pd.to_datetime(['2024-03-01 07:30', '2024-03-01 08:10']),
+            'L_HaulingStart': pd.to_datetime(['2024-03-01 08:00', '2024-03-01 09:00']),
+            'L_HaulingEnd': pd.to_datetime(['2024-03-01 08:10', '2024-03-01 09:10']),
+            'MeasuredTonnage': [220.0, 210.0],
+            'G_Elevation': [3000.0, 3080.0],
+            'D_Elevation': [3080.0, 3000.0],
+        })
+        result = compute_road_grade(self.sensor, cycle, window_m=60.0, empty_mass_t=150.0)['cycle']
+
+        loaded = result.iloc[0]
+        self.assertAlmostEqual(loaded['loaded_distance_m'], 1990.0, delta=1.0)
+        self.assertAlmostEqual(loaded['loaded_mean_grade'], 0.04, delta=0.005)
+        expected_mj = (150 + 220) * 1000 * GRAVITY * loaded['loaded_climb_m'] / 1e6
+        self.assertAlmostEqual(loaded['loaded_uphill_work_mj'], expected_mj)
+        self.assertGreater(loaded['loaded_uphill_work_mj'], 280)
+        self.assertEqual(loaded['net_lift_m'], 80.0)
+
+        empty = result.iloc[1]
+        self.assertAlmostEqual(empty['empty_descent_m'], 80.0, delta=5.0)
+        self.assertEqual(empty['loaded_uphill_work_mj'], 0.0)
+
+    def test_segments_are_shared_across_trucks_by_direction(self):
+        profile = self.engine.compute_profile(self.sensor)
+        segments = self.engine.per_segment(profile)
+        self.assertEqual(set(segments['heading_bin']), {0, 4})  # norte y sur
+
+        ramp = segments[(segments['elevation'] > 3020) & (segments['elevation'] < 3060)]
+        north = ramp[ramp['heading_bin'] == 0]['mean_grade']
+        south = ramp[ramp['heading_bin'] == 4]['mean_grade']
+        self.assertAlmostEqual(north.median(), 0.08, delta=0.01)
+        self.assertAlmostEqual(south.median(), -0.08, delta=0.01)
+
+    def test_missing_columns(self):
+        with self.assertRaises(KeyError):
+            self.engine.compute_profile(self.sensor.drop(columns=['Elevation']))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,152 @@
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from analytics.aggregation.rollups import MEASURES, RollupStore, daily_activity
+from analytics.eda.eda import TruckEDA
+from analytics.eda.report_cache import ReportCache
+
+
+def make_sensor(truck='T-1', n=2000, seed=0):
+    """Sensor sintético de dos días con ruido, una recarga, una caída rápida y un corte de señal."""
+    rng = np.random.default_rng(seed)
+    times = pd.date_range('2024-03-01 20:00', periods=n, freq='60s')
+    times = times.append(pd.DatetimeIndex([times[-1] + pd.Timedelta(hours=3)]))[1:]
+    level = 800 - 0.25 * np.arange(n) + rng.normal(0, 0.3, n)
+    level[700:] += 300           # recarga
+    level[1500:] -= 60           # caída sospechosa
+    level[50] = 0                # lectura inválida
+    speed = np.where(np.arange(n) % 7 < 2, 0.0, rng.uniform(5, 40, n))
+    shift_date = (times - pd.Timedelta(hours=8)).normalize()
+    return pd.DataFrame({
+        'Equipment': truck,
+        'FullDateTime': times,
+        'ShiftDate': shift_date,
+        'Shift': np.where((times.hour >= 8) & (times.hour < 20), 'A', 'B'),
+        'FuelLevelLiters': level,
+        'Speed': speed,
+        'RPM': np.where(np.arange(n) % 11 == 0, 0.0, 1400.0),
+    })
+
+
+def make_cycles(truck='T-1'):
+    end = pd.date_range('2024-03-01 21:00', periods=20, freq='90min')
+    return pd.DataFrame({'Equipment': truck, 'L_UnloadingEnd': end, 'MeasuredTonnage': 200.0 + np.arange(20),
+                         'ShiftDate': end.normalize(), 'Shift': 'A'})
+
+
+class TestRollupStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def store(self, name):
+        return RollupStore(f"{self.tmp.name}/{name}")
+
+    def test_incremental_equals_full_rebuild(self):
+        sensor, cycles = make_sensor(), make_cycles()
+        full = self.store('full')
+        full.rebuild(sensor, cycles)
+
+        incremental = self.store('inc')
+        bounds = [0, 3, 350, 701, 703, 1100, 1502, 1503, 1999, len(sensor)]
+        for lo, hi in zip(bounds[:-1], bounds[1:]):
+            incremental.update(sensor.iloc[lo:hi], cycles[cycles['L_UnloadingEnd'] < sensor['FullDateTime'].iloc[hi - 1]])
+        incremental.update(sensor.iloc[0:0], cycles)
+        incremental.flush()
+
+        for grain in ('hour', 'shift', 'day'):
+            pd.testing.assert_frame_equal(incremental.rollup('T-1', grain), full.rollup('T-1', grain),
+                                          check_exact=False, atol=1e-6)
+
+    def test_totals_match_consumption_engine(self):
+        from analytics.feature_engineering.fuel_consumption import FuelConsumptionEngine
+
+        sensor = make_sensor()
+        store = self.store('full')
+        store.rebuild(sensor, make_cycles())
+        day = store.rollup('T-1', 'day')
+        self.assertEqual(day['records'].sum(), len(sensor))
+        intervals = FuelConsumptionEngine(max_workers=1).compute_intervals(sensor)
+        self.assertAlmostEqual(day['fuel_consumed_l'].sum(), intervals['consumed_l'].sum(), places=6)
+        self.assertAlmostEqual(day['refuel_l'].sum(), intervals['refuel_l'].sum(), places=6)
+        self.assertEqual(day['refuel_events'].sum(), 1)
+        self.assertGreater(day['suspicious_drop_l'].sum(), 50)
+        self.assertEqual(day['cycles'].sum(), 20)
+        # El corte de 3 h no suma tiempo
+        self.assertLess(day['duration_s'].sum(), len(sensor) * 60)
+
+    def test_late_rows_are_ignored(self):
+        sensor = make_sensor(n=300)
+        store = self.store('inc')
+        with contextlib.redirect_stdout(io.StringIO()):
+            store.update(sensor)
+            stats = store.update(sensor.iloc[:10])
+        self.assertEqual(stats['T-1']['late'], 10)
+        self.assertEqual(store.rollup('T-1', 'hour')['records'].sum(), 300)
+
+    def test_kpis_and_query_range(self):
+        store = self.store('full')
+        store.rebuild(make_sensor(), make_cycles())
+        store.rebuild(make_sensor('T-2', seed=1), make_cycles('T-2'))
+        kpis = store.kpis(start='2024-03-02', end='2024-03-02')
+        self.assertEqual(list(kpis.index), ['T-1', 'T-2'])
+        hours = store.query('hour', ['T-1'], '2024-03-02', '2024-03-02')
+        self.assertTrue((hours['period'].dt.normalize() == pd.Timestamp('2024-03-02')).all())
+        self.assertAlmostEqual(kpis.loc['T-1', 'fuel_consumed_l'], hours['fuel_consumed_l'].sum())
+        self.assertTrue(set(MEASURES) <= set(kpis.columns))
+        fleet = store.kpis(by=None)
+        self.assertEqual(len(fleet), 1)
+        self.assertAlmostEqual(fleet['records'].iloc[0], 4000)
+        with self.assertRaises(ValueError):
+            store.rollup('T-1', 'week')
+
+    def test_kpis_without_rollups(self):
+        store = self.store('empty')
+        self.assertTrue(store.kpis(['T-9']).empty)
+        fleet = store.kpis(['T-9'], grain='shift', by=None)
+        self.assertEqual(len(fleet), 1)
+        self.assertEqual(fleet['fuel_consumed_l'].iloc[0], 0.0)
+        self.assertTrue(pd.isna(fleet['liters_per_hour'].iloc[0]))
+
+    def test_daily_activity_shape(self):
+        store = self.store('full')
+        sensor = make_sensor()
+        store.rebuild(sensor)
+        daily = daily_activity(store.rollup('T-1', 'day'))
+        self.assertEqual(list(daily.columns), ['año', 'mes', 'dia_mes', 'conteo'])
+        self.assertEqual(daily['conteo'].sum(), len(sensor))
+        self.assertEqual(set(daily['mes'].astype(str)), {'Marzo'})
+        by_shift = daily_activity(store.rollup('T-1', 'shift'))
+        expected = sensor.groupby(sensor['ShiftDate'].dt.day).size()
+        self.assertEqual(by_shift.set_index('dia_mes')['conteo'].to_dict(), expected.to_dict())
+
+    def test_truck_eda_parallel_sections_use_rollups(self):
+        store = self.store('full')
+        sensor = make_sensor()
+        store.rebuild(sensor)
+        with contextlib.redirect_stdout(io.StringIO()):
+            eda = TruckEDA({'sensor': sensor.assign(TimeStamp=sensor['FullDateTime'])}, 'T-1',
+                           output_dir=os.path.join(self.tmp.name, 'eda'), rollups=store)
+            status = ReportCache(eda.output_dir).run(eda.report_sections(['temporal']), max_workers=1)
+            self.assertEqual(status, {'temporal': 'rendered'})
+            self.assertTrue(os.path.exists(os.path.join(eda.output_dir, 'daily_activity.html')))
+
+            # Un rollup actualizado invalida la sección temporal en caché
+            key = eda.report_sections(['temporal'])[0].key
+            later = make_sensor(n=200, seed=1)
+            later[['FullDateTime', 'ShiftDate']] += pd.Timedelta(days=3)
+            store.update(later)
+            store.flush()
+            self.assertNotEqual(eda.report_sections(['temporal'])[0].key, key)
+
+
+if __name__ == '__main__':
+    unittest.main()
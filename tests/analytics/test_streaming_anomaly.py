@@ -0,0 +1,74 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from analytics.feature_engineering.streaming_anomaly import EVENT_COLUMNS, StreamingAnomalyDetector
+
+
+def make_sensor(n=600, seed=0):
+    rng = np.random.default_rng(seed)
+    frames = []
+    for truck, base_speed in [('T-210', 25.0), ('T-211', 12.0)]:
+        df = pd.DataFrame({
+            'Equipment': truck,
+            'FullDateTime': pd.date_range('2024-03-01 08:00', periods=n, freq='10s'),
+            'Speed': rng.normal(base_speed, 2.0, n),
+            'RPM': rng.normal(1500, 60, n),
+            'FuelLevelLiters': 3000 - np.arange(n) * 0.5 + rng.normal(0, 0.2, n),
+        })
+        frames.append(df)
+    sensor = pd.concat(frames, ignore_index=True)
+    # Anomalías inyectadas: exceso de velocidad en T-211 y caída brusca de combustible en T-210
+    sensor.loc[(sensor['Equipment'] == 'T-211') & (sensor.index % n == 400), 'Speed'] = 45.0
+    drop = (sensor['Equipment'] == 'T-210') & (sensor.index % n >= 300)
+    sensor.loc[drop, 'FuelLevelLiters'] -= 80.0
+    sensor.loc[(sensor['Equipment'] == 'T-210') & (sensor.index % n == 100), 'FuelLevelLiters'] = 0.0
+    return sensor
+
+
+class TestStreamingAnomalyDetector(unittest.TestCase):
+    def setUp(self):
+        self.sensor = make_sensor()
+
+    def test_detects_injected_events_per_truck(self):
+        events = StreamingAnomalyDetector().process_batch(self.sensor)
+        self.assertEqual(list(events.columns), EVENT_COLUMNS)
+
+        speed = events[(events['metric'] == 'Speed') & (events['kind'] == 'high')]
+        self.assertIn(('T-211', 45.0), set(zip(speed['Equipment'], speed['value'])))
+
+        drops = events[events['metric'] == 'FuelLevelLiters']
+        self.assertEqual(len(drops), 1)
+        self.assertEqual(drops['Equipment'].item(), 'T-210')
+        self.assertEqual(drops['kind'].item(), 'drop')
+        self.assertEqual(drops['time'].item(), pd.Timestamp('2024-03-01 08:50:00'))
+
+    def test_batch_and_record_at_a_time_agree(self):
+        batch = StreamingAnomalyDetector().process_batch(self.sensor)
+        stream = pd.DataFrame(StreamingAnomalyDetector().feed(self.sensor.sort_values('FullDateTime')),
+                              columns=EVENT_COLUMNS)
+        stream = stream.sort_values(['Equipment', 'time'], kind='stable').reset_index(drop=True)
+        pd.testing.assert_frame_equal(batch, stream, check_dtype=False)
+
+    def test_backfill_then_live_continues_state(self):
+        half = self.sensor.groupby('Equipment').cumcount() < 350
+        reference = StreamingAnomalyDetector()
+        reference.score_batch(self.sensor)
+
+        detector = StreamingAnomalyDetector()
+        detector.score_batch(self.sensor[half])
+        detector.feed(self.sensor[~half])
+        for key, state in reference.state.items():
+            np.testing.assert_allclose(detector.state[key], state, rtol=1e-9)
+
+    def test_update_is_constant_size_state(self):
+        detector = StreamingAnomalyDetector(metrics=['Speed'])
+        for i in range(100):
+            detector.update('T-210', i, {'Speed': 20.0 + (i % 3)})
+        self.assertEqual(list(detector.state), [('T-210', 'Speed')])
+        self.assertEqual(detector.state[('T-210', 'Speed')][0], 100)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,156 @@
+import asyncio
+import contextlib
+import io
+import tempfile
+import threading
+import unittest
+
+import pandas as pd
+import pyarrow as pa
+from fastapi.testclient import TestClient
+
+from analytics.aggregation.rollups import RollupStore
+from analytics.eda.fleet import ProcessedDataCache
+from backend.api.main import create_app
+from backend.api.services import Services
+from tests.analytics.test_fleet_eda import make_truck
+from tests.analytics.test_rollups import make_cycles, make_sensor
+
+
+class TestAPI(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        data_root, rollup_root = f"{cls.tmp.name}/processed", f"{cls.tmp.name}/rollups"
+        with contextlib.redirect_stdout(io.StringIO()):
+            ProcessedDataCache(data_root, make_truck).get('T-1')
+            store = RollupStore(rollup_root)
+            store.rebuild(make_sensor(), make_cycles())
+            store.rebuild(make_sensor('T-2', seed=1), make_cycles('T-2'))
+        cls.client = TestClient(create_app(data_root, rollup_root, max_threads=4, max_processes=1))
+        cls.client.__enter__()
+        cls.store = store
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.client.__exit__(None, None, None)
+        cls.tmp.cleanup()
+
+    def test_kpis_from_rollups_and_cached(self):
+        response = self.client.get('/kpis', params={'trucks': ['T-1', 'T-2'], 'start': '2024-03-02',
+                                                    'end': '2024-03-02', 'grain': 'day'})
+        self.assertEqual(response.status_code, 200)
+        rows = {r['Equipment']: r for r in response.json()}
+        expected = self.store.kpis(['T-1', 'T-2'], '2024-03-02', '2024-03-02', 'day')
+        self.assertAlmostEqual(rows['T-2']['fuel_consumed_l'], expected.loc['T-2', 'fuel_consumed_l'])
+        hits = self.client.get('/health').json()['cache']['hits']
+        self.client.get('/kpis', params={'trucks': ['T-1', 'T-2'], 'start': '2024-03-02',
+                                         'end': '2024-03-02', 'grain': 'day'})
+        self.assertEqual(self.client.get('/health').json()['cache']['hits'], hits + 1)
+
+        fleet = self.client.get('/kpis', params={'fleet': True}).json()
+        self.assertEqual(len(fleet), 1)
+        self.assertEqual(fleet[0]['records'], 4000)
+
+        unknown = self.client.get('/kpis', params={'trucks': ['T-9'], 'fleet': True})
+        self.assertEqual(unknown.status_code, 200)
+        self.assertEqual(unknown.json()[0]['fuel_consumed_l'], 0.0)
+
+    def test_sensor_stream_arrow_and_ndjson(self):
+        params = {'start': '2024-03-01', 'end': '2024-03-01', 'columns': ['FullDateTime', 'Speed']}
+        arrow = self.client.get('/trucks/T-1/sensor', params=params)
+        self.assertEqual(arrow.headers['content-type'], 'application/vnd.apache.arrow.stream')
+        table = pa.ipc.open_stream(arrow.content).read_all().to_pandas()
+        expected = make_truck('T-1')['sensor']
+        self.assertEqual(list(table.columns), ['FullDateTime', 'Speed'])
+        pd.testing.assert_series_equal(table['Speed'], expected['Speed'], check_names=False)
+
+        lines = self.client.get('/trucks/T-1/sensor', params={**params, 'format': 'ndjson'}).text.splitlines()
+        self.assertEqual(len(lines), len(expected))
+
+    def test_missing_truck_is_404(self):
+        response = self.client.get('/trucks/T-9/sensor', params={'start': '2024-03-01', 'end': '2024-03-01'})
+        self.assertEqual(response.status_code, 404)
+        invalid = self.client.get('/kpis', params={'start': '2024-03-02', 'end': '2024-03-01', 'grain': 'week'})
+        self.assertEqual(invalid.status_code, 422)
+
+    def test_predict(self):
+        body = {'truck': 'T-1', 'grain': 'hour', 'ridge': 0.1,
+                'scenarios': [{'tonnage_t': 200, 'distance_km': 10, 'idle_h': 0.2, 'moving_h': 0.7}]}
+        response = self.client.post('/predict', json=body)
+        self.assertEqual(response.status_code, 200, response.text)
+        result = response.json()
+        self.assertEqual(len(result['predictions_l']), 1)
+        self.assertGreater(result['model']['n_samples'], 5)
+
+    def test_optimize_estimates_rates_from_rollups(self):
+        body = {
+            'trucks': [{'truck': 'T-1', 'capacity_t': 200}, {'truck': 'T-2', 'capacity_t': 220, 'liters_per_km': 9.0}],
+            'routes': [{'route': 'Norte', 'distance_km': 5, 'target_t': 2000},
+                       {'route': 'Sur', 'distance_km': 3, 'target_t': 1000}],
+        }
+        response = self.client.post('/optimize', json=body)
+        self.assertEqual(response.status_code, 200, response.text)
+        result = response.json()
+        self.assertEqual(result['status'], 'Optimal')
+        tonnage = {r['route']: r['tonnage_t'] for r in result['routes']}
+        self.assertGreaterEqual(tonnage['Norte'], 2000)
+        self.assertGreaterEqual(tonnage['Sur'], 1000)
+        rollup = self.store.kpis(['T-1'], grain='day')
+        self.assertAlmostEqual(result['liters_per_km']['T-1'],
+                               rollup.loc['T-1', 'fuel_consumed_l'] / rollup.loc['T-1', 'distance_km'])
+
+        duplicated = {**body, 'trucks': body['trucks'] + [{'truck': 'T-2', 'capacity_t': 100, 'liters_per_km': 8.0}]}
+        response = self.client.post('/optimize', json=duplicated)
+        self.assertEqual(response.status_code, 422)
+        self.assertIn('T-2', response.text)
+
+        unknown = self.client.post('/optimize', json={**body, 'trucks': [{'truck': 'T-9', 'capacity_t': 100}]})
+        self.assertEqual(unknown.status_code, 422)
+
+
+class TestServicesCached(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.services = Services(self.tmp.name, self.tmp.name, max_threads=2)
+
+    def tearDown(self):
+        self.services.shutdown()
+        self.tmp.cleanup()
+
+    def test_concurrent_requests_share_one_computation(self):
+        calls, release = [], threading.Event()
+
+        def slow(x):
+            calls.append(x)
+            release.wait(5)
+            return x * 2
+
+        async def scenario():
+            requests = [asyncio.ensure_future(self.services.cached(('slow',), slow, 21)) for _ in range(5)]
+            await asyncio.sleep(0.05)
+            # Los que esperan lo hacen en el bucle de eventos: el segundo hilo sigue libre
+            free = await asyncio.wait_for(self.services.run(lambda: 'libre'), timeout=2)
+            release.set()
+            return free, await asyncio.gather(*requests)
+
+        self.assertEqual(asyncio.run(scenario()), ('libre', [42] * 5))
+        self.assertEqual(calls, [21])
+        stats = self.services.cache_stats()
+        self.assertEqual((stats['coalesced'], stats['inflight']), (4, 0))
+        self.assertEqual(asyncio.run(self.services.cached(('slow',), slow, 0)), 42)
+
+    def test_errors_are_shared_but_not_cached(self):
+        def fail():
+            raise ValueError("sin datos")
+
+        async def scenario():
+            return await asyncio.gather(*[self.services.cached(('fail',), fail) for _ in range(3)],
+                                        return_exceptions=True)
+
+        self.assertTrue(all(isinstance(e, ValueError) for e in asyncio.run(scenario())))
+        self.assertNotIn(('fail',), self.services.cache)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+import asyncio
+import contextlib
+import io
+import json
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+from fastapi.testclient import TestClient
+
+from backend.api.main import create_app
+from backend.api.telemetry import TelemetryHub
+
+
+def readings(truck, start, n):
+    times = pd.date_range(start, periods=n, freq='10s')
+    return pd.DataFrame({'Equipment': truck, 'FullDateTime': times, 'ShiftDate': times.normalize(), 'Shift': 'A',
+                         'FuelLevelLiters': 900 - 0.1 * np.arange(n), 'Speed': 20.0, 'RPM': 1500.0})
+
+
+class TestTelemetryHub(unittest.TestCase):
+    def test_fan_out_encodes_once_per_truck(self):
+        async def scenario():
+            hub = TelemetryHub(columns=('Speed',))
+            viewers = [hub.subscribe('T-1') for _ in range(50)]
+            other = hub.subscribe('T-2')
+            rows = readings('T-1', '2024-03-01', 3)
+            rows.loc[1, 'Speed'] = np.nan
+            self.assertEqual(hub.publish(rows), {'T-1': 1})
+            messages = [v.queue.get_nowait() for v in viewers]
+            # El mismo texto para todos los clientes
+            self.assertEqual(len({id(m) for m in messages}), 1)
+            delta = json.loads(messages[0])
+            self.assertEqual(delta['seq'], 1)
+            self.assertEqual(delta['y'], {'Speed': [20.0, None, 20.0]})
+            self.assertEqual(delta['t'][1] - delta['t'][0], 10_000)
+            self.assertTrue(other.queue.empty())
+            hub.unsubscribe(viewers[0])
+            self.assertEqual(hub.stats()['subscribers'], 50)
+        asyncio.run(scenario())
+
+    def test_replay_and_slow_consumer_resync(self):
+        async def scenario():
+            hub = TelemetryHub(history=3, queue_size=2)
+            for i in range(5):
+                hub.publish(readings('T-1', f'2024-03-01 0{i}:00', 2))
+            late = hub.subscribe('T-1', since=3)
+            self.assertEqual([json.loads(late.queue.get_nowait())['seq'] for _ in range(2)], [4, 5])
+            lost = hub.subscribe('T-1', since=0)
+            self.assertEqual(json.loads(lost.queue.get_nowait())['type'], 'resync')
+
+            slow = hub.subscribe('T-1')
+            for i in range(3):
+                hub.publish(readings('T-1', f'2024-03-02 0{i}:00', 2))
+            self.assertEqual(json.loads(slow.queue.get_nowait())['type'], 'resync')
+            self.assertEqual(slow.dropped, 1)
+        asyncio.run(scenario())
+
+
+class TestTelemetryEndpoints(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.app = create_app(f"{self.tmp.name}/processed", f"{self.tmp.name}/rollups", max_threads=2)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_ingest_pushes_to_websocket_and_rollups(self):
+        rows = readings('T-1', '2024-03-01 08:00', 30)
+        payload = json.loads(rows.to_json(orient='records', date_format='iso'))
+        with TestClient(self.app) as client, contextlib.redirect_stdout(io.StringIO()):
+            with client.websocket_connect('/ws/telemetry/T-1') as ws:
+                response = client.post('/telemetry', json=payload[:20])
+                self.assertEqual(response.json()['published'], {'T-1': 1})
+                first = ws.receive_json()
+                self.assertEqual(len(first['t']), 20)
+                client.post('/telemetry', json=payload[20:])
+                second = ws.receive_json()
+                self.assertEqual((second['seq'], len(second['t'])), (2, 10))
+            # Reconexión con since: recupera lo enviado después
+            with client.websocket_connect('/ws/telemetry/T-1?since=1') as ws:
+                self.assertEqual(ws.receive_json()['seq'], 2)
+            records = client.get('/kpis', params={'grain': 'hour'}).json()
+        self.assertEqual(records[0]['records'], 30)
+
+    def test_invalid_payload_is_422(self):
+        payloads = [
+            [{'FullDateTime': '2024-03-01T08:00:00', 'Speed': 20.0}],
+            [{'Equipment': 'T-1', 'FullDateTime': 'ayer', 'Speed': 20.0}],
+            {'Equipment': 'T-1'},
+        ]
+        with TestClient(self.app) as client:
+            for payload in payloads:
+                self.assertEqual(client.post('/telemetry', json=payload).status_code, 422)
+
+
+if __name__ == '__main__':
+    unittest.main()
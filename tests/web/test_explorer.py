@@ -0,0 +1,187 @@
+import contextlib
+import io
+import sys
+import threading
+import types
+import unittest
+from unittest import mock
+
+import pandas as pd
+import plotly.graph_objects as go
+
+from interfaces.web.app.components.explorer.interactive_explorer import (CancellationToken, InteractiveDataExplorer,
+                                                                          SearchCancelled, SearchRunner,
+                                                                          load_in_batches)
+
+
+class FileLoader:
+    """Loader de prueba: cada archivo es un DataFrame de 10 filas; puede bloquearse en un archivo."""
+
+    def __init__(self, block_on=None):
+        self.loaded = []
+        self.block_on = block_on
+        self.reached = threading.Event()
+        self.release = threading.Event()
+
+    def _load_and_merge_data(self, files):
+        for f in files:
+            if f == self.block_on:
+                self.reached.set()
+                self.release.wait(5)
+            self.loaded.append(f)
+        return pd.DataFrame({'metric': 'rpm', 'timestamp': pd.Timestamp('2024-01-01'), 'value': range(10 * len(files))})
+
+    # Interfaz de ExploreDataLoader usada por el explorador
+    available_trucks = ['T-210', 'T-234']
+
+    def _generate_file_patterns(self, truck, metrics, years):
+        return [f"{truck}_{m}_{y}" for m in metrics for y in years]
+
+    def _find_matching_files(self, patterns):
+        return ['f0', 'f1', 'f2']
+
+
+class Widget:
+    """Sustituto mínimo de un widget de ipywidgets."""
+
+    def __init__(self, *args, **kwargs):
+        self.value = (kwargs.get('options') or [None])[0]  # como Dropdown: la primera opción
+        self.__dict__.update(kwargs)
+        self.children = args[0] if args else None
+        self._handlers = []
+
+    def on_click(self, handler):
+        self._handlers.append(handler)
+
+    def click(self):
+        for handler in self._handlers:
+            handler(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+def fake_notebook_modules():
+    widgets = types.SimpleNamespace(Dropdown=Widget, SelectMultiple=Widget, Button=Widget, HTML=Widget)
+    ipywidgets = types.SimpleNamespace(Output=Widget, HBox=Widget, VBox=Widget, widgets=widgets)
+    display = types.SimpleNamespace(clear_output=lambda wait=False: None, display=lambda *a: None)
+    return {'ipywidgets': ipywidgets, 'IPython.display': display}
+
+
+class TestExplorerLoading(unittest.TestCase):
+    def test_batches_are_delivered_progressively(self):
+        seen = []
+        data = load_in_batches(FileLoader(), [f"f{i}" for i in range(5)], CancellationToken(), batch_size=2,
+                               on_batch=lambda batch, loaded, total: seen.append((len(batch), loaded, total)))
+        self.assertEqual(seen, [(20, 2, 5), (20, 4, 5), (10, 5, 5)])
+        self.assertEqual(len(data), 50)
+
+    def test_cancel_stops_between_files_with_partial_result(self):
+        loader = FileLoader(block_on='f1')
+        token = CancellationToken()
+        runner = SearchRunner()
+        future = runner.submit(lambda t: load_in_batches(loader, ['f0', 'f1', 'f2', 'f3'], t))
+        self.assertTrue(loader.reached.wait(5))
+        self.assertTrue(runner.cancel("detenida"))
+        loader.release.set()
+        with self.assertRaises(SearchCancelled) as ctx:
+            future.result(5)
+        self.assertEqual(loader.loaded, ['f0', 'f1'])
+        self.assertEqual(len(ctx.exception.partial), 20)
+        self.assertFalse(runner.running)
+        self.assertFalse(runner.cancel())
+        token.cancel()
+        with self.assertRaises(SearchCancelled):
+            token.raise_if_cancelled()
+        runner.shutdown()
+
+    def test_new_search_supersedes_running_one_on_same_thread(self):
+        first_loader, second_loader = FileLoader(block_on='a1'), FileLoader()
+        runner = SearchRunner()
+        threads = set()
+
+        def job(loader, files):
+            def run(token):
+                threads.add(threading.current_thread().name)
+                return load_in_batches(loader, files, token)
+            return run
+
+        first = runner.submit(job(first_loader, ['a0', 'a1', 'a2']))
+        self.assertTrue(first_loader.reached.wait(5))
+        second = runner.submit(job(second_loader, ['b0', 'b1']))
+        first_loader.release.set()
+        with self.assertRaises(SearchCancelled):
+            first.result(5)
+        self.assertEqual(len(second.result(5)), 20)
+        self.assertEqual(first_loader.loaded, ['a0', 'a1'])
+        self.assertEqual(len(threads), 1)
+        runner.shutdown()
+
+
+class TestInteractiveDataExplorer(unittest.TestCase):
+    def setUp(self):
+        patches = [
+            mock.patch.dict(sys.modules, fake_notebook_modules()),
+            # FigureWidget necesita un kernel; una Figure tiene la misma API de trazas
+            mock.patch.object(InteractiveDataExplorer, '_new_figure',
+                              lambda explorer, truck: setattr(explorer, 'figure', go.Figure(
+                                  layout={'title': f"Datos del camión {truck}"}))),
+            contextlib.redirect_stdout(io.StringIO()),
+        ]
+        self.stack = contextlib.ExitStack()
+        for patch in patches:
+            self.stack.enter_context(patch)
+        self.loader = FileLoader(block_on='f1')
+        self.explorer = InteractiveDataExplorer(self.loader)
+
+    def tearDown(self):
+        self.loader.release.set()
+        self.explorer.close()
+        self.stack.close()
+
+    def run_until_blocked(self):
+        self.explorer.start_btn.click()
+        self.assertTrue(self.loader.reached.wait(5))
+        self.assertFalse(self.explorer.stop_btn.disabled)
+        return self.explorer.runner._future
+
+    def test_stop_keeps_loaded_batches(self):
+        search = self.run_until_blocked()
+        self.explorer.stop_btn.click()
+        self.loader.release.set()
+        search.result(5)
+
+        self.assertEqual(self.explorer.status.value, "⏹ Detenida por el usuario")
+        self.assertTrue(self.explorer.stop_btn.disabled)
+        # Solo el lote entregado antes de detener queda en el gráfico
+        self.assertEqual(len(self.explorer.figure.data), 1)
+        self.assertEqual(len(self.explorer.figure.data[0].y), 10)
+
+    def test_cancel_while_loading_is_not_an_error(self):
+        search = self.run_until_blocked()
+        self.explorer.cancel_btn.click()
+        self.loader.release.set()
+        search.result(5)
+
+        self.assertEqual(self.explorer.status.value, "⏹ Cancelada")
+        self.assertEqual(self.loader.loaded, ['f0', 'f1'])
+
+    def test_new_search_supersedes_running_one(self):
+        first = self.run_until_blocked()
+        self.explorer.truck_dropdown.value = 'T-234'
+        self.explorer.start_btn.click()
+        second = self.explorer.runner._future
+        self.loader.release.set()
+        first.result(5)
+        second.result(5)
+
+        self.assertEqual(self.explorer.status.value, "🟢 Listo")
+        self.assertEqual(self.explorer.figure.layout.title.text, "Datos del camión T-234")
+        self.assertEqual(len(self.explorer.figure.data[0].y), 30)
+
+
+if __name__ == '__main__':
+    unittest.main()
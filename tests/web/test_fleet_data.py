@@ -0,0 +1,109 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from analytics.eda.fleet import ProcessedDataCache
+from interfaces.web.app.data.fleet_data import FleetDataSource
+
+
+def make_sensor(truck, days=10, freq='1min'):
+    times = pd.date_range('2024-03-01', periods=days * 24 * 60 // int(freq[:-3]), freq=freq)
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        'Equipment': truck,
+        'FullDateTime': times,
+        'Speed': rng.gamma(2.0, 8.0, len(times)),
+        'RPM': rng.normal(1500, 80, len(times)),
+        'FuelLevelLiters': np.linspace(3000, 500, len(times)),
+    })
+
+
+class TestFleetDataSource(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self.tmp.name, 'processed')
+        self.sensor = make_sensor('T-1')
+        ProcessedDataCache(self.root).put('T-1', {'sensor': self.sensor})
+        self.source = FleetDataSource(self.root)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def expected(self, start, end, columns=None):
+        times = self.sensor['FullDateTime']
+        mask = (times >= pd.Timestamp(start)) & (times < pd.Timestamp(end) + pd.Timedelta(days=1))
+        out = self.sensor.loc[mask]
+        return (out if columns is None else out[list(columns)]).reset_index(drop=True)
+
+    def test_date_range_filter_inclusive(self):
+        result = self.source.load('T-1', '2024-03-03', '2024-03-05')
+        pd.testing.assert_frame_equal(result, self.expected('2024-03-03', '2024-03-05'))
+        self.assertEqual(self.source.trucks(), ['T-1'])
+        first, last = self.source.date_bounds('T-1')
+        self.assertEqual(first, self.sensor['FullDateTime'].min())
+
+    def test_overlapping_range_scans_only_missing_days(self):
+        columns = ('FullDateTime', 'Speed')
+        self.source.load('T-1', '2024-03-03', '2024-03-05', columns=columns)
+        with mock.patch('interfaces.web.app.data.fleet_data.pd.read_parquet', wraps=pd.read_parquet) as scan:
+            result = self.source.load('T-1', '2024-03-04', '2024-03-07', columns=columns)
+            self.assertEqual(scan.call_count, 1)
+            filters = scan.call_args.kwargs['filters']
+            self.assertEqual(filters[0][2], pd.Timestamp('2024-03-06'))
+            self.source.load('T-1', '2024-03-03', '2024-03-07', columns=columns)
+            self.assertEqual(scan.call_count, 1)
+        pd.testing.assert_frame_equal(result, self.expected('2024-03-04', '2024-03-07', columns))
+
+    def test_days_without_data_are_cached_empty(self):
+        result = self.source.load('T-1', '2024-04-01', '2024-04-02', columns=('Speed',))
+        self.assertTrue(result.empty)
+        self.assertEqual(list(result.columns), ['Speed'])
+
+    def test_missing_columns_are_nan(self):
+        result = self.source.load('T-1', '2024-03-01', '2024-03-01', columns=('Speed', 'Latitude'))
+        self.assertEqual(len(result), 24 * 60)
+        self.assertTrue(result['Latitude'].isna().all())
+
+    def test_cached_range_does_not_scan(self):
+        self.source.load('T-1', '2024-03-01', '2024-03-10')
+        with mock.patch('interfaces.web.app.data.fleet_data.pd.read_parquet', wraps=pd.read_parquet) as scan:
+            result = self.source.load('T-1', '2024-03-02', '2024-03-09')
+        scan.assert_not_called()
+        pd.testing.assert_frame_equal(result, self.expected('2024-03-02', '2024-03-09'))
+
+    def test_concurrent_sessions_share_one_scan(self):
+        read_parquet = pd.read_parquet
+
+        def slow_read(*args, **kwargs):
+            time.sleep(0.2)
+            return read_parquet(*args, **kwargs)
+
+        barrier = threading.Barrier(4)
+
+        def session():
+            barrier.wait(5)
+            return self.source.load('T-1', '2024-03-02', '2024-03-04')
+
+        with mock.patch('interfaces.web.app.data.fleet_data.pd.read_parquet', side_effect=slow_read) as scan:
+            with ThreadPoolExecutor(4) as pool:
+                results = list(pool.map(lambda _: session(), range(4)))
+        self.assertEqual(scan.call_count, 1)
+        for result in results:
+            pd.testing.assert_frame_equal(result, self.expected('2024-03-02', '2024-03-04'))
+
+    def test_errors(self):
+        with self.assertRaises(ValueError):
+            self.source.load('T-1', '2024-03-05', '2024-03-01')
+        with self.assertRaises(FileNotFoundError):
+            self.source.load('T-9', '2024-03-01', '2024-03-02')
+
+
+if __name__ == '__main__':
+    unittest.main()
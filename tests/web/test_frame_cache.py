@@ -0,0 +1,65 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from interfaces.web.app.data.frame_cache import FrameCache, frame_nbytes
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def frame(n):
+    return pd.DataFrame({'x': np.arange(n, dtype=float)})
+
+
+class TestFrameCache(unittest.TestCase):
+    def test_ttl_expiry(self):
+        clock = FakeClock()
+        cache = FrameCache(ttl=10, clock=clock)
+        cache.put('a', frame(5))
+        clock.now = 9.9
+        self.assertIsNotNone(cache.get('a'))
+        clock.now = 10.0
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.nbytes, 0)
+
+    def test_lru_by_entries(self):
+        cache = FrameCache(max_entries=2)
+        cache.put('a', frame(1))
+        cache.put('b', frame(1))
+        cache.get('a')
+        cache.put('c', frame(1))
+        self.assertIn('a', cache)
+        self.assertNotIn('b', cache)
+        self.assertEqual(cache.stats()['evictions'], 1)
+
+    def test_memory_accounting_and_eviction(self):
+        size = frame_nbytes(frame(1000))
+        cache = FrameCache(max_bytes=int(size * 2.5))
+        for key in 'abc':
+            cache.put(key, frame(1000))
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.nbytes, 2 * size)
+        self.assertNotIn('a', cache)
+        # Más grande que el límite: no se guarda ni desaloja nada
+        self.assertFalse(cache.put('big', frame(10_000)))
+        self.assertEqual(len(cache), 2)
+
+    def test_get_or_load_counts(self):
+        cache = FrameCache()
+        calls = []
+        for _ in range(3):
+            cache.get_or_load('k', lambda: calls.append(1) or frame(3))
+        self.assertEqual(len(calls), 1)
+        stats = cache.stats()
+        self.assertEqual((stats['hits'], stats['misses']), (2, 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
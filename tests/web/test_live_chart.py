@@ -0,0 +1,35 @@
+import json
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from interfaces.web.app.components.charts.line_charts import live_chart
+
+
+class TestRenderLiveChart(unittest.TestCase):
+    def setUp(self):
+        self.df = pd.DataFrame({
+            'FullDateTime': pd.date_range('2025-02-01 08:00', periods=50, freq='s'),
+            'Speed': np.arange(50.0),
+        })
+
+    def test_initial_points_are_iso_strings(self):
+        with mock.patch.object(live_chart.components, 'html') as html:
+            fig = live_chart.render_live_chart(self.df, 'T-210', 'FullDateTime', 'Speed',
+                                               'http://api:8000', n_out=10)
+
+        trace = json.loads(fig.to_json())['data'][0]
+        # Mismo formato que los deltas que agrega el script (toISOString sin 'Z')
+        self.assertEqual(trace['x'][0], '2025-02-01T08:00:00.000000')
+        self.assertEqual(trace['x'][-1], '2025-02-01T08:00:49.000000')
+        self.assertEqual(len(trace['x']), 10)
+
+        rendered = html.call_args[0][0]
+        self.assertIn('2025-02-01T08:00:00.000000', rendered)
+        self.assertIn('ws://api:8000/ws/telemetry/T-210', rendered)
+
+
+if __name__ == '__main__':
+    unittest.main()
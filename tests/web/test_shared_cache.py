@@ -0,0 +1,93 @@
+import datetime as dt
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from interfaces.web.app.data.frame_cache import frame_nbytes
+from interfaces.web.app.data.shared_cache import SharedQueryCache, query_key
+
+
+def frame(n):
+    return pd.DataFrame({'x': np.arange(n, dtype=float)})
+
+
+class TestSharedQueryCache(unittest.TestCase):
+    def test_concurrent_identical_queries_compute_once(self):
+        cache = SharedQueryCache()
+        calls = []
+        gate = threading.Event()
+
+        def compute():
+            calls.append(threading.current_thread().name)
+            gate.wait(5)
+            return frame(100)
+
+        with ThreadPoolExecutor(max_workers=20) as pool:
+            futures = [pool.submit(cache.query, 'records', compute, truck='T-1', start='2024-03-01',
+                                   end=dt.date(2024, 3, 2)) for _ in range(20)]
+            while cache.stats()['coalesced'] < 19:
+                time.sleep(0.01)
+            gate.set()
+            results = [f.result(5) for f in futures]
+
+        self.assertEqual(len(calls), 1)
+        stats = cache.stats()
+        self.assertEqual((stats['misses'], stats['coalesced'], stats['inflight'], stats['entries']), (1, 19, 0, 1))
+        # Una sola copia de los datos en memoria para todas las sesiones
+        self.assertTrue(all(np.shares_memory(r['x'].to_numpy(), results[0]['x'].to_numpy()) for r in results))
+
+    def test_errors_reach_waiters_and_are_not_cached(self):
+        cache = SharedQueryCache()
+        gate = threading.Event()
+
+        def failing():
+            gate.wait(5)
+            raise FileNotFoundError("sin datos")
+
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            futures = [pool.submit(cache.query, 'records', failing, truck='T-9') for _ in range(3)]
+            while cache.stats()['coalesced'] < 2:
+                time.sleep(0.01)
+            gate.set()
+            for f in futures:
+                with self.assertRaises(FileNotFoundError):
+                    f.result(5)
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(len(cache.query('records', lambda: frame(3), truck='T-9')), 3)
+
+    def test_key_normalization(self):
+        self.assertEqual(query_key('records', ' T-1 ', ['Speed', 'RPM'], '2024-03-01', dt.date(2024, 3, 2), '60s'),
+                         query_key('records', 'T-1', ('Speed', 'RPM'), dt.datetime(2024, 3, 1),
+                                   pd.Timestamp('2024-03-02'), '1min'))
+        self.assertNotEqual(query_key('records', 'T-1', resolution=1000), query_key('records', 'T-1', resolution=2000))
+        self.assertEqual(query_key('kpis', root='a', grain='day'), query_key('kpis', grain='day', root='a'))
+
+    def test_sessions_get_isolated_shallow_copies(self):
+        cache = SharedQueryCache()
+        first = cache.query('records', lambda: frame(10), truck='T-1')
+        first['extra'] = 1
+        second = cache.query('records', lambda: frame(10), truck='T-1')
+        self.assertNotIn('extra', second.columns)
+
+    def test_lru_by_bytes_and_entry_ttl(self):
+        size = frame_nbytes(frame(1000))
+        now = [0.0]
+        cache = SharedQueryCache(max_bytes=int(size * 2.5), ttl=600, clock=lambda: now[0])
+        cache.query('records', lambda: frame(1000), truck='a')
+        cache.query('records', lambda: frame(1000), truck='b')
+        cache.query('records', lambda: frame(1000), truck='a')          # 'a' pasa a ser la más reciente
+        cache.query('kpis', lambda: frame(1000), truck='c', ttl=60)
+        self.assertIn(query_key('records', 'a'), cache)
+        self.assertNotIn(query_key('records', 'b'), cache)
+        self.assertLessEqual(cache.nbytes, cache.max_bytes)
+        now[0] = 61
+        self.assertNotIn(query_key('kpis', 'c'), cache)
+        self.assertIn(query_key('records', 'a'), cache)
+
+
+if __name__ == '__main__':
+    unittest.main()